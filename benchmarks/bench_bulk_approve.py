@@ -0,0 +1,73 @@
+"""End-to-end time to approve 1,000 pending bookings one at a time vs. in one bulk call.
+
+"One at a time" is what the Manage Bookings page used to do per click: one
+approve_booking() transaction followed by reloading the first page of pending
+bookings. "Bulk" is a single approve_bookings() transaction and one reload.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bulk_approve [--bookings 100000] [--approve 1000]
+"""
+import argparse
+import os
+import shutil
+import time
+
+import db_manager
+from benchmarks.common import build_database, temp_database_path, use_database
+
+PAGE_SIZE = 50
+PAGE_COLUMNS = ("booking_id", "venue_name", "image", "time_range", "purpose")
+
+
+def reload_pending():
+    db_manager.get_bookings(status=db_manager.BOOKING_STATUS["Pending"], limit=PAGE_SIZE, columns=PAGE_COLUMNS)
+
+
+def approve_one_at_a_time(booking_ids):
+    approved = 0
+    for booking_id in booking_ids:
+        try:
+            db_manager.approve_booking(booking_id)
+            approved += 1
+        except db_manager.BookingConflictError:
+            pass
+        reload_pending()
+    return approved
+
+
+def approve_in_bulk(booking_ids):
+    approved, _ = db_manager.approve_bookings(booking_ids)
+    reload_pending()
+    return len(approved)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--approve", type=int, default=1000)
+    args = parser.parse_args()
+
+    template = temp_database_path()
+    print(f"Building {args.bookings} bookings in {template} ...")
+    build_database(template, bookings=args.bookings)
+    booking_ids = db_manager.get_booking_ids(status=db_manager.BOOKING_STATUS["Pending"])[:args.approve]
+    db_manager.close_connections()
+
+    print(f"{'method':<20}{'approved':>10}{'total (s)':>12}{'per booking (ms)':>18}")
+    for name, approve in (("one at a time", approve_one_at_a_time), ("bulk", approve_in_bulk)):
+        # Each method starts from an identical copy of the database
+        path = os.path.join(os.path.dirname(template), f"{name.replace(' ', '_')}.db")
+        shutil.copyfile(template, path)
+        use_database(path)
+        reload_pending()  # Open the pooled connections outside the timed section
+
+        start = time.perf_counter()
+        approved = approve(booking_ids)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20}{approved:>10}{elapsed:>12.3f}{elapsed * 1000 / len(booking_ids):>18.3f}")
+        db_manager.close_connections()
+
+
+if __name__ == "__main__":
+    main()
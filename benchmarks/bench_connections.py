@@ -0,0 +1,84 @@
+"""Per-call latency of db_manager with a fresh connection per call vs. the connection pool.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_connections [--bookings 100000] [--repeat 2000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+
+import db_manager
+from benchmarks.common import build_database, summarize, temp_database_path, time_calls
+
+
+def legacy_connect():
+    """The old connect_db(): a new, unconfigured connection on every call."""
+    if not os.path.exists(os.path.dirname(db_manager.DB_PATH)):
+        os.makedirs(os.path.dirname(db_manager.DB_PATH))
+    return sqlite3.connect(db_manager.DB_PATH)
+
+
+def legacy_get_venue_by_id(venue_id):
+    with legacy_connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT venue_id, venue_name, location, capacity, image FROM venues WHERE venue_id = ?", (venue_id,))
+        return cursor.fetchone()
+
+
+def legacy_login_user(username, password):
+    with legacy_connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id, is_admin FROM users WHERE username = ? AND password = ?", (username, password))
+        return cursor.fetchone()
+
+
+def legacy_approve_booking(booking_id):
+    with legacy_connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE bookings SET is_approved = 1 WHERE booking_id = ?", (booking_id,))
+        conn.commit()
+
+
+def approve_ignoring_conflicts(booking_id):
+    """approve_booking() that counts a rejected conflict as a completed call."""
+    try:
+        db_manager.approve_booking(booking_id)
+    except db_manager.BookingConflictError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    path = temp_database_path()
+    print(f"Building {args.bookings} bookings in {path} ...")
+    build_database(path, bookings=args.bookings)
+    rng = random.Random(1)
+
+    cases = [
+        ("get_venue_by_id", lambda: legacy_get_venue_by_id(rng.randint(1, 20)),
+         lambda: db_manager.get_venue_by_id(rng.randint(1, 20))),
+        ("login_user", lambda: legacy_login_user("student7", "password"),
+         lambda: db_manager.login_user("student7", "password")),
+        ("approve_booking", lambda: legacy_approve_booking(rng.randint(1, args.bookings)),
+         lambda: approve_ignoring_conflicts(rng.randint(1, args.bookings))),
+    ]
+
+    print(f"{'function':<20}{'before p50':>12}{'after p50':>12}{'before p95':>12}{'after p95':>12}  (ms)")
+    for name, before, after in cases:
+        # Pooled connections are opened lazily; warm them so the first call is not counted
+        after()
+        old = summarize(time_calls(before, args.repeat))
+        new = summarize(time_calls(after, args.repeat))
+        print(f"{name:<20}{old['p50']:>12.4f}{new['p50']:>12.4f}{old['p95']:>12.4f}{new['p95']:>12.4f}")
+
+    db_manager.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Latency of every public db_manager function on a synthetic campus database.
+
+Reports p50/p95/p99 per function and writes them, with the commit and scale,
+to a JSON file so runs can be compared between commits. Run from the
+repository root:
+
+    python -m benchmarks.bench_db_manager [--scale small] [--repeat 200] [--output results.json]
+    python -m benchmarks.bench_db_manager --compare old.json  # Also print the change against an earlier run
+
+Generating the medium and large scales takes a while; build them once with
+benchmarks.generate_data and pass --database to reuse the file (it is copied
+before any write).
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+from datetime import datetime, timezone
+
+import db_manager
+from benchmarks.common import summarize, temp_database_path, time_calls, use_database
+from benchmarks.generate_data import DEFAULT_SEED, EQUIPMENT, SCALES, generate_scale
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+HEAVY_REPEAT = 20  # Cap for calls that read a whole table
+DELETE_VENUE_REPEAT = 5  # Each call deletes every booking of a venue
+REGRESSION_RATIO = 1.2  # Flag functions at least this much slower than the compared run
+
+# Search-as-you-type inputs: partial words, several words, a venue, a username
+SEARCH_TERMS = ("sem", "thesis def", "event 12", "workshop venue 3", "student17", "acq")
+
+# What image_ingest records for a venue image
+BENCH_RENDITIONS = (("hero", "hero.jpg", 700, 525, 60_000), ("tile", "tile.jpg", 300, 300, 25_000))
+
+# Connection plumbing and schema setup, which are not per-request operations
+NOT_BENCHMARKED = {"connect_db", "read_connection", "write_connection", "close_connections", "migrate_schema"}
+# Bulk loading, measured in rows per second by benchmarks.bench_import instead
+NOT_BENCHMARKED |= {"import_users", "import_venues", "import_bookings", "drop_indexes", "restore_indexes"}
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def public_functions():
+    return sorted(name for name, obj in vars(db_manager).items()
+                  if inspect.isfunction(obj) and obj.__module__ == db_manager.__name__ and not name.startswith("_"))
+
+
+def ignoring(*errors):
+    """Wrap a call so the given errors (e.g. a rejected conflict) count as a completed call."""
+    def wrap(fn):
+        def call():
+            try:
+                fn()
+            except errors:
+                pass
+        return call
+    return wrap
+
+
+def build_cases(rng, repeat):
+    """Return (function name, call, repeat) in run order: reads first, then writes, then deletes."""
+    with db_manager.read_connection() as conn:
+        venue_ids = [row[0] for row in conn.execute("SELECT venue_id FROM venues ORDER BY venue_id")]
+        user_ids = [row[0] for row in conn.execute("SELECT user_id FROM users WHERE is_admin = 0 ORDER BY user_id")]
+        pending_ids = db_manager.get_booking_ids(status=db_manager.BOOKING_STATUS["Pending"])
+        booking_ids = db_manager.get_booking_ids(status=db_manager.BOOKING_STATUS["Denied"])
+    rng.shuffle(pending_ids)
+    rng.shuffle(booking_ids)
+    rng.shuffle(user_ids)
+
+    venue = lambda: rng.choice(venue_ids)
+    user = lambda: rng.choice(user_ids)
+    status = lambda: rng.choice(tuple(db_manager.BOOKING_STATUS.values()))
+    month_start, month_end = db_manager.parse_time_range("2025-10-01 00:00 - 2025-11-01 00:00")
+
+    def future_slot():
+        day = f"2026-{rng.randint(6, 12):02d}-{rng.randint(1, 28):02d}"
+        hour = rng.randint(7, 20)
+        return day, f"{day} {hour:02d}:00 - {day} {hour + 1:02d}:00"
+
+    def book():
+        day, time_range = future_slot()
+        db_manager.book_venue(user(), venue(), day, time_range, "Benchmark", "Benchmark event")
+
+    series_ids = []
+
+    def book_series():
+        _, time_range = future_slot()
+        series_ids.append(db_manager.book_venue_series(user(), venue(), time_range, "Benchmark", "Benchmark series",
+                                                       "weekly", count=18)[0])
+
+    # Write targets are consumed from the front so no booking or user is hit twice
+    pending = iter(pending_ids)
+    bookings = iter(booking_ids)
+    users = iter(user_ids)
+    venues = iter(venue_ids)
+    created = iter(range(10 ** 9))
+    heavy = min(repeat, HEAVY_REPEAT)
+    per_series = max(1, heavy // 2)  # Calls each of approve_series and deny_series
+    conflicts = ignoring(db_manager.BookingConflictError)
+
+    return [
+        ("get_schema_version", db_manager.get_schema_version, repeat),
+        ("get_data_version", db_manager.get_data_version, repeat),
+        ("parse_time_range", lambda: db_manager.parse_time_range(future_slot()[1]), repeat),
+        ("expand_recurrence", lambda: db_manager.expand_recurrence(future_slot()[1], "weekly", count=18), repeat),
+        ("login_user", lambda: db_manager.login_user(f"student{rng.randint(1, len(user_ids))}", "password"), repeat),
+        ("get_all_venues", db_manager.get_all_venues, repeat),
+        ("get_venue_by_id", lambda: db_manager.get_venue_by_id(venue()), repeat),
+        ("get_venue_cache_stats", db_manager.get_venue_cache_stats, repeat),
+        ("get_venue_equipment", db_manager.get_venue_equipment, repeat),
+        ("get_venue_renditions", lambda: db_manager.get_venue_renditions(venue()), repeat),
+        ("get_image_renditions", lambda: db_manager.get_image_renditions(db_manager.get_venue_by_id(venue())[4]),
+         repeat),
+        ("filter_venues", lambda: db_manager.filter_venues(min_capacity=rng.choice((20, 60, 300)),
+                                                           equipment=rng.sample(EQUIPMENT, 2),
+                                                           free_from=month_start, free_to=month_start + 7200), repeat),
+        ("get_venue_availability", lambda: db_manager.get_venue_availability(venue(), month_start, month_end),
+         repeat),
+        ("get_bookings", lambda: db_manager.get_bookings(status=status(), limit=50,
+                                                         columns=("booking_id", "venue_name", "time_range")), repeat),
+        ("search_bookings", lambda: db_manager.search_bookings(rng.choice(SEARCH_TERMS), status=status(),
+                                                               columns=("booking_id", "venue_name", "time_range")),
+         repeat),
+        ("search_venues", lambda: db_manager.search_venues(f"venue {rng.randint(1, len(venue_ids))}"), repeat),
+        ("get_booking_ids", lambda: db_manager.get_booking_ids(status=0, venue_id=venue()), heavy),
+        ("iter_bookings", lambda: sum(1 for _ in db_manager.iter_bookings(venue_id=venue(), columns=("booking_id",
+                                                                                                      "time_range"))),
+         heavy),
+        ("get_user_bookings", lambda: db_manager.get_user_bookings(user()), repeat),
+        ("get_pending_bookings", db_manager.get_pending_bookings, heavy),
+        ("get_approved_bookings", db_manager.get_approved_bookings, heavy),
+        ("get_denied_bookings", db_manager.get_denied_bookings, heavy),
+        ("get_canceled_bookings", db_manager.get_canceled_bookings, heavy),
+        ("get_booking_count", lambda: db_manager.get_booking_count(venue(), status()), repeat),
+        ("get_row_count", lambda: db_manager.get_row_count("bookings"), heavy),
+        ("get_total_bookings", lambda: db_manager.get_total_bookings(user()), repeat),
+        ("get_total_bookings_by_status", lambda: db_manager.get_total_bookings_by_status(user(), status()), repeat),
+        ("get_venue_booking_stats", db_manager.get_venue_booking_stats, heavy),
+        ("get_user_booking_stats", db_manager.get_user_booking_stats, heavy),
+        ("get_all_users", lambda: db_manager.get_all_users(exclude_admin=True), heavy),
+        ("register_user", lambda: db_manager.register_user(f"bench{next(created)}", "password"), repeat),
+        ("add_venue", lambda: db_manager.add_venue(f"Bench Venue {next(created)}", "", 0), repeat),
+        ("set_venue_image", lambda: db_manager.set_venue_image(venue(), "", BENCH_RENDITIONS), repeat),
+        ("book_venue", conflicts(book), repeat),
+        ("book_venue_series", conflicts(book_series), 2 * per_series + 1),  # One series per later call
+        ("approve_booking", conflicts(lambda: db_manager.approve_booking(next(pending))), repeat),
+        ("deny_booking", lambda: db_manager.deny_booking(next(pending)), repeat),
+        ("approve_bookings", lambda: db_manager.approve_bookings([next(pending) for _ in range(100)]), heavy),
+        ("deny_bookings", lambda: db_manager.deny_bookings([next(pending) for _ in range(100)]), heavy),
+        ("approve_series", lambda: db_manager.approve_series(series_ids.pop()), per_series),
+        ("deny_series", lambda: db_manager.deny_series(series_ids.pop()), per_series),
+        ("delete_booking", lambda: db_manager.delete_booking(next(bookings)), repeat),
+        ("delete_user", lambda: db_manager.delete_user(next(users)), repeat),
+        ("delete_venue", lambda: db_manager.delete_venue(next(venues)), min(repeat, DELETE_VENUE_REPEAT)),
+    ]
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nAgainst {baseline_path} (commit {baseline.get('commit')}, scale {baseline.get('scale')}):")
+    print(f"{'function':<32}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, stats in results.items():
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        ratios = [stats[key] / old[key] if old[key] else float("inf") for key in ("p50", "p95", "p99")]
+        flag = "  <-- slower" if ratios[0] >= REGRESSION_RATIO else ""
+        print(f"{name:<32}" + "".join(f"{ratio:>8.2f}x" for ratio in ratios) + flag)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per function (fewer for whole-table reads)")
+    parser.add_argument("--database", help="Pre-generated database to copy instead of generating one")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/db_manager-<scale>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    commit = current_commit()
+    path = temp_database_path()
+    if args.database:
+        shutil.copyfile(args.database, path)
+        use_database(path)
+    else:
+        print(f"Generating the {args.scale} database in {path} ...")
+        generate_scale(path, args.scale, args.seed)
+
+    rng = random.Random(args.seed)
+    cases = build_cases(rng, args.repeat)
+    missing = sorted(set(public_functions()) - NOT_BENCHMARKED - {name for name, _, _ in cases})
+    if missing:
+        print(f"Warning: no benchmark for {', '.join(missing)}")
+
+    results = {}
+    print(f"{'function':<32}{'calls':>7}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for name, call, repeat in cases:
+        call()  # Warm the pooled connections and statement cache
+        stats = summarize(time_calls(call, repeat))
+        stats["calls"] = repeat
+        results[name] = stats
+        print(f"{name:<32}{repeat:>7}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}")
+    db_manager.close_connections()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"db_manager-{args.scale}-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "scale": args.scale if not args.database else os.path.basename(args.database),
+            "seed": args.seed,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
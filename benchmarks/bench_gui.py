@@ -0,0 +1,212 @@
+"""Render time, widget count and memory of every page, driven through the real GUI.
+
+Logs in as admin and as a user on a generated database, clicks through the
+sidebar pages of AdminWindow and UserWindow and opens BookVenueWindow. For
+each page it records:
+
+- first_paint_ms: from the click until Tk has drawn the page once
+- idle_ms: from the click until every background database call and image
+  decode it started has been delivered
+- widgets: widgets in the window afterwards
+- rss_mb: resident memory of the process afterwards
+
+Needs an X display; on a headless machine it starts itself under xvfb-run.
+Run from the repository root:
+
+    python -m benchmarks.bench_gui [--scales tiny small] [--repeat 3] [--output results.json]
+
+Each (scale, role) runs in a fresh process. Results are written as JSON to
+benchmarks/results/ by default.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tkinter as tk
+from datetime import datetime, timezone
+
+import customtkinter as ctk
+
+import db_manager
+from benchmarks.bench_db_manager import RESULTS_DIR, current_commit
+from benchmarks.common import count_widgets, rss_mb, temp_database_path, use_database
+from benchmarks.generate_data import DEFAULT_SEED, SCALES, generate_scale
+
+SETTLE_S = 0.1  # Quiet time after which a page counts as idle
+PAGE_TIMEOUT_S = 120
+SCREEN = "1920x1080x24"
+
+# role -> (username, password, sidebar pages)
+ROLES = {
+    "admin": ("admin", "admin", ("Home", "Manage Venues", "Manage Bookings", "Manage Users")),
+    "user": ("student1", "password", ("Home", "My Bookings")),  # student1 has the most bookings
+}
+
+
+def find_button(widget, text):
+    """Return the first mapped CTkButton labelled ``text`` under ``widget``, or None."""
+    for child in widget.winfo_children():
+        if isinstance(child, ctk.CTkButton) and child.cget("text") == text and child.winfo_ismapped():
+            return child
+        found = find_button(child, text)
+        if found is not None:
+            return found
+    return None
+
+
+def newest_toplevel(widget):
+    toplevels = [child for child in widget.winfo_children() if isinstance(child, tk.Toplevel)]
+    return toplevels[-1] if toplevels else None
+
+
+def background_work():
+    from gui.common import tk_bridge
+    from gui.common.db_executor import db_executor
+    from gui.common.image_loader import image_loader
+    return db_executor.in_flight + len(image_loader.pending) + tk_bridge.pending()
+
+
+def wait_until_idle(root):
+    """Pump the event loop until no background work is left; return when it ran out."""
+    deadline = time.perf_counter() + PAGE_TIMEOUT_S
+    quiet_since = None
+    while True:
+        root.update()
+        now = time.perf_counter()
+        if background_work():
+            quiet_since = None
+        elif quiet_since is None:
+            quiet_since = now
+        elif now - quiet_since >= SETTLE_S:
+            return quiet_since
+        if now > deadline:
+            raise TimeoutError("The page did not become idle")
+        time.sleep(0.001)
+
+
+def measure(root, window_of, click):
+    """Time ``click()`` until first paint and until idle, then measure ``window_of()``."""
+    start = time.perf_counter()
+    click()
+    root.update_idletasks()  # Geometry and the first draw run as idle tasks
+    first_paint = time.perf_counter()
+    idle = wait_until_idle(root)
+    return {
+        "first_paint_ms": (first_paint - start) * 1000,
+        "idle_ms": (max(idle, first_paint) - start) * 1000,
+        "widgets": count_widgets(window_of()),
+        "rss_mb": rss_mb(),
+    }
+
+
+def run_role(database, role, repeat):
+    """Child process: log in as ``role`` and visit every page ``repeat`` times."""
+    use_database(database)
+    username, password, pages = ROLES[role]
+
+    from gui.login_window import LoginWindow
+    root = tk.Tk()
+    root.title("UC Venue Booking Management")
+    login = LoginWindow(root)
+    wait_until_idle(root)
+
+    samples = []
+
+    def record(page, sample):
+        samples.append(dict(page=page, **sample))
+
+    login.entry_username.insert(0, username)
+    login.entry_password.insert(0, password)
+    record("Login", measure(root, lambda: newest_toplevel(root), login.button_login.invoke))
+    dashboard = newest_toplevel(root)
+    if dashboard is None:
+        raise RuntimeError(f"Logging in as {username} did not open a dashboard")
+
+    for _ in range(repeat):
+        for page in pages:
+            record(page, measure(root, lambda: dashboard, find_button(dashboard, page).invoke))
+
+        # Booking form for the first venue on the home page
+        find_button(dashboard, "Home").invoke()
+        wait_until_idle(root)
+        book_button = find_button(dashboard, "Book Venue")
+        if book_button is not None:
+            record("Book Venue", measure(root, lambda: newest_toplevel(dashboard), book_button.invoke))
+            find_button(newest_toplevel(dashboard), "Go Back").invoke()
+            wait_until_idle(root)
+
+    root.destroy()
+    db_manager.close_connections()
+    return samples
+
+
+def display_prefix():
+    """Command prefix that gives child processes a display: none, or xvfb-run on a headless machine."""
+    if os.environ.get("DISPLAY"):
+        return []
+    if not shutil.which("xvfb-run"):
+        sys.exit("No X display and xvfb-run is not installed (e.g. apt install xvfb).")
+    return ["xvfb-run", "-a", "-s", f"-screen 0 {SCREEN}"]
+
+
+def run_child(prefix, database, role, repeat):
+    """Run one role in a fresh process."""
+    command = prefix + [sys.executable, "-m", "benchmarks.bench_gui", "--child", role, "--database", database,
+                        "--repeat", str(repeat)]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["tiny", "small"])
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="Visits of each page per run")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/gui-<commit>.json)")
+    parser.add_argument("--child", choices=ROLES, help=argparse.SUPPRESS)
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Child process: one role on one database, reported as JSON
+        print(json.dumps(run_role(args.database, args.child, args.repeat)))
+        return
+
+    prefix = display_prefix()
+    commit = current_commit()
+    results = []
+    print(f"{'scale':<8}{'role':<7}{'page':<17}{'paint ms':>10}{'idle ms':>10}{'widgets':>9}{'RSS MB':>9}  (medians)")
+    for scale in args.scales:
+        database = temp_database_path(f"gui-{scale}.db")
+        generate_scale(database, scale, args.seed)
+        db_manager.close_connections()
+        for role in ROLES:
+            samples = run_child(prefix, database, role, args.repeat)
+            for page in dict.fromkeys(sample["page"] for sample in samples):
+                page_samples = [sample for sample in samples if sample["page"] == page]
+                row = {"scale": scale, "role": role, "page": page, "samples": page_samples}
+                for key in ("first_paint_ms", "idle_ms", "widgets", "rss_mb"):
+                    row[key] = statistics.median(sample[key] for sample in page_samples)
+                results.append(row)
+                print(f"{scale:<8}{role:<7}{page:<17}{row['first_paint_ms']:>10.1f}{row['idle_ms']:>10.1f}"
+                      f"{row['widgets']:>9.0f}{row['rss_mb']:>9.1f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"gui-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Rows per second of bulk_import, keeping the bookings indexes vs. dropping and rebuilding them.
+
+Generates a synthetic campus (see generate_data), writes its users, venues
+and bookings out as CSV files and imports them into an empty database, once
+per index strategy. Run from the repository root:
+
+    python -m benchmarks.bench_import [--scale small]
+"""
+import argparse
+import csv
+import os
+import shutil
+
+import booking_export
+import bulk_import
+import db_manager
+from benchmarks.common import temp_database_path, use_database
+from benchmarks.generate_data import SCALES, generate_scale
+
+VENUE_IMAGE = "assets/venues/activity_center.png"
+
+
+def write_csv_files(directory):
+    """Write the current database's users, venues and bookings as bulk_import CSV files; returns their paths."""
+    paths = {kind: os.path.join(directory, f"{kind}.csv") for kind in bulk_import.KINDS}
+    with db_manager.read_connection() as conn:
+        with open(paths["users"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("username", "password", "is_admin"))
+            writer.writerows(conn.execute("SELECT username, password, is_admin FROM users WHERE is_admin = 0"))
+        equipment = db_manager.get_venue_equipment()
+        with open(paths["venues"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("venue_name", "location", "capacity", "image", "equipment"))
+            for venue_id, venue_name, location, capacity, _ in db_manager.get_all_venues():
+                writer.writerow((venue_name, location, capacity, VENUE_IMAGE, ";".join(equipment.get(venue_id, []))))
+    booking_export.export_csv(paths["bookings"])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    args = parser.parse_args()
+
+    source = temp_database_path("source.db")
+    directory = os.path.dirname(source)
+    print(f"Generating the {args.scale} campus in {source} ...")
+    generate_scale(source, args.scale)
+    paths = write_csv_files(directory)
+
+    print(f"{'indexes':<12}{'table':<10}{'imported':>10}{'rejected':>10}{'seconds':>10}{'rows/s':>10}")
+    for strategy, rebuild in (("kept", False), ("rebuilt", True)):
+        use_database(os.path.join(directory, f"import-{strategy}.db"))
+        db_manager.migrate_schema()
+        for kind in ("users", "venues", "bookings"):
+            result = bulk_import.import_csv(kind, paths[kind], os.path.join(directory, f"{kind}.rejects.csv"),
+                                            rebuild_indexes=rebuild and kind == "bookings")
+            print(f"{strategy:<12}{kind:<10}{result['imported']:>10,}{result['rejected']:>10,}"
+                  f"{result['seconds']:>10.2f}{result['rows_per_second']:>10,.0f}")
+        db_manager.close_connections()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Data fetch for the Manage Users and Manage Venues pages: per-row count queries vs. one GROUP BY.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_page_stats [--bookings 100000]
+"""
+import argparse
+import time
+
+import db_manager
+from benchmarks.common import build_database, temp_database_path
+
+
+def users_page_per_row():
+    users = db_manager.get_all_users(exclude_admin=True)
+    for user in users:
+        db_manager.get_total_bookings(user[0])
+        db_manager.get_total_bookings_by_status(user[0], 1)
+        db_manager.get_total_bookings_by_status(user[0], -1)
+    return 1 + 3 * len(users)
+
+
+def users_page_bulk():
+    db_manager.get_all_users(exclude_admin=True)
+    db_manager.get_user_booking_stats()
+    return 2
+
+
+def venues_page_per_row():
+    venues = db_manager.get_all_venues()
+    for venue in venues:
+        db_manager.get_booking_count(venue[0], status=0)
+        db_manager.get_booking_count(venue[0], status=1)
+    return 1 + 2 * len(venues)
+
+
+def venues_page_bulk():
+    db_manager.get_all_venues()
+    db_manager.get_venue_booking_stats()
+    return 2
+
+
+def timed(fn):
+    start = time.perf_counter()
+    queries = fn()
+    return queries, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'page':<8}{'rows':>8}{'per-row queries':>17}{'per-row ms':>12}{'bulk queries':>14}{'bulk ms':>10}")
+    for users, venues in ((500, 20), (2000, 80), (8000, 320)):
+        build_database(temp_database_path(), venues=venues, users=users, bookings=args.bookings)
+        for page, rows, per_row, bulk in (
+            ("users", users, users_page_per_row, users_page_bulk),
+            ("venues", venues, venues_page_per_row, venues_page_bulk),
+        ):
+            bulk()  # Warm the page cache so both variants read from memory
+            old_queries, old_ms = timed(per_row)
+            new_queries, new_ms = timed(bulk)
+            print(f"{page:<8}{rows:>8}{old_queries:>17}{old_ms:>12.1f}{new_queries:>14}{new_ms:>10.1f}")
+
+    db_manager.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cold-start time of the application, from process creation to the painted login window.
+
+Launches main.py repeatedly with UCVBM_STARTUP_PROFILE set, so each run
+reports its start-up phases (see startup_profile.py) and exits. Prints the
+median of each phase, flags runs over the budget, and lists the slowest
+imports of one extra run under ``python -X importtime``. Run from the
+repository root:
+
+    python -m benchmarks.bench_startup [--runs 10] [--budget-ms 1500] [--output results.json]
+
+Needs an X display; on a headless machine it starts itself under xvfb-run.
+Every run works on a copy of db/ and assets/ in a temporary directory.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import startup_profile
+from benchmarks.bench_db_manager import RESULTS_DIR, current_commit
+from benchmarks.bench_gui import display_prefix
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOP_IMPORTS = 15
+
+
+def launch(prefix, workdir, budget_ms, importtime=False):
+    """Start the application once and return its start-up report (and -X importtime output)."""
+    report_path = os.path.join(workdir, "startup.json")
+    env = dict(os.environ, UCVBM_STARTUP_PROFILE=report_path, UCVBM_STARTUP_EXIT="1",
+               UCVBM_STARTUP_BUDGET_MS=str(budget_ms))
+    command = prefix + [sys.executable] + (["-X", "importtime"] if importtime else []) + \
+        [os.path.join(REPO_DIR, "main.py")]
+    completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    with open(report_path, encoding="utf-8") as f:
+        return json.load(f), completed.stderr
+
+
+def slowest_imports(importtime_output, count=TOP_IMPORTS):
+    """Return (cumulative ms, module) of the slowest top-level imports in ``-X importtime`` output."""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # Top-level imports only; nested ones are part of their cumulative time
+            imports.append((int(cumulative) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=startup_profile.DEFAULT_BUDGET_MS)
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/startup-<commit>.json)")
+    args = parser.parse_args()
+
+    prefix = display_prefix()
+    commit = current_commit()
+    workdir = tempfile.mkdtemp(prefix="ucvbm-startup-")
+    shutil.copytree(os.path.join(REPO_DIR, "db"), os.path.join(workdir, "db"))
+    shutil.copytree(os.path.join(REPO_DIR, "assets"), os.path.join(workdir, "assets"))
+
+    launch(prefix, workdir, args.budget_ms)  # Migrates the copied database so every measured run finds it current
+    reports = [launch(prefix, workdir, args.budget_ms)[0] for _ in range(args.runs)]
+    _, importtime = launch(prefix, workdir, args.budget_ms, importtime=True)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    phases = {}
+    for report in reports:
+        for phase in report["phases"]:
+            phases.setdefault(phase["phase"], []).append(phase["ms"])
+    totals = [report["total_ms"] for report in reports]
+    over = sum(not report["within_budget"] for report in reports)
+
+    print(f"{'phase':<20}{'median ms':>10}{'max ms':>10}")
+    for phase, samples in phases.items():
+        print(f"{phase:<20}{statistics.median(samples):>10.1f}{max(samples):>10.1f}")
+    print(f"{'total':<20}{statistics.median(totals):>10.1f}{max(totals):>10.1f}  "
+          f"budget {args.budget_ms:.0f} ms, {over}/{len(reports)} runs over")
+    imports = slowest_imports(importtime)
+    print("\nSlowest imports (cumulative ms):")
+    for ms, name in imports:
+        print(f"{ms:>10.1f}  {name}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "budget_ms": args.budget_ms,
+            "runs": reports,
+            "median_total_ms": statistics.median(totals),
+            "runs_over_budget": over,
+            "slowest_imports": [{"module": name, "cumulative_ms": ms} for ms, name in imports],
+        }, f, indent=2)
+    print(f"Results written to {output}")
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Build time and memory of a list page: one widget set per row vs. the recycling VirtualList.
+
+Needs a display (use xvfb-run on a headless machine). Run from the repository root:
+
+    python -m benchmarks.bench_virtual_list [--rows 100 1000 10000]
+
+Each measurement runs in a fresh subprocess so its RSS is not inflated by earlier runs.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tkinter as tk
+
+import customtkinter as ctk
+
+from benchmarks.common import count_widgets, rss_mb
+from gui.common.virtual_list import VirtualList
+
+ROW_HEIGHT = 100
+
+
+def make_items(count):
+    return [(i, f"student{i}", i % 7, i % 3) for i in range(count)]
+
+
+def details(item):
+    return f"Username: {item[1]}\nTotal Bookings: {item[2]}\nTotal Denied: {item[3]}"
+
+
+def build_naive(root, items):
+    """The old pattern: a CTkScrollableFrame holding a frame, label and button per item."""
+    frame = ctk.CTkScrollableFrame(root, fg_color="white")
+    frame.pack(fill="both", expand=True)
+    for item in items:
+        row = ctk.CTkFrame(frame, fg_color="#f8f9fa", corner_radius=10)
+        row.pack(pady=10, padx=20, fill="x", expand=True)
+        ctk.CTkLabel(row, text=details(item), justify="left").pack(side="left", padx=10)
+        ctk.CTkButton(row, text="Delete", fg_color="#d9534f").pack(side="right", padx=10)
+
+
+def build_virtual(root, items):
+    def create_row(parent):
+        row = ctk.CTkFrame(parent, fg_color="#f8f9fa", corner_radius=10)
+        row.label = ctk.CTkLabel(row, text="", justify="left")
+        row.label.pack(side="left", padx=10)
+        ctk.CTkButton(row, text="Delete", fg_color="#d9534f").pack(side="right", padx=10)
+        return row
+
+    def bind_row(row, item):
+        row.label.configure(text=details(item))
+
+    virtual_list = VirtualList(root, row_height=ROW_HEIGHT, create_row=create_row, bind_row=bind_row)
+    virtual_list.pack(fill="both", expand=True)
+    virtual_list.set_items(items)
+
+
+def measure(impl, rows):
+    """Build one list in this process and return its measurements."""
+    root = tk.Tk()
+    root.geometry("1200x800")
+    root.update()
+    items = make_items(rows)
+    baseline = rss_mb()
+
+    start = time.perf_counter()
+    (build_virtual if impl == "virtual" else build_naive)(root, items)
+    root.update()  # Include geometry management and the first paint
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "impl": impl,
+        "rows": rows,
+        "build_ms": elapsed * 1000,
+        "rss_delta_mb": rss_mb() - baseline,
+        "widgets": count_widgets(root),
+    }
+    root.destroy()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--impl", choices=("naive", "virtual"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.impl:
+        # Child process: a single measurement, reported as JSON
+        print(json.dumps(measure(args.impl, args.rows[0])))
+        return
+
+    print(f"{'impl':<9}{'rows':>8}{'build ms':>12}{'RSS +MB':>10}{'widgets':>10}")
+    for rows in args.rows:
+        for impl in ("naive", "virtual"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_virtual_list", "--impl", impl, "--rows", str(rows)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{impl:<9}{rows:>8}{result['build_ms']:>12.1f}{result['rss_delta_mb']:>10.1f}{result['widgets']:>10}")
+
+
+if __name__ == "__main__":
+    main()
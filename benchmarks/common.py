@@ -0,0 +1,100 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks are run from the repository root as modules, e.g.
+``python -m benchmarks.bench_connections``, so that ``db_manager`` is importable.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import db_manager
+
+
+def use_database(path):
+    """Point db_manager at ``path`` and drop any pooled connections to the old file."""
+    db_manager.close_connections()
+    db_manager.DB_PATH = path
+
+
+def build_database(path, venues=20, users=2000, bookings=100_000, seed=42):
+    """Create a throwaway database at ``path`` filled with synthetic rows."""
+    if os.path.exists(path):
+        os.remove(path)
+    use_database(path)
+    db_manager.migrate_schema()
+
+    rng = random.Random(seed)
+    with db_manager.write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO venues (venue_name, location, capacity, image) VALUES (?, ?, ?, ?)",
+            [(f"Venue {i}", "Location not specified", 0, "") for i in range(venues)],
+        )
+        cursor.executemany(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            [(f"student{i}", "password") for i in range(users)],
+        )
+        rows = []
+        for i in range(bookings):
+            day = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            hour = rng.randint(7, 18)
+            venue_id = rng.randint(1, venues)
+            time_range = f"{day} {hour:02d}:00 - {day} {hour + 2:02d}:00"
+            status = rng.choice((0, 0, 1, 1, 1, -1, -2))
+            start_ts, end_ts = db_manager.parse_time_range(time_range)
+            rows.append((rng.randint(2, users + 1), venue_id, day, time_range, "Synthetic purpose", f"Event {i}",
+                         status, start_ts, end_ts))
+        # Synthetic approvals may overlap; they are inserted as-is, as an import of historical data would be
+        cursor.executemany(
+            """INSERT INTO bookings (user_id, venue_id, booking_date, time_range, purpose, event_name, is_approved,
+                                     start_ts, end_ts)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        conn.commit()
+
+
+def temp_database_path(name="bench.db"):
+    """Return a path for a benchmark database inside a fresh temporary directory."""
+    return os.path.join(tempfile.mkdtemp(prefix="ucvbm-bench-"), name)
+
+
+def time_calls(fn, repeat):
+    """Call ``fn`` ``repeat`` times and return the per-call latencies in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def rss_mb():
+    """Resident set size of this process in MB."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        with open(f"/proc/{os.getpid()}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def count_widgets(widget):
+    """Number of Tk widgets in the tree rooted at ``widget``."""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def summarize(samples):
+    """Return mean/p50/p95/p99 of a list of millisecond samples."""
+    ordered = sorted(samples)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+    }
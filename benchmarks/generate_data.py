@@ -0,0 +1,158 @@
+"""Seeded generator of synthetic campus databases at several scales.
+
+The same scale and seed always produce the same database. Run from the
+repository root:
+
+    python -m benchmarks.generate_data --scale small --output /tmp/campus-small.db
+
+Bookings span one academic year. Weekdays and daytime hours are busier than
+weekends and evenings; bookings before the reference date have mostly been
+decided (approved, denied or canceled), while later ones are mostly pending.
+Approved bookings never overlap at a venue, as the application guarantees.
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import db_manager
+from benchmarks.common import use_database
+
+# name -> (venues, users, bookings)
+SCALES = {
+    "tiny": (10, 500, 10_000),
+    "small": (50, 5_000, 100_000),
+    "medium": (200, 20_000, 1_000_000),
+    "large": (500, 50_000, 5_000_000),
+}
+DEFAULT_SEED = 42
+
+YEAR_START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+YEAR_DAYS = 365
+REFERENCE_DATE = datetime(2026, 1, 15, tzinfo=timezone.utc)  # "Today" as far as booking statuses go
+INSERT_BATCH_SIZE = 50_000  # Bookings per transaction
+
+WEEKDAY_WEIGHTS = (5, 5, 5, 5, 4, 2, 1)  # Monday .. Sunday
+START_HOUR_WEIGHTS = {7: 2, 8: 5, 9: 8, 10: 9, 11: 8, 12: 5, 13: 8, 14: 9, 15: 8, 16: 6, 17: 4, 18: 3, 19: 2, 20: 1}
+DURATION_WEIGHTS = {1: 4, 2: 5, 3: 2, 4: 1}  # Hours
+PAST_STATUS_WEIGHTS = {1: 70, -1: 15, -2: 10, 0: 5}
+FUTURE_STATUS_WEIGHTS = {0: 55, 1: 35, -1: 5, -2: 5}
+PURPOSES = ("Org meeting", "Seminar", "Review session", "Thesis defense", "Practice", "Assembly", "Workshop")
+EQUIPMENT = ("Projector", "Sound System", "Whiteboard", "Air Conditioning", "Stage", "Wi-Fi", "Microphone")
+
+
+def _sampler(rng, population, weights):
+    """Return a function drawing one item of ``population``; cumulative weights keep each draw O(log n)."""
+    population = list(population)
+    cum_weights = list(itertools.accumulate(weights))
+    return lambda: rng.choices(population, cum_weights=cum_weights)[0]
+
+
+def generate_database(path, venues, users, bookings, seed=DEFAULT_SEED, progress=False):
+    """Create a database at ``path`` with the given row counts, deterministically from ``seed``."""
+    if os.path.exists(path):
+        os.remove(path)
+    use_database(path)
+    db_manager.migrate_schema()
+    rng = random.Random(seed)
+
+    with db_manager.write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO venues (venue_name, location, capacity, image) VALUES (?, ?, ?, ?)",
+            [(f"Venue {i}", f"Building {i % 20 + 1}", rng.choice((20, 40, 60, 120, 300, 800)), "")
+             for i in range(1, venues + 1)],
+        )
+        cursor.executemany(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            [(f"student{i}", "password") for i in range(1, users + 1)],
+        )
+        cursor.execute("SELECT venue_id FROM venues ORDER BY venue_id")
+        venue_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT user_id FROM users WHERE is_admin = 0 ORDER BY user_id")
+        user_ids = [row[0] for row in cursor.fetchall()]
+
+    # Days of the year weighted by weekday; busy students book far more than others
+    days = [YEAR_START + timedelta(days=i) for i in range(YEAR_DAYS)]
+    pick_day = _sampler(rng, range(YEAR_DAYS), [WEEKDAY_WEIGHTS[day.weekday()] for day in days])
+    pick_user = _sampler(rng, user_ids, [1 / (rank + 1) ** 0.5 for rank in range(len(user_ids))])
+    pick_hour = _sampler(rng, START_HOUR_WEIGHTS, START_HOUR_WEIGHTS.values())
+    pick_duration = _sampler(rng, DURATION_WEIGHTS, DURATION_WEIGHTS.values())
+    pick_past_status = _sampler(rng, PAST_STATUS_WEIGHTS, PAST_STATUS_WEIGHTS.values())
+    pick_future_status = _sampler(rng, FUTURE_STATUS_WEIGHTS, FUTURE_STATUS_WEIGHTS.values())
+    occupied = {}  # (venue_id, day index) -> set of approved hours
+
+    started = time.perf_counter()
+    created = 0
+    while created < bookings:
+        rows = []
+        for _ in range(min(INSERT_BATCH_SIZE, bookings - created)):
+            day_index = pick_day()
+            day = days[day_index]
+            hour = pick_hour()
+            duration = min(pick_duration(), 23 - hour)
+            venue_id = rng.choice(venue_ids)
+            user_id = pick_user()
+
+            status = pick_past_status() if day < REFERENCE_DATE else pick_future_status()
+            if status == 1:
+                hours = occupied.setdefault((venue_id, day_index), set())
+                wanted = set(range(hour, hour + duration))
+                if hours & wanted:
+                    status = -1 if day < REFERENCE_DATE else 0  # The slot was taken: denied, or still waiting
+                else:
+                    hours |= wanted
+
+            start = day + timedelta(hours=hour)
+            end = start + timedelta(hours=duration)
+            time_range = f"{start.strftime(db_manager.TIME_FORMAT)} - {end.strftime(db_manager.TIME_FORMAT)}"
+            rows.append((user_id, venue_id, day.strftime("%Y-%m-%d"), time_range, rng.choice(PURPOSES),
+                         f"Event {created + len(rows) + 1}", status, int(start.timestamp()), int(end.timestamp())))
+
+        with db_manager.write_connection() as conn:
+            conn.executemany(
+                """INSERT INTO bookings (user_id, venue_id, booking_date, time_range, purpose, event_name,
+                                         is_approved, start_ts, end_ts)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+        created += len(rows)
+        if progress:
+            rate = created / (time.perf_counter() - started)
+            print(f"  {created:,}/{bookings:,} bookings ({rate:,.0f} rows/s)")
+
+    # Equipment last, so adding it did not change the bookings drawn for a seed
+    with db_manager.write_connection() as conn:
+        conn.executemany("INSERT INTO equipment (name) VALUES (?)", [(tag,) for tag in EQUIPMENT])
+        tag_ids = [row[0] for row in conn.execute("SELECT tag_id FROM equipment ORDER BY tag_id")]
+        conn.executemany(
+            "INSERT INTO venue_equipment (venue_id, tag_id) VALUES (?, ?)",
+            [(venue_id, tag_id) for venue_id in venue_ids for tag_id in rng.sample(tag_ids, rng.randint(0, 4))],
+        )
+
+
+def generate_scale(path, scale, seed=DEFAULT_SEED, progress=False):
+    """Create a database at ``path`` at one of the named SCALES."""
+    venues, users, bookings = SCALES[scale]
+    generate_database(path, venues, users, bookings, seed, progress)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", required=True, help="Path of the database file to create")
+    args = parser.parse_args()
+
+    venues, users, bookings = SCALES[args.scale]
+    print(f"Generating {args.scale}: {venues} venues, {users:,} users, {bookings:,} bookings -> {args.output}")
+    started = time.perf_counter()
+    generate_scale(args.output, args.scale, args.seed, progress=True)
+    db_manager.close_connections()
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Streaming export of bookings to CSV and iCalendar (.ics).
+
+Rows come from db_manager.iter_bookings(), which reads them in batches from
+one open cursor, and each stage below is a generator: rows become lines,
+lines are written as they are produced. Memory therefore stays flat whether
+a venue has ten bookings or the whole campus has a million.
+
+Filters are pushed into SQL: ``status`` (a BOOKING_STATUS code), ``venue_id``,
+``user_id`` and a ``date_from``/``date_to`` window in epoch seconds (bookings
+overlapping it are kept). ``progress``, when given, is called with the
+number of bookings written so far every PROGRESS_ROWS bookings. Export from
+the command line with:
+
+    python -m booking_export bookings.csv [--status Approved] [--venue-id 3] [--from 2025-01-01] [--to 2025-02-01]
+"""
+import argparse
+import csv
+import os
+from datetime import datetime, timezone
+
+import db_manager
+
+CSV_COLUMNS = (
+    "booking_id", "venue_id", "venue_name", "username", "event_name", "purpose", "time_range", "is_approved",
+)
+ICS_COLUMNS = (
+    "booking_id", "venue_name", "location", "username", "event_name", "purpose", "is_approved", "start_ts", "end_ts",
+)
+STATUS_NAMES = {code: name for name, code in db_manager.BOOKING_STATUS.items()}
+ICS_LINE_OCTETS = 75  # RFC 5545 line length limit, excluding the CRLF
+ICS_DATE_FORMAT = "%Y%m%dT%H%M%S"  # Floating local time: bookings are wall-clock campus times
+PRODID = "-//UC Venue Booking Management//Bookings Export//EN"
+EXPORT_FORMATS = {".csv": "CSV", ".ics": "iCalendar"}
+PROGRESS_ROWS = 10_000  # Bookings written between two progress() calls
+
+
+def export_bookings(path, progress=None, **filters):
+    """Export to CSV or iCalendar depending on the extension of ``path``; returns the booking count."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return export_csv(path, progress, **filters)
+    if extension == ".ics":
+        return export_ics(path, progress=progress, **filters)
+    raise ValueError(f"Unsupported export format: {extension or path!r}")
+
+
+def export_csv(path, progress=None, **filters):
+    """Write the matching bookings to ``path`` as CSV; returns how many were written."""
+    rows = db_manager.iter_bookings(columns=CSV_COLUMNS, **filters)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS[:-1] + ("status",))
+        for row in rows:
+            writer.writerow(row[:-1] + (STATUS_NAMES.get(row[-1], row[-1]),))
+            count += 1
+            if progress and count % PROGRESS_ROWS == 0:
+                progress(count)
+    return count
+
+
+def export_ics(path, calendar_name="UC Venue Bookings", progress=None, **filters):
+    """Write the matching bookings to ``path`` as an iCalendar file; returns how many were written."""
+    rows = db_manager.iter_bookings(columns=ICS_COLUMNS, **filters)
+    counter = _Counter(rows, progress)
+    # newline="" keeps the CRLF line endings iCalendar requires on every platform
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.writelines(fold(line) + "\r\n" for line in calendar_lines(counter, calendar_name))
+    return counter.count
+
+
+def calendar_lines(rows, calendar_name):
+    """Yield the unfolded lines of a VCALENDAR holding one VEVENT per booking row (ICS_COLUMNS)."""
+    stamp = datetime.now(timezone.utc).strftime(ICS_DATE_FORMAT) + "Z"
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield f"PRODID:{PRODID}"
+    yield "CALSCALE:GREGORIAN"
+    yield f"X-WR-CALNAME:{escape_text(calendar_name)}"
+    for row in rows:
+        yield from event_lines(row, stamp)
+    yield "END:VCALENDAR"
+
+
+def event_lines(row, stamp):
+    """Yield the lines of one VEVENT."""
+    booking_id, venue_name, location, username, event_name, purpose, status, start_ts, end_ts = row
+    if start_ts is None or end_ts is None:
+        return  # Bookings with an unparseable time range have no place on a calendar
+    details = [f"Purpose: {purpose}", f"Status: {STATUS_NAMES.get(status, status)}"]
+    if username:
+        details.append(f"Booked by: {username}")
+    yield "BEGIN:VEVENT"
+    yield f"UID:booking-{booking_id}@ucvbm"
+    yield f"DTSTAMP:{stamp}"
+    yield f"DTSTART:{_local_time(start_ts)}"
+    yield f"DTEND:{_local_time(end_ts)}"
+    yield f"SUMMARY:{escape_text(event_name)}"
+    yield f"DESCRIPTION:{escape_text(chr(10).join(details))}"
+    yield f"LOCATION:{escape_text(', '.join(part for part in (venue_name, location) if part))}"
+    yield f"STATUS:{'CONFIRMED' if status == db_manager.BOOKING_STATUS['Approved'] else 'TENTATIVE'}"
+    yield "END:VEVENT"
+
+
+def escape_text(value):
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)."""
+    text = "" if value is None else str(value)
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold(line):
+    """Fold ``line`` into chunks of at most ICS_LINE_OCTETS UTF-8 octets, without splitting a character."""
+    if len(line.encode("utf-8")) <= ICS_LINE_OCTETS:
+        return line
+    chunks = []
+    current, size, limit = [], 0, ICS_LINE_OCTETS
+    for char in line:
+        octets = len(char.encode("utf-8"))
+        if size + octets > limit:
+            chunks.append("".join(current))
+            current, size, limit = [], 0, ICS_LINE_OCTETS - 1  # Continuation lines start with a space
+        current.append(char)
+        size += octets
+    chunks.append("".join(current))
+    return "\r\n ".join(chunks)
+
+
+def _local_time(timestamp):
+    # start_ts/end_ts encode the campus wall-clock time as if it were UTC (see parse_time_range)
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(ICS_DATE_FORMAT)
+
+
+class _Counter:
+    """Pass rows through while counting them, so a streamed export can report its size."""
+
+    def __init__(self, rows, progress=None):
+        self.rows = rows
+        self.progress = progress
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            if row[-2] is not None and row[-1] is not None:  # Rows event_lines() skips are not counted
+                self.count += 1
+                if self.progress and self.count % PROGRESS_ROWS == 0:
+                    self.progress(self.count)
+            yield row
+
+
+def _epoch(date_text):
+    return int(datetime.strptime(date_text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export bookings to CSV or iCalendar.")
+    parser.add_argument("path", help="Output file; the extension (.csv or .ics) picks the format")
+    parser.add_argument("--status", choices=sorted(db_manager.BOOKING_STATUS))
+    parser.add_argument("--venue-id", type=int)
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--from", dest="date_from", type=_epoch, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--to", dest="date_to", type=_epoch, help="YYYY-MM-DD, exclusive")
+    args = parser.parse_args()
+
+    db_manager.migrate_schema()
+    status = db_manager.BOOKING_STATUS[args.status] if args.status else None
+    count = export_bookings(args.path, status=status, venue_id=args.venue_id, user_id=args.user_id,
+                            date_from=args.date_from, date_to=args.date_to)
+    print(f"Exported {count} bookings to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
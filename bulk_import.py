@@ -0,0 +1,236 @@
+"""Bulk import of users, venues and historical bookings from CSV files.
+
+Each file is read and validated in one streaming pass. Valid rows are
+inserted with executemany() in transactions of IMPORT_CHUNK_SIZE rows, and
+the write lock is released between chunks, so the application stays usable
+during a long import. A bad row never aborts the import: it is written to a
+reject file (the input's columns plus ``line`` and ``error``) that can be
+fixed and imported again as it is.
+
+Expected columns (a header row is required; extra columns are ignored):
+
+- users: username, password, is_admin (optional: 1/0, yes/no, true/false)
+- venues: venue_name, image (path to a .png/.jpg/.jpeg that exists), and
+  optionally location, capacity and equipment (tags separated by ";")
+- bookings: username, venue_name, time_range ("YYYY-MM-DD HH:MM - YYYY-MM-DD HH:MM"),
+  and optionally purpose, event_name, status (Pending, Approved, Denied or
+  Canceled; default Approved) and booking_date. The CSV written by
+  booking_export has these columns, so exports can be imported elsewhere.
+
+Large booking loads drop the secondary indexes of the bookings table and
+rebuild them once at the end, which is much cheaper than updating them row
+by row. Run from the repository root:
+
+    python -m bulk_import users students.csv [--rejects rejected.csv]
+    python -m bulk_import bookings history.csv [--rebuild-indexes | --keep-indexes]
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+
+import db_manager
+
+IMPORT_CHUNK_SIZE = 5000  # Rows inserted per transaction
+REBUILD_INDEXES_MIN_ROWS = 100_000  # Smallest booking load worth dropping and rebuilding indexes for
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+TRUE_VALUES = ("1", "yes", "true", "y")
+FALSE_VALUES = ("", "0", "no", "false", "n")
+STATUS_CODES = {name.lower(): code for name, code in db_manager.BOOKING_STATUS.items()}
+
+
+def _field(record, name, required=True):
+    value = (record.get(name) or "").strip()
+    if required and not value:
+        raise ValueError(f"Missing {name}")
+    return value
+
+
+def parse_user(record):
+    """Validate a users CSV record and return the row for db_manager.import_users()."""
+    username = _field(record, "username")
+    password = _field(record, "password")
+    is_admin = _field(record, "is_admin", required=False).lower()
+    if is_admin not in TRUE_VALUES + FALSE_VALUES:
+        raise ValueError(f"Invalid is_admin: {is_admin!r}")
+    return username, password, int(is_admin in TRUE_VALUES)
+
+
+def parse_venue(record):
+    """Validate a venues CSV record and return the row for db_manager.import_venues()."""
+    venue_name = _field(record, "venue_name")
+    image = _field(record, "image")
+    if not image.lower().endswith(IMAGE_EXTENSIONS) or not os.path.isfile(image):
+        raise ValueError(f"Image not found or not a PNG/JPEG file: {image}")
+    capacity = _field(record, "capacity", required=False) or "0"
+    if not capacity.isdigit():
+        raise ValueError(f"Capacity must be a whole number: {capacity!r}")
+    location = _field(record, "location", required=False)
+    equipment = _field(record, "equipment", required=False).split(";")
+    return venue_name, location, int(capacity), image, equipment
+
+
+def parse_booking(record):
+    """Validate a bookings CSV record and return the row for db_manager.import_bookings()."""
+    username = _field(record, "username")
+    venue_name = _field(record, "venue_name")
+    time_range = _field(record, "time_range")
+    start_ts, end_ts = db_manager.parse_time_range(time_range)
+    if end_ts <= start_ts:
+        raise ValueError("End time must be after start time.")
+    status = _field(record, "status", required=False).lower() or "approved"
+    if status not in STATUS_CODES:
+        raise ValueError(f"Unknown status: {status!r}")
+    booking_date = _field(record, "booking_date", required=False)
+    if booking_date:
+        try:
+            datetime.strptime(booking_date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"Invalid booking_date: {booking_date!r}")
+    else:
+        booking_date = time_range.strip()[:10]  # The day the booking starts
+    return (username, venue_name, booking_date, time_range, _field(record, "purpose", required=False),
+            _field(record, "event_name", required=False), STATUS_CODES[status], start_ts, end_ts)
+
+
+# kind -> (record parser, db_manager function importing a chunk, table)
+KINDS = {
+    "users": (parse_user, "import_users", "users"),
+    "venues": (parse_venue, "import_venues", "venues"),
+    "bookings": (parse_booking, "import_bookings", "bookings"),
+}
+
+
+class _Rejects:
+    """Reject file, opened on the first rejected row."""
+
+    def __init__(self, path, fieldnames):
+        self.path = path
+        self.fieldnames = list(dict.fromkeys(list(fieldnames) + ["line", "error"]))  # A reject file may be re-imported
+        self.file = None
+        self.writer = None
+        self.count = 0
+
+    def add(self, record, line, error):
+        if self.writer is None:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+            self.writer = csv.DictWriter(self.file, self.fieldnames, extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerow(dict(record, line=line, error=error))
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def _import_chunk(import_chunk, chunk, rejects):
+    """Insert one chunk of parsed rows, send the ones the database refused to ``rejects``; returns how many went in."""
+    rejected = import_chunk([row for _, _, row in chunk])
+    for i, error in rejected.items():
+        record, line, _ = chunk[i]
+        rejects.add(record, line, error)
+    return len(chunk) - len(rejected)
+
+
+def _count_rows(path):
+    """Data rows in a CSV file, counted from its line breaks (a quoted field spanning lines counts extra)."""
+    with open(path, "rb") as f:
+        lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    return max(lines - 1, 0)
+
+
+def should_rebuild_indexes(kind, path):
+    """Whether dropping and rebuilding the table's indexes beats maintaining them for this file.
+
+    Rebuilding sorts the whole table again, so it only pays off when the file
+    is large and at least as big as what the table already holds.
+    """
+    if kind != "bookings":
+        return False  # Users and venues only have the indexes behind their UNIQUE names
+    rows = _count_rows(path)
+    return rows >= max(REBUILD_INDEXES_MIN_ROWS, db_manager.get_row_count("bookings"))
+
+
+def import_csv(kind, path, rejects_path=None, rebuild_indexes=None, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """Import the CSV file at ``path`` as ``kind`` ("users", "venues" or "bookings").
+
+    Rejected rows go to ``rejects_path`` (default: <input>.rejects.csv, written
+    only when there are any). ``rebuild_indexes`` None decides from the file
+    size (see should_rebuild_indexes()). ``progress`` is called with
+    (rows read, rows imported, seconds) after every chunk. Returns a dict with
+    the ``imported``, ``rejected`` and ``rows_per_second`` figures, the
+    ``seconds`` taken and the ``rejects_path``.
+    """
+    parse, importer, table = KINDS[kind]
+    import_chunk = getattr(db_manager, importer)  # Looked up now, so db_trace sees the call
+    rejects_path = rejects_path or os.path.splitext(path)[0] + ".rejects.csv"
+    if rebuild_indexes is None:
+        rebuild_indexes = should_rebuild_indexes(kind, path)
+
+    started = time.perf_counter()
+    read = imported = 0
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        rejects = _Rejects(rejects_path, reader.fieldnames or [])
+        if rebuild_indexes:
+            db_manager.drop_indexes(table)
+        try:
+            chunk = []  # (record, line number, parsed row)
+            for record in reader:
+                read += 1
+                try:
+                    chunk.append((record, reader.line_num, parse(record)))
+                except ValueError as e:
+                    rejects.add(record, reader.line_num, str(e))
+                    continue
+                if len(chunk) >= chunk_size:
+                    imported += _import_chunk(import_chunk, chunk, rejects)
+                    chunk = []
+                    if progress:
+                        progress(read, imported, time.perf_counter() - started)
+            if chunk:
+                imported += _import_chunk(import_chunk, chunk, rejects)
+        finally:
+            rejects.close()
+            if rebuild_indexes:
+                db_manager.restore_indexes()
+
+    seconds = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "rejected": rejects.count,
+        "seconds": seconds,
+        "rows_per_second": read / seconds if seconds else 0.0,
+        "rejects_path": rejects_path if rejects.count else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("path", help="CSV file with a header row")
+    parser.add_argument("--rejects", help="Where to write rejected rows (default: <path>.rejects.csv)")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows per transaction")
+    indexes = parser.add_mutually_exclusive_group()
+    indexes.add_argument("--rebuild-indexes", action="store_true", default=None,
+                         help="Drop the table's indexes during the load and rebuild them at the end")
+    indexes.add_argument("--keep-indexes", dest="rebuild_indexes", action="store_false",
+                         help="Maintain the indexes row by row (default for small loads)")
+    args = parser.parse_args()
+
+    db_manager.migrate_schema()
+    result = import_csv(
+        args.kind, args.path, args.rejects, args.rebuild_indexes, args.chunk_size,
+        progress=lambda read, imported, seconds: print(f"  {read:,} rows read, {imported:,} imported "
+                                                       f"({read / seconds:,.0f} rows/s)"),
+    )
+    print(f"Imported {result['imported']:,} {args.kind}, rejected {result['rejected']:,} "
+          f"in {result['seconds']:.1f} s ({result['rows_per_second']:,.0f} rows/s)")
+    if result["rejects_path"]:
+        print(f"Rejected rows written to {result['rejects_path']}")
+
+
+if __name__ == "__main__":
+    main()
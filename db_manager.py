@@ -1,63 +1,547 @@
+import bisect
 import os
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import db_trace
 
 DB_PATH = 'db/venue_booking.db'
 
+# Connection settings, applied once when a pooled connection is opened
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16384  # 16 MB page cache per connection
+MMAP_SIZE = 256 * 1024 * 1024
+
+_local = threading.local()  # Per-thread read-only connection
+_pool_lock = threading.Lock()
+_write_lock = threading.RLock()  # Serializes every write through the single writer
+_writer = None
+_readers = []  # Every reader handed out, so close_connections() can reach them
+_generation = 0  # Bumped by close_connections() to retire stale per-thread readers
+
+_catalog_lock = threading.Lock()
+_catalog = None  # Cached venue catalog: {"version", "venues", "by_id"}, or None until loaded
+_catalog_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"  # Format of each half of a booking's time_range
+_PADDED_TIME = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}")  # TIME_FORMAT as the app writes it
+
+
+class BookingConflictError(ValueError):
+    """Raised when a booking overlaps approved bookings for the same venue."""
+
+    def __init__(self, booking_ids):
+        self.booking_ids = list(booking_ids)
+        ids = ", ".join(str(booking_id) for booking_id in self.booking_ids)
+        super().__init__(f"The venue is already booked for that time (conflicts with booking ID(s): {ids})")
+
 
 def connect_db():
-    """Connect to the SQLite database."""
-    if not os.path.exists('db'):
-        os.makedirs('db')  # Ensure the 'db' directory exists
-    return sqlite3.connect(DB_PATH)
-
-
-def create_tables():
-    """Create tables for users, venues, and bookings."""
-    with connect_db() as conn:
-        cursor = conn.cursor()
-
-        # Users table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            is_admin INTEGER DEFAULT 0
-        )''')
-
-        # Venues table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS venues (
-            venue_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            venue_name TEXT UNIQUE NOT NULL,
-            location TEXT DEFAULT '',
-            capacity INTEGER DEFAULT 0,
-            image TEXT DEFAULT ''
-        )''')
-
-        # Bookings table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS bookings (
-            booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            venue_id INTEGER,
-            booking_date TEXT,
-            time_range TEXT,
-            purpose TEXT,
-            event_name TEXT,
-            is_approved INTEGER DEFAULT 0,
-            FOREIGN KEY (user_id) REFERENCES users (user_id),
-            FOREIGN KEY (venue_id) REFERENCES venues (venue_id)
-        )''')
-
-        # Default admin account
-        cursor.execute('''INSERT OR IGNORE INTO users (username, password, is_admin)
-                          VALUES ('admin', 'admin', 1)''')
-        conn.commit()
+    """Open a new connection to the SQLite database with the shared pragmas applied."""
+    db_dir = os.path.dirname(DB_PATH)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir)  # Ensure the 'db' directory exists
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                           factory=db_trace.connection_factory())
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    return conn
+
+
+def _get_writer():
+    global _writer
+    with _pool_lock:
+        if _writer is None:
+            _writer = connect_db()
+            _writer.isolation_level = "IMMEDIATE"  # Take the write lock up front instead of on first UPDATE
+        return _writer
+
+
+def _get_reader():
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.generation == _generation:
+        return conn
+    _get_writer()  # The writer creates the file and switches it to WAL before any reader attaches
+    conn = connect_db()
+    conn.execute("PRAGMA query_only=ON")
+    with _pool_lock:
+        _readers.append(conn)
+        _local.conn = conn
+        _local.generation = _generation
+    return conn
+
+
+@contextmanager
+def read_connection():
+    """Yield this thread's long-lived read-only connection."""
+    yield _get_reader()
+
+
+@contextmanager
+def write_connection():
+    """Yield the shared writer connection inside a transaction, one writer at a time.
+
+    The transaction takes the database write lock before the first statement,
+    so reads made in it (e.g. conflict checks) see nothing another process
+    could commit before the writes that depend on them.
+    """
+    with _write_lock:
+        conn = _get_writer()
+        with conn:  # Commits on success, rolls back on error
+            conn.execute("BEGIN IMMEDIATE")  # The IMMEDIATE isolation level only begins at the first DML statement
+            yield conn
+
+
+def close_connections():
+    """Close every pooled connection; the next call reopens them against DB_PATH."""
+    global _writer, _generation
+    with _write_lock, _pool_lock:
+        for conn in _readers:
+            conn.close()
+        _readers.clear()
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+        _generation += 1
+    _invalidate_venue_catalog()  # DB_PATH may point at another database from now on
+
+
+# Schema Migrations
+#
+# Each migration brings the schema from version N-1 to N, and PRAGMA user_version
+# records the last one applied. Row backfills run in chunks of MIGRATION_BATCH_SIZE,
+# each in its own short transaction, so a large database never holds the write
+# lock for long. A migration interrupted mid-backfill simply resumes on next start.
+
+MIGRATION_BATCH_SIZE = 5000
+
+
+def _create_base_tables(cursor):
+    """Version 1: users, venues and bookings, plus the default admin account."""
+    # Users table
+    cursor.execute('''CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        is_admin INTEGER DEFAULT 0
+    )''')
+
+    # Venues table
+    cursor.execute('''CREATE TABLE IF NOT EXISTS venues (
+        venue_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        venue_name TEXT UNIQUE NOT NULL,
+        location TEXT DEFAULT '',
+        capacity INTEGER DEFAULT 0,
+        image TEXT DEFAULT ''
+    )''')
+
+    # Bookings table
+    cursor.execute('''CREATE TABLE IF NOT EXISTS bookings (
+        booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        venue_id INTEGER,
+        booking_date TEXT,
+        time_range TEXT,
+        purpose TEXT,
+        event_name TEXT,
+        is_approved INTEGER DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users (user_id),
+        FOREIGN KEY (venue_id) REFERENCES venues (venue_id)
+    )''')
+
+    # Default admin account
+    cursor.execute('''INSERT OR IGNORE INTO users (username, password, is_admin)
+                      VALUES ('admin', 'admin', 1)''')
+
+
+def _create_booking_intervals(cursor):
+    """Version 2: R*Tree interval index of approved bookings."""
+    # One box per booking spanning (venue_id, venue_id) x (start, end). The R*Tree
+    # stores 32-bit floats, so the exact epochs are kept in auxiliary columns to
+    # re-check candidate boxes.
+    cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS booking_intervals USING rtree(
+        booking_id,
+        min_venue, max_venue,
+        min_ts, max_ts,
+        +start_ts INTEGER,
+        +end_ts INTEGER
+    )''')
+
+    # Drop bookings from the index once they are deleted or leave the approved state
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS bookings_intervals_delete
+        AFTER DELETE ON bookings
+        BEGIN
+            DELETE FROM booking_intervals WHERE booking_id = old.booking_id;
+        END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS bookings_intervals_unapprove
+        AFTER UPDATE OF is_approved ON bookings WHEN new.is_approved != 1
+        BEGIN
+            DELETE FROM booking_intervals WHERE booking_id = old.booking_id;
+        END''')
+
+
+def _index_approved_intervals(cursor, rows):
+    for booking_id, venue_id, time_range in rows:
+        try:
+            start_ts, end_ts = parse_time_range(time_range)
+        except ValueError:
+            continue
+        cursor.execute(
+            "INSERT OR REPLACE INTO booking_intervals VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (booking_id, venue_id, venue_id, start_ts, end_ts, start_ts, end_ts),
+        )
+
+
+def _add_typed_timestamps(cursor):
+    """Version 3: integer start_ts/end_ts columns on bookings."""
+    cursor.execute("PRAGMA table_info(bookings)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if "start_ts" not in columns:
+        cursor.execute("ALTER TABLE bookings ADD COLUMN start_ts INTEGER")
+    if "end_ts" not in columns:
+        cursor.execute("ALTER TABLE bookings ADD COLUMN end_ts INTEGER")
+
+    # From now on the interval index is maintained from the typed columns
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS bookings_intervals_approve
+        AFTER UPDATE OF is_approved ON bookings WHEN new.is_approved = 1 AND new.start_ts IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO booking_intervals
+            VALUES (new.booking_id, new.venue_id, new.venue_id, new.start_ts, new.end_ts, new.start_ts, new.end_ts);
+        END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS bookings_intervals_insert
+        AFTER INSERT ON bookings WHEN new.is_approved = 1 AND new.start_ts IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO booking_intervals
+            VALUES (new.booking_id, new.venue_id, new.venue_id, new.start_ts, new.end_ts, new.start_ts, new.end_ts);
+        END''')
+
+
+def _fill_typed_timestamps(cursor, rows):
+    updates = []
+    for booking_id, time_range in rows:
+        try:
+            updates.append(parse_time_range(time_range) + (booking_id,))
+        except ValueError:
+            continue  # Left NULL; such rows cannot take part in range queries
+    cursor.executemany("UPDATE bookings SET start_ts = ?, end_ts = ? WHERE booking_id = ?", updates)
+
+
+def _create_timestamp_indexes(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_venue_start ON bookings (venue_id, start_ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_status_start ON bookings (is_approved, start_ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user_status ON bookings (user_id, is_approved)")
+
+
+def _create_status_count_indexes(cursor):
+    """Version 4: covering index for per-venue status counts."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_venue_status ON bookings (venue_id, is_approved)")
+
+
+def _create_keyset_indexes(cursor):
+    """Version 5: index serving get_bookings(status=...) pages in booking ID order."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_status_id ON bookings (is_approved, booking_id)")
+
+
+def _create_booking_series(cursor):
+    """Version 6: recurring booking series and the series_id of each booking."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS booking_series (
+        series_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        venue_id INTEGER,
+        rule TEXT,
+        FOREIGN KEY (user_id) REFERENCES users (user_id),
+        FOREIGN KEY (venue_id) REFERENCES venues (venue_id)
+    )''')
+    cursor.execute("PRAGMA table_info(bookings)")
+    if "series_id" not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE bookings ADD COLUMN series_id INTEGER REFERENCES booking_series (series_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_series ON bookings (series_id, booking_id)")
+
+
+def _create_catalog_version(cursor):
+    """Version 7: a counter bumped by every change to venues, so caches can tell the catalog changed."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS catalog_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )''')
+    cursor.execute("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS venues_catalog_{event.lower()}
+            AFTER {event} ON venues
+            BEGIN
+                UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            END''')
+
+
+def _create_search_index(cursor):
+    """Version 8: FTS5 full-text indexes of bookings and venues."""
+    # Bookings are indexed with copies of their venue name and username, so a
+    # search needs no join until the matching rows are fetched. rowid is the
+    # booking_id (venue_id for venue_search).
+    cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS booking_search USING fts5(
+        event_name, purpose, venue_name, username,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )''')
+    # Relevance: BM25 weighting a hit in the event name above venue and purpose, and those above the username
+    cursor.execute("INSERT INTO booking_search (booking_search, rank) VALUES ('rank', 'bm25(4.0, 2.0, 2.0, 1.0)')")
+    cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS venue_search USING fts5(
+        venue_name, location,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )''')
+
+    index_booking = '''INSERT OR REPLACE INTO booking_search (rowid, event_name, purpose, venue_name, username)
+            SELECT new.booking_id, new.event_name, new.purpose,
+                   (SELECT venue_name FROM venues WHERE venue_id = new.venue_id),
+                   (SELECT username FROM users WHERE user_id = new.user_id);'''
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS bookings_search_insert
+        AFTER INSERT ON bookings
+        BEGIN
+            {index_booking}
+        END''')
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS bookings_search_update
+        AFTER UPDATE OF event_name, purpose, venue_id, user_id ON bookings
+        BEGIN
+            DELETE FROM booking_search WHERE rowid = old.booking_id;
+            {index_booking}
+        END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS bookings_search_delete
+        AFTER DELETE ON bookings
+        BEGIN
+            DELETE FROM booking_search WHERE rowid = old.booking_id;
+        END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS users_search_rename
+        AFTER UPDATE OF username ON users
+        BEGIN
+            UPDATE booking_search SET username = new.username
+            WHERE rowid IN (SELECT booking_id FROM bookings WHERE user_id = new.user_id);
+        END''')
+
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS venues_search_insert
+        AFTER INSERT ON venues
+        BEGIN
+            INSERT OR REPLACE INTO venue_search (rowid, venue_name, location)
+            VALUES (new.venue_id, new.venue_name, new.location);
+        END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS venues_search_update
+        AFTER UPDATE OF venue_name, location ON venues
+        BEGIN
+            DELETE FROM venue_search WHERE rowid = old.venue_id;
+            INSERT INTO venue_search (rowid, venue_name, location) VALUES (new.venue_id, new.venue_name, new.location);
+            UPDATE booking_search SET venue_name = new.venue_name
+            WHERE rowid IN (SELECT booking_id FROM bookings WHERE venue_id = new.venue_id);
+        END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS venues_search_delete
+        AFTER DELETE ON venues
+        BEGIN
+            DELETE FROM venue_search WHERE rowid = old.venue_id;
+        END''')
+    cursor.execute('''INSERT OR REPLACE INTO venue_search (rowid, venue_name, location)
+                      SELECT venue_id, venue_name, location FROM venues''')
+
+
+_SEARCH_BACKFILL_QUERY = '''SELECT b.booking_id, b.event_name, b.purpose, v.venue_name, u.username FROM bookings b
+           LEFT JOIN venues v ON v.venue_id = b.venue_id
+           LEFT JOIN users u ON u.user_id = b.user_id
+           WHERE b.booking_id > ? ORDER BY b.booking_id LIMIT ?'''
+
+
+def _index_booking_search(cursor, rows):
+    cursor.executemany(
+        """INSERT OR REPLACE INTO booking_search (rowid, event_name, purpose, venue_name, username)
+           VALUES (?, ?, ?, ?, ?)""",
+        rows,
+    )
+
+
+def _optimize_search_index(cursor):
+    # Merge the b-trees left by the chunked backfill into one, which keeps queries fast
+    cursor.execute("INSERT INTO booking_search (booking_search) VALUES ('optimize')")
+
+
+def _create_venue_equipment(cursor):
+    """Version 9: equipment tags of venues and the indexes the venue filters use."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS equipment (
+        tag_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL COLLATE NOCASE
+    )''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS venue_equipment (
+        venue_id INTEGER NOT NULL REFERENCES venues (venue_id),
+        tag_id INTEGER NOT NULL REFERENCES equipment (tag_id),
+        PRIMARY KEY (venue_id, tag_id)
+    ) WITHOUT ROWID''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_venue_equipment_tag ON venue_equipment (tag_id, venue_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_venues_capacity ON venues (capacity)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_venues_location ON venues (location, capacity)")
+
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS venues_equipment_delete
+        AFTER DELETE ON venues
+        BEGIN
+            DELETE FROM venue_equipment WHERE venue_id = old.venue_id;
+        END''')
+    # Tags are part of the cached venue catalog
+    for event in ("INSERT", "DELETE"):
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS venue_equipment_catalog_{event.lower()}
+            AFTER {event} ON venue_equipment
+            BEGIN
+                UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            END''')
+
+
+def _create_dropped_indexes(cursor):
+    """Version 10: the definitions of indexes dropped for a bulk import, until they are rebuilt."""
+    # Kept in the database so an import that dies before rebuilding them does
+    # not lose them: migrate_schema() recreates whatever is still listed here.
+    # reindex_after is set for the booking_search trigger: bookings after that
+    # ID were added without it and are indexed when it is restored.
+    cursor.execute('''CREATE TABLE IF NOT EXISTS dropped_indexes (
+        name TEXT PRIMARY KEY,
+        sql TEXT NOT NULL,
+        reindex_after INTEGER
+    )''')
+
+
+def _create_venue_renditions(cursor):
+    """Version 11: the pre-encoded renditions of each venue image (see image_ingest)."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS venue_renditions (
+        venue_id INTEGER NOT NULL REFERENCES venues (venue_id),
+        rendition TEXT NOT NULL,
+        path TEXT NOT NULL,
+        width INTEGER NOT NULL,
+        height INTEGER NOT NULL,
+        bytes INTEGER NOT NULL,
+        PRIMARY KEY (venue_id, rendition)
+    ) WITHOUT ROWID''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS venues_renditions_delete
+        AFTER DELETE ON venues
+        BEGIN
+            DELETE FROM venue_renditions WHERE venue_id = old.venue_id;
+        END''')
+
+
+# Ordered list of (schema step, backfill query, backfill step, finishing step) per version.
+# The backfill query selects rows by booking_id keyset: "WHERE ... booking_id > ? ... LIMIT ?".
+MIGRATIONS = [
+    (_create_base_tables, None, None, None),
+    (
+        _create_booking_intervals,
+        '''SELECT booking_id, venue_id, time_range FROM bookings
+           WHERE is_approved = 1 AND booking_id > ? ORDER BY booking_id LIMIT ?''',
+        _index_approved_intervals,
+        None,
+    ),
+    (
+        _add_typed_timestamps,
+        '''SELECT booking_id, time_range FROM bookings
+           WHERE start_ts IS NULL AND booking_id > ? ORDER BY booking_id LIMIT ?''',
+        _fill_typed_timestamps,
+        _create_timestamp_indexes,  # Built once after the backfill instead of maintained row by row
+    ),
+    (_create_status_count_indexes, None, None, None),
+    (_create_keyset_indexes, None, None, None),
+    (_create_booking_series, None, None, None),
+    (_create_catalog_version, None, None, None),
+    (
+        _create_search_index,
+        _SEARCH_BACKFILL_QUERY,
+        _index_booking_search,
+        _optimize_search_index,
+    ),
+    (_create_venue_equipment, None, None, None),
+    (_create_dropped_indexes, None, None, None),
+    (_create_venue_renditions, None, None, None),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+@contextmanager
+def _schema_transaction():
+    with write_connection() as conn:  # Which also wraps the DDL in its transaction
+        yield conn.cursor()
+
+
+def _backfill(query, apply_rows, last_id=0):
+    while True:
+        with _schema_transaction() as cursor:
+            cursor.execute(query, (last_id, MIGRATION_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            apply_rows(cursor, rows)
+        last_id = rows[-1][0]
+
+
+def get_schema_version():
+    """Return the schema version recorded in the database."""
+    with read_connection() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def get_data_version():
+    """Return a token that changes whenever anything is committed to the database, here or by another process."""
+    with read_connection() as conn:
+        # PRAGMA data_version counts commits made through other connections, the writer included
+        return _generation, conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def migrate_schema():
+    """Apply every migration the database has not seen yet."""
+    version = get_schema_version()
+    for number, (schema_step, query, backfill_step, finish_step) in enumerate(MIGRATIONS[version:], start=version + 1):
+        with _schema_transaction() as cursor:
+            schema_step(cursor)
+        if query:
+            _backfill(query, backfill_step)
+        with _schema_transaction() as cursor:
+            if finish_step:
+                finish_step(cursor)
+            cursor.execute(f"PRAGMA user_version = {number}")
+    restore_indexes()  # Any a bulk import dropped and did not get to rebuild
+
+
+def parse_time_range(time_range):
+    """Parse a 'YYYY-MM-DD HH:MM - YYYY-MM-DD HH:MM' time range into (start, end) epoch seconds."""
+    try:
+        start_text, end_text = time_range.split(" - ")
+        # Times are wall-clock campus times; UTC is used only to get a stable epoch
+        start = _parse_time(start_text).replace(tzinfo=timezone.utc)
+        end = _parse_time(end_text).replace(tzinfo=timezone.utc)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time range: {time_range!r}")
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def _parse_time(text):
+    text = text.strip()
+    if _PADDED_TIME.fullmatch(text):
+        return datetime.fromisoformat(text)  # Same result as strptime at a fraction of the cost (bulk imports)
+    return datetime.strptime(text, TIME_FORMAT)
+
+
+def _find_conflicts(cursor, venue_id, start_ts, end_ts, exclude_booking_id=None):
+    """Return IDs of approved bookings at the venue overlapping [start_ts, end_ts)."""
+    cursor.execute('''SELECT booking_id FROM booking_intervals
+                      WHERE min_venue <= :venue AND max_venue >= :venue
+                        AND min_ts <= :end AND max_ts >= :start
+                        AND start_ts < :end AND end_ts > :start
+                        AND booking_id != :exclude
+                      ORDER BY booking_id''',
+                   {"venue": venue_id, "start": start_ts, "end": end_ts, "exclude": exclude_booking_id or -1})
+    return [row[0] for row in cursor.fetchall()]
 
 
 # CRUD Functions
 
 def register_user(username, password):
     """Register a new user in the database."""
-    with connect_db() as conn:
+    with write_connection() as conn:
         cursor = conn.cursor()
         try:
             cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
@@ -68,172 +552,1029 @@ def register_user(username, password):
 
 def login_user(username, password):
     """Log in a user by verifying credentials."""
-    with connect_db() as conn:
+    with read_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT user_id, is_admin FROM users WHERE username = ? AND password = ?", (username, password))
         return cursor.fetchone()
 
 
-def add_venue(venue_name, image_path, capacity):
-    """Add a new venue with an image."""
-    with connect_db() as conn:
+DEFAULT_LOCATION = "Location not specified"
+
+
+def _normalize_tags(tags):
+    """Strip tags and drop blanks and case-insensitive duplicates, keeping the first spelling."""
+    unique = {}
+    for tag in tags:
+        tag = " ".join(tag.split())
+        if tag:
+            unique.setdefault(tag.lower(), tag)
+    return list(unique.values())
+
+
+def add_venue(venue_name, image_path, capacity, location=DEFAULT_LOCATION, equipment=(), renditions=()):
+    """Add a new venue with an image, equipment tags and image renditions, and return its ID.
+
+    ``renditions`` are (rendition, path, width, height, bytes) tuples, as made by image_ingest.
+    """
+    equipment = _normalize_tags(equipment)
+    with write_connection() as conn:
         cursor = conn.cursor()
         try:
             cursor.execute(
                 "INSERT INTO venues (venue_name, location, capacity, image) VALUES (?, ?, ?, ?)",
-                (venue_name, "Location not specified", capacity, image_path),
+                (venue_name, location.strip() or DEFAULT_LOCATION, capacity, image_path),
             )
+            venue_id = cursor.lastrowid
+            if equipment:
+                cursor.executemany("INSERT OR IGNORE INTO equipment (name) VALUES (?)", [(tag,) for tag in equipment])
+                cursor.execute(
+                    f"""INSERT INTO venue_equipment (venue_id, tag_id)
+                        SELECT ?, tag_id FROM equipment WHERE name IN ({", ".join("?" * len(equipment))})""",
+                    (venue_id, *equipment),
+                )
+            _store_renditions(cursor, venue_id, renditions)
             conn.commit()
         except sqlite3.IntegrityError:
             raise ValueError("Venue already exists")
+    _invalidate_venue_catalog()
+    return venue_id
+
+
+def _store_renditions(cursor, venue_id, renditions):
+    cursor.execute("DELETE FROM venue_renditions WHERE venue_id = ?", (venue_id,))
+    cursor.executemany(
+        "INSERT INTO venue_renditions (venue_id, rendition, path, width, height, bytes) VALUES (?, ?, ?, ?, ?, ?)",
+        [(venue_id, *rendition) for rendition in renditions],
+    )
+
+
+def set_venue_image(venue_id, image_path, renditions=()):
+    """Replace a venue's image and its renditions; returns the replaced renditions no venue uses any more."""
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT path FROM venue_renditions WHERE venue_id = ?", (venue_id,))
+        replaced = [row[0] for row in cursor.fetchall()]
+        cursor.execute("UPDATE venues SET image = ? WHERE venue_id = ?", (image_path, venue_id))
+        if cursor.rowcount == 0:
+            raise ValueError("Venue not found")
+        _store_renditions(cursor, venue_id, renditions)
+        unused = _unreferenced_files(cursor, replaced)
+        conn.commit()
+    _invalidate_venue_catalog()
+    return unused
+
+
+def _unreferenced_files(cursor, paths):
+    """The files among ``paths`` that no venue uses as its image or a rendition.
+
+    Ingested files are named by venue name and content, so two venues can share them.
+    """
+    paths = list(dict.fromkeys(path for path in paths if path))
+    if not paths:
+        return []
+    placeholders = ", ".join("?" * len(paths))
+    cursor.execute(f"""SELECT image FROM venues WHERE image IN ({placeholders})
+                       UNION SELECT path FROM venue_renditions WHERE path IN ({placeholders})""", paths * 2)
+    used = {row[0] for row in cursor.fetchall()}
+    return [path for path in paths if path not in used]
+
+
+def get_venue_renditions(venue_id):
+    """Return the (rendition, path, width, height, bytes) renditions recorded for a venue's image."""
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT rendition, path, width, height, bytes FROM venue_renditions WHERE venue_id = ? ORDER BY rendition",
+            (venue_id,),
+        ).fetchall()
+
+
+# Venue Catalog Cache
+#
+# Venues change a few times a semester but are read on every page visit, so
+# get_all_venues(), get_venue_by_id() and get_image_renditions() are served
+# from an in-process copy.
+# add_venue() and delete_venue() drop it directly. Changes from other processes
+# are caught by PRAGMA data_version, which only changes after another connection
+# commits, and then the catalog_version row, which triggers bump on every change
+# to venues; only a changed version reloads the catalog.
+
+def _invalidate_venue_catalog():
+    global _catalog
+    with _catalog_lock:
+        if _catalog is not None:
+            _catalog = None
+            _catalog_stats["invalidations"] += 1
+
+
+def _venue_catalog():
+    """Return the cached catalog, reloading it first if the venues table has changed."""
+    global _catalog
+    conn = _get_reader()
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    with _catalog_lock:
+        catalog = _catalog
+        if catalog is not None and getattr(_local, "catalog_seen", None) == (conn, data_version, catalog["version"]):
+            _catalog_stats["hits"] += 1  # Nothing committed since this thread last checked
+            return catalog
+
+        # The version is read before the venues, so a change committed in between
+        # only makes the cache look older than it is and is reloaded next time
+        version = conn.execute("SELECT version FROM catalog_version").fetchone()[0]
+        if catalog is not None and catalog["version"] == version:
+            _catalog_stats["hits"] += 1
+        else:
+            if catalog is not None:
+                _catalog_stats["invalidations"] += 1  # Changed by another process
+            _catalog_stats["misses"] += 1
+            venues = conn.execute("SELECT venue_id, venue_name, location, capacity, image FROM venues").fetchall()
+            equipment = {}
+            for venue_id, tag in conn.execute('''SELECT ve.venue_id, e.name FROM venue_equipment ve
+                                                 INNER JOIN equipment e ON e.tag_id = ve.tag_id
+                                                 ORDER BY ve.venue_id, e.name'''):
+                equipment.setdefault(venue_id, []).append(tag)
+            renditions = {}  # Only ever change along with their venue row, so its triggers cover them
+            for image, rendition, path in conn.execute('''SELECT v.image, r.rendition, r.path FROM venue_renditions r
+                                                          INNER JOIN venues v ON v.venue_id = r.venue_id'''):
+                renditions.setdefault(image, {})[rendition] = path
+            catalog = _catalog = {"version": version, "venues": venues, "by_id": {row[0]: row for row in venues},
+                                  "equipment": equipment, "renditions": renditions}
+        _local.catalog_seen = (conn, data_version, version)
+        return catalog
+
+
+def get_venue_cache_stats():
+    """Return hit, miss and invalidation counts of the venue catalog cache, and the venues it holds."""
+    with _catalog_lock:
+        stats = dict(_catalog_stats)
+        stats["size"] = len(_catalog["venues"]) if _catalog is not None else 0
+    return stats
 
 
 def get_all_venues():
     """Retrieve all venues."""
-    with connect_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT venue_id, venue_name, location, capacity, image FROM venues")
-        return cursor.fetchall()
+    return list(_venue_catalog()["venues"])
 
 
 def get_venue_by_id(venue_id):
     """Retrieve a venue by ID."""
-    with connect_db() as conn:
+    return _venue_catalog()["by_id"].get(venue_id)
+
+
+def get_venue_equipment():
+    """Return {venue_id: sorted equipment tags} of every venue that has any."""
+    return {venue_id: list(tags) for venue_id, tags in _venue_catalog()["equipment"].items()}
+
+
+def get_image_renditions(image_path):
+    """Return {rendition: path} of the renditions recorded for the venue image at ``image_path``."""
+    if not image_path:
+        return {}
+    return dict(_venue_catalog()["renditions"].get(image_path, {}))
+
+
+def filter_venues(min_capacity=None, location=None, equipment=(), free_from=None, free_to=None):
+    """Venues matching every given filter, in the order of get_all_venues().
+
+    ``location`` must match exactly (see get_all_venues() for the values in use)
+    and every tag in ``equipment`` must be present, ignoring case. With
+    free_from/free_to (epoch seconds), venues with an approved booking
+    overlapping that window are left out.
+    """
+    query = "SELECT v.venue_id, v.venue_name, v.location, v.capacity, v.image FROM venues v"
+    conditions = []
+    params = []
+    if min_capacity is not None:
+        conditions.append("v.capacity >= ?")
+        params.append(min_capacity)
+    if location is not None:
+        conditions.append("v.location = ?")
+        params.append(location)
+    equipment = _normalize_tags(equipment)
+    if equipment:
+        # Venues holding all of the tags: one index range per tag, counted per venue
+        conditions.append(f'''v.venue_id IN (
+            SELECT ve.venue_id FROM equipment e INNER JOIN venue_equipment ve ON ve.tag_id = e.tag_id
+            WHERE e.name IN ({", ".join("?" * len(equipment))})
+            GROUP BY ve.venue_id HAVING count(*) = ?)''')
+        params += [*equipment, len(equipment)]
+    if free_from is not None and free_to is not None:
+        # One R*Tree range scan over the window finds every busy venue at once
+        conditions.append('''v.venue_id NOT IN (
+            SELECT b.venue_id FROM booking_intervals bi INNER JOIN bookings b ON b.booking_id = bi.booking_id
+            WHERE bi.min_ts <= ? AND bi.max_ts >= ? AND bi.start_ts < ? AND bi.end_ts > ?)''')
+        params += [free_to, free_from, free_to, free_from]
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY v.venue_id"
+
+    with read_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT venue_id, venue_name, location, capacity, image FROM venues WHERE venue_id = ?", (venue_id,))
-        return cursor.fetchone()
+        cursor.execute(query, params)
+        return cursor.fetchall()
 
 
 def delete_venue(venue_id):
-    """Delete a venue and associated bookings."""
-    with connect_db() as conn:
+    """Delete a venue and associated bookings; returns its image files that no other venue uses."""
+    with write_connection() as conn:
         cursor = conn.cursor()
         try:
+            cursor.execute("""SELECT image FROM venues WHERE venue_id = ?
+                              UNION ALL SELECT path FROM venue_renditions WHERE venue_id = ?""", (venue_id, venue_id))
+            files = [row[0] for row in cursor.fetchall()]
             # Delete bookings tied to the venue
             cursor.execute("DELETE FROM bookings WHERE venue_id = ?", (venue_id,))
             # Delete the venue itself
             cursor.execute("DELETE FROM venues WHERE venue_id = ?", (venue_id,))
+            unused = _unreferenced_files(cursor, files)
             conn.commit()
         except sqlite3.Error as e:
             raise ValueError(f"Error deleting venue: {e}")
+    _invalidate_venue_catalog()
+    return unused
 
 
 def book_venue(user_id, venue_id, booking_date, time_range, purpose, event_name):
-    """Book a venue."""
-    with connect_db() as conn:
+    """Book a venue, rejecting requests that overlap an approved booking."""
+    start_ts, end_ts = parse_time_range(time_range)
+    if end_ts <= start_ts:
+        raise ValueError("End time must be after start time.")
+
+    with write_connection() as conn:
         cursor = conn.cursor()
+        conflicts = _find_conflicts(cursor, venue_id, start_ts, end_ts)
+        if conflicts:
+            raise BookingConflictError(conflicts)
         try:
-            cursor.execute('''INSERT INTO bookings (user_id, venue_id, booking_date, time_range, purpose, event_name, is_approved)
-                              VALUES (?, ?, ?, ?, ?, ?, 0)''',
-                           (user_id, venue_id, booking_date, time_range, purpose, event_name))
+            cursor.execute('''INSERT INTO bookings (user_id, venue_id, booking_date, time_range, purpose, event_name,
+                                                     is_approved, start_ts, end_ts)
+                              VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)''',
+                           (user_id, venue_id, booking_date, time_range, purpose, event_name, start_ts, end_ts))
             conn.commit()
         except sqlite3.Error as e:
             raise ValueError(f"Error booking venue: {e}")
 
 
-def get_user_bookings(user_id):
-    """Retrieve bookings made by a specific user."""
-    with connect_db() as conn:
+RECURRENCE_FREQUENCIES = ("daily", "weekly")
+MAX_SERIES_OCCURRENCES = 366
+
+
+def expand_recurrence(time_range, frequency, interval=1, weekdays=None, count=None, until=None):
+    """Expand a recurrence rule into the (start_ts, end_ts) of every occurrence.
+
+    The first occurrence is ``time_range`` itself. "daily" repeats every
+    ``interval`` days; "weekly" repeats every ``interval`` weeks on ``weekdays``
+    (0 = Monday; defaults to the weekday of the first occurrence, and must
+    include it, so the date picked is always booked). The series
+    stops after ``count`` occurrences or with the last one starting on or before
+    the ``until`` date ('YYYY-MM-DD'); exactly one of the two must be given.
+    """
+    start_ts, end_ts = parse_time_range(time_range)
+    if end_ts <= start_ts:
+        raise ValueError("End time must be after start time.")
+    if frequency not in RECURRENCE_FREQUENCIES:
+        raise ValueError(f"Unknown recurrence frequency: {frequency!r}")
+    if interval < 1:
+        raise ValueError("The recurrence interval must be at least 1.")
+    if (count is None) == (until is None):
+        raise ValueError("A recurring booking needs either an occurrence count or an end date.")
+    if count is not None and not 1 <= count <= MAX_SERIES_OCCURRENCES:
+        raise ValueError(f"A series can have between 1 and {MAX_SERIES_OCCURRENCES} occurrences.")
+
+    first = datetime.fromtimestamp(start_ts, timezone.utc)
+    if until is not None:
+        try:
+            last_day = datetime.strptime(until, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(f"Invalid end date: {until!r}")
+        if last_day < first.date():
+            raise ValueError("The series end date is before its first occurrence.")
+
+    if frequency == "daily":
+        step_days, days = interval, [0]
+    else:
+        weekdays = sorted(set(weekdays)) if weekdays else [first.weekday()]
+        if first.weekday() not in weekdays:
+            raise ValueError("The repeat days must include the weekday of the start date.")
+        step_days = 7 * interval
+        # Day offsets of the selected weekdays within a week that begins on the first occurrence
+        days = sorted((weekday - first.weekday()) % 7 for weekday in weekdays)
+
+    occurrences = []
+    period = 0
+    while True:
+        for offset in days:
+            day_offset = period * step_days + offset
+            occurrence_start = start_ts + day_offset * 86400
+            if until is not None and datetime.fromtimestamp(occurrence_start, timezone.utc).date() > last_day:
+                return occurrences
+            occurrences.append((occurrence_start, end_ts + day_offset * 86400))
+            if len(occurrences) == count:
+                return occurrences
+            if len(occurrences) > MAX_SERIES_OCCURRENCES:
+                raise ValueError(f"A series can have at most {MAX_SERIES_OCCURRENCES} occurrences.")
+        period += 1
+
+
+def _format_time_range(start_ts, end_ts):
+    start = datetime.fromtimestamp(start_ts, timezone.utc).strftime(TIME_FORMAT)
+    end = datetime.fromtimestamp(end_ts, timezone.utc).strftime(TIME_FORMAT)
+    return f"{start} - {end}"
+
+
+def _find_series_conflicts(cursor, venue_id, occurrences):
+    """Return IDs of approved bookings at the venue overlapping any of ``occurrences``."""
+    conflicts = set()
+    for chunk in _chunks(occurrences, BULK_CHUNK_SIZE // 2):
+        # One R*Tree probe per occurrence, all in a single statement
+        cursor.execute(
+            f'''WITH occurrences (start_ts, end_ts) AS (VALUES {", ".join(["(?, ?)"] * len(chunk))})
+                SELECT DISTINCT bi.booking_id FROM occurrences o
+                JOIN booking_intervals bi
+                  ON bi.min_venue <= ? AND bi.max_venue >= ?
+                 AND bi.min_ts <= o.end_ts AND bi.max_ts >= o.start_ts
+                 AND bi.start_ts < o.end_ts AND bi.end_ts > o.start_ts''',
+            [ts for occurrence in chunk for ts in occurrence] + [venue_id, venue_id],
+        )
+        conflicts.update(row[0] for row in cursor.fetchall())
+    return sorted(conflicts)
+
+
+def book_venue_series(user_id, venue_id, time_range, purpose, event_name, frequency, interval=1, weekdays=None,
+                      count=None, until=None):
+    """Book a recurring series of a venue as pending requests sharing one series ID.
+
+    The rule is expanded with expand_recurrence(). The whole series is rejected
+    with BookingConflictError if any occurrence overlaps an approved booking.
+    Returns (series_id, number of bookings created).
+    """
+    occurrences = expand_recurrence(time_range, frequency, interval, weekdays, count, until)
+    for (_, previous_end), (next_start, _) in zip(occurrences, occurrences[1:]):
+        if next_start < previous_end:
+            raise ValueError("Occurrences of the series would overlap each other.")
+
+    rule = f"{frequency};interval={interval};weekdays={','.join(map(str, weekdays or []))};" \
+           f"count={count or ''};until={until or ''}"
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        conflicts = _find_series_conflicts(cursor, venue_id, occurrences)
+        if conflicts:
+            raise BookingConflictError(conflicts)
+        try:
+            cursor.execute("INSERT INTO booking_series (user_id, venue_id, rule) VALUES (?, ?, ?)",
+                           (user_id, venue_id, rule))
+            series_id = cursor.lastrowid
+            cursor.executemany(
+                '''INSERT INTO bookings (user_id, venue_id, booking_date, time_range, purpose, event_name,
+                                         is_approved, start_ts, end_ts, series_id)
+                   VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?)''',
+                [(user_id, venue_id, datetime.fromtimestamp(start_ts, timezone.utc).strftime("%Y-%m-%d"),
+                  _format_time_range(start_ts, end_ts), purpose, event_name, start_ts, end_ts, series_id)
+                 for start_ts, end_ts in occurrences],
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            raise ValueError(f"Error booking venue: {e}")
+    return series_id, len(occurrences)
+
+
+def get_venue_availability(venue_id, window_start, window_end):
+    """Return the busy and free intervals of a venue over [window_start, window_end).
+
+    Times are epoch seconds. Busy intervals are the venue's approved bookings,
+    merged where they touch or overlap and clipped to the window; free intervals
+    are the gaps between them. Both are sorted lists of (start_ts, end_ts).
+    """
+    with read_connection() as conn:
+        cursor = conn.cursor()
+        # Range scan of the R*Tree; the exact columns drop its float32 rounding
+        cursor.execute('''SELECT start_ts, end_ts FROM booking_intervals
+                          WHERE min_venue <= :venue AND max_venue >= :venue
+                            AND min_ts <= :end AND max_ts >= :start
+                            AND start_ts < :end AND end_ts > :start
+                          ORDER BY start_ts''',
+                       {"venue": venue_id, "start": window_start, "end": window_end})
+        rows = cursor.fetchall()
+
+    busy = []
+    for start_ts, end_ts in rows:
+        start_ts, end_ts = max(start_ts, window_start), min(end_ts, window_end)
+        if busy and start_ts <= busy[-1][1]:
+            busy[-1] = (busy[-1][0], max(busy[-1][1], end_ts))
+        else:
+            busy.append((start_ts, end_ts))
+
+    free = []
+    cursor_ts = window_start
+    for start_ts, end_ts in busy:
+        if start_ts > cursor_ts:
+            free.append((cursor_ts, start_ts))
+        cursor_ts = end_ts
+    if cursor_ts < window_end:
+        free.append((cursor_ts, window_end))
+    return busy, free
+
+
+# Booking status codes stored in bookings.is_approved
+BOOKING_STATUS = {"Pending": 0, "Approved": 1, "Denied": -1, "Canceled": -2}
+
+# Columns get_bookings() can project, and the SQL each one reads
+BOOKING_COLUMNS = {
+    "booking_id": "b.booking_id",
+    "user_id": "b.user_id",
+    "venue_id": "b.venue_id",
+    "venue_name": "v.venue_name",
+    "location": "v.location",
+    "image": "v.image",
+    "booking_date": "b.booking_date",
+    "time_range": "b.time_range",
+    "purpose": "b.purpose",
+    "event_name": "b.event_name",
+    "is_approved": "b.is_approved",
+    "start_ts": "b.start_ts",
+    "end_ts": "b.end_ts",
+    "series_id": "b.series_id",
+    "username": "u.username",
+}
+SEARCH_COLUMNS = {**BOOKING_COLUMNS, "rank": "c.rank"}  # search_bookings() also knows each row's score
+DEFAULT_BOOKING_COLUMNS = (
+    "booking_id", "venue_id", "venue_name", "image", "booking_date", "time_range", "purpose", "event_name", "is_approved",
+)
+
+
+def _booking_query(columns, status=None, user_id=None, venue_id=None, date_from=None, date_to=None,
+                   series_id=None, after=None):
+    """Build the SELECT behind get_bookings() and iter_bookings(); returns (query, params)."""
+    columns = columns or DEFAULT_BOOKING_COLUMNS
+    try:
+        select_list = ", ".join(BOOKING_COLUMNS[column] for column in columns)
+    except KeyError as e:
+        raise ValueError(f"Unknown booking column: {e}")
+
+    query = f"SELECT {select_list} FROM bookings b"
+    if any(BOOKING_COLUMNS[column].startswith("v.") for column in columns):
+        query += " INNER JOIN venues v ON b.venue_id = v.venue_id"
+    if any(BOOKING_COLUMNS[column].startswith("u.") for column in columns):
+        query += " LEFT JOIN users u ON b.user_id = u.user_id"
+
+    conditions = []
+    params = []
+    for condition, value in (
+        ("b.is_approved = ?", status),
+        ("b.user_id = ?", user_id),
+        ("b.venue_id = ?", venue_id),
+        ("b.end_ts > ?", date_from),
+        ("b.start_ts < ?", date_to),
+        ("b.series_id = ?", series_id),
+        ("b.booking_id > ?", after),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY b.booking_id"
+    return query, params
+
+
+def get_bookings(status=None, user_id=None, venue_id=None, date_from=None, date_to=None,
+                 after=None, limit=None, columns=None, series_id=None):
+    """Retrieve bookings matching every given filter, ordered by booking ID.
+
+    date_from/date_to are epoch seconds and keep bookings overlapping that window.
+    Pages are fetched with keyset pagination: pass the last booking_id of the
+    previous page as ``after``. ``columns`` picks names from BOOKING_COLUMNS; each
+    row is a tuple in that order (DEFAULT_BOOKING_COLUMNS when omitted).
+    """
+    query, params = _booking_query(columns, status, user_id, venue_id, date_from, date_to, series_id, after)
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    with read_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''SELECT b.booking_id, v.venue_id, v.venue_name, v.image, b.booking_date, b.time_range, b.purpose, b.event_name, b.is_approved
-                          FROM bookings b
-                          INNER JOIN venues v ON b.venue_id = v.venue_id
-                          WHERE b.user_id = ?''', (user_id,))
+        cursor.execute(query, params)
         return cursor.fetchall()
 
-def get_pending_bookings():
-    """Retrieve all pending bookings for admin."""
-    with connect_db() as conn:
+
+EXPORT_BATCH_SIZE = 1000  # Rows fetched per step while streaming
+
+
+def iter_bookings(status=None, user_id=None, venue_id=None, date_from=None, date_to=None, columns=None,
+                  batch_size=EXPORT_BATCH_SIZE):
+    """Yield the bookings get_bookings() would return, one row at a time.
+
+    Rows are fetched ``batch_size`` at a time from one open cursor, so memory
+    stays flat however many bookings match. The cursor reads a single snapshot
+    of the database and is closed when the generator finishes or is closed.
+    Consume it on the thread that created it.
+    """
+    query, params = _booking_query(columns, status, user_id, venue_id, date_from, date_to)
+    with read_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''SELECT b.booking_id, v.venue_id, v.venue_name, v.image, b.booking_date, b.time_range, b.purpose, b.event_name, b.is_approved
-                          FROM bookings b
-                          INNER JOIN venues v ON b.venue_id = v.venue_id
-                          WHERE b.is_approved = 0''')
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+
+# Full-Text Search
+
+
+def _match_query(text):
+    """Turn free text into an FTS5 query for search-as-you-type.
+
+    Every word must match. The last one, still being typed, matches as a prefix
+    once it has two characters; the others match whole words. Prefixes longer
+    than the indexed ones merge the postings of every word they expand to, so
+    they are kept to the word where they are needed.
+    """
+    # Only word characters are kept, so quotes and FTS5 operators in the text cannot break the query
+    words = [f'"{word}"' for word in re.findall(r"\w+", text)]
+    if words and len(words[-1]) > 3:  # Two characters plus the quotes
+        words[-1] += "*"
+    return " ".join(words)
+
+
+SEARCH_RANK_LIMIT = 5000  # Most matches a search ranks by BM25; more common ones list newest first
+
+
+def search_bookings(text, status=None, user_id=None, limit=50, after=None, columns=None):
+    """Bookings whose event name, purpose, venue name or username match ``text``, best matches first.
+
+    Every word must match; the last one, still being typed, also matches as a
+    prefix, so "acquaintance par" finds an "Acquaintance Party". ``status``,
+    ``user_id`` and ``columns`` work as in get_bookings(); ``columns`` may also
+    name "rank", the sort score of each row.
+
+    BM25 has to visit every booking containing a word, so only searches with
+    at most SEARCH_RANK_LIMIT matches are ranked by it (lower rank is better).
+    A word too common for that tells little apart anyway: its matches come
+    newest first, with rank 0, until more words narrow the search. Ties are
+    broken newest first. Pages are fetched with keyset pagination: pass the
+    (rank, booking_id) of the previous page's last row as ``after``.
+    ``limit`` None returns every match.
+    """
+    match = _match_query(text)
+    if not match:
+        return []
+    columns = columns or DEFAULT_BOOKING_COLUMNS
+    try:
+        select_list = ", ".join(SEARCH_COLUMNS[column] for column in columns)
+    except KeyError as e:
+        raise ValueError(f"Unknown booking column: {e}")
+
+    with read_connection() as conn:
+        cursor = conn.cursor()
+        if after is not None:
+            ranked = after[0] != 0  # BM25 scores are never 0, so the first page already decided
+        else:
+            # Counting stops at the limit, and FTS5 counts without scoring anything
+            cursor.execute("SELECT count(*) FROM (SELECT 1 FROM booking_search WHERE booking_search MATCH ? LIMIT ?)",
+                           (match, SEARCH_RANK_LIMIT + 1))
+            ranked = cursor.fetchone()[0] <= SEARCH_RANK_LIMIT
+
+        matches = "FROM booking_search s INNER JOIN bookings b ON b.booking_id = s.rowid WHERE booking_search MATCH ?"
+        params = [match]
+        for condition, value in (("b.is_approved = ?", status), ("b.user_id = ?", user_id)):
+            if value is not None:
+                matches += f" AND {condition}"
+                params.append(value)
+        if ranked:
+            page = f"SELECT booking_id, rank FROM (SELECT s.rowid AS booking_id, s.rank AS rank {matches})"
+            if after is not None:
+                page += " WHERE rank > ? OR (rank = ? AND booking_id < ?)"
+                params += [after[0], *after]
+            page += " ORDER BY rank, booking_id DESC"
+        else:
+            # FTS5 walks the matches newest first and stops at the limit
+            page = f"SELECT s.rowid AS booking_id, 0 AS rank {matches}"
+            if after is not None:
+                page += " AND s.rowid < ?"
+                params.append(after[1])
+            page += " ORDER BY s.rowid DESC"
+        if limit is not None:
+            page += " LIMIT ?"
+            params.append(limit)
+
+        joins = ""
+        if any(SEARCH_COLUMNS[column].startswith("v.") for column in columns):
+            joins += " INNER JOIN venues v ON b.venue_id = v.venue_id"
+        if any(SEARCH_COLUMNS[column].startswith("u.") for column in columns):
+            joins += " LEFT JOIN users u ON b.user_id = u.user_id"
+        cursor.execute(f"""SELECT {select_list} FROM ({page}) c INNER JOIN bookings b ON b.booking_id = c.booking_id
+                           {joins} ORDER BY c.rank, c.booking_id DESC""", params)
         return cursor.fetchall()
 
 
-def get_approved_bookings():
-    """Retrieve all approved bookings."""
-    with connect_db() as conn:
+def search_venues(text, limit=None):
+    """Venues whose name or location match ``text`` as in search_bookings(), best matches first."""
+    match = _match_query(text)
+    if not match:
+        return []
+    query = '''SELECT v.venue_id, v.venue_name, v.location, v.capacity, v.image
+               FROM venue_search s INNER JOIN venues v ON v.venue_id = s.rowid
+               WHERE venue_search MATCH ? ORDER BY s.rank'''
+    params = [match]
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with read_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''SELECT b.booking_id, v.venue_id, v.venue_name, v.image, b.booking_date, b.time_range, b.purpose, b.event_name, b.is_approved
-                          FROM bookings b
-                          INNER JOIN venues v ON b.venue_id = v.venue_id
-                          WHERE b.is_approved = 1''')
+        cursor.execute(query, params)
         return cursor.fetchall()
 
 
+def get_user_bookings(user_id):
+    """Retrieve bookings made by a specific user."""
+    return get_bookings(user_id=user_id)
+
+
+def get_pending_bookings():
+    """Retrieve all pending bookings for admin."""
+    return get_bookings(status=BOOKING_STATUS["Pending"])
+
+
+def get_approved_bookings():
+    """Retrieve all approved bookings."""
+    return get_bookings(status=BOOKING_STATUS["Approved"])
+
+
 def get_denied_bookings():
     """Retrieve all denied bookings."""
-    with connect_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''SELECT b.booking_id, v.venue_id, v.venue_name, v.image, b.booking_date, b.time_range, b.purpose, b.event_name, b.is_approved
-                          FROM bookings b
-                          INNER JOIN venues v ON b.venue_id = v.venue_id
-                          WHERE b.is_approved = -1''')
-        return cursor.fetchall()
+    return get_bookings(status=BOOKING_STATUS["Denied"])
 
 
 def get_canceled_bookings():
     """Retrieve all canceled bookings."""
-    with connect_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''SELECT b.booking_id, v.venue_id, v.venue_name, v.image, b.booking_date, b.time_range, b.purpose, b.event_name, b.is_approved
-                          FROM bookings b
-                          INNER JOIN venues v ON b.venue_id = v.venue_id
-                          WHERE b.is_approved = -2''')
-        return cursor.fetchall()
+    return get_bookings(status=BOOKING_STATUS["Canceled"])
+
 
 def approve_booking(booking_id):
-    """Approve a booking."""
-    with connect_db() as conn:
+    """Approve a booking, unless it overlaps another approved booking for the venue."""
+    with write_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("UPDATE bookings SET is_approved = 1 WHERE booking_id = ?", (booking_id,))
+        cursor.execute("SELECT venue_id, start_ts, end_ts FROM bookings WHERE booking_id = ?", (booking_id,))
+        booking = cursor.fetchone()
+        if not booking:
+            raise ValueError("Booking not found.")
+        venue_id, start_ts, end_ts = booking
+        if start_ts is None:
+            raise ValueError("Booking has an invalid time range and cannot be approved.")
+
+        conflicts = _find_conflicts(cursor, venue_id, start_ts, end_ts, exclude_booking_id=booking_id)
+        if conflicts:
+            raise BookingConflictError(conflicts)
+
+        cursor.execute("UPDATE bookings SET is_approved = 1 WHERE booking_id = ?", (booking_id,))  # Trigger indexes it
         conn.commit()
 
 
 def deny_booking(booking_id):
     """Deny a booking."""
-    with connect_db() as conn:
+    with write_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE bookings SET is_approved = -1 WHERE booking_id = ?", (booking_id,))
         conn.commit()
 
 
+BULK_CHUNK_SIZE = 500  # IDs bound per statement, below SQLite's host parameter limit
+
+
+def _chunks(ids, size=BULK_CHUNK_SIZE):
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def approve_bookings(booking_ids):
+    """Approve a set of pending bookings in one transaction.
+
+    Bookings are taken in booking ID order, so when two of them overlap the
+    earlier request wins. A booking is rejected if it overlaps an approved
+    booking, either one already in the database or one approved earlier in
+    this batch. Returns ``(approved_ids, rejected)``, where ``rejected`` maps a
+    booking ID to the IDs it conflicts with (empty for an invalid time range).
+    IDs that are not pending are ignored.
+    """
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        candidates = []
+        for chunk in _chunks(booking_ids):
+            cursor.execute(
+                f"""SELECT booking_id, venue_id, start_ts, end_ts FROM bookings
+                    WHERE booking_id IN ({", ".join("?" * len(chunk))}) AND is_approved = 0""",
+                chunk,
+            )
+            candidates.extend(cursor.fetchall())
+        candidates.sort()
+
+        approved, rejected = [], {}
+        accepted = {}  # venue_id -> sorted, non-overlapping (start_ts, end_ts, booking_id) approved in this batch
+        for booking_id, venue_id, start_ts, end_ts in candidates:
+            if start_ts is None or end_ts is None:
+                rejected[booking_id] = []
+                continue
+            conflicts = _find_conflicts(cursor, venue_id, start_ts, end_ts)
+            intervals = accepted.setdefault(venue_id, [])
+            i = bisect.bisect_left(intervals, (start_ts,))
+            # Accepted intervals never overlap, so only the neighbours of the insertion point can
+            for neighbour in intervals[max(i - 1, 0):i + 1]:
+                if neighbour[0] < end_ts and neighbour[1] > start_ts:
+                    conflicts.append(neighbour[2])
+            if conflicts:
+                rejected[booking_id] = sorted(conflicts)
+                continue
+            intervals.insert(i, (start_ts, end_ts, booking_id))
+            approved.append(booking_id)
+
+        # Triggers index each approved row in booking_intervals
+        cursor.executemany("UPDATE bookings SET is_approved = 1 WHERE booking_id = ?", [(b,) for b in approved])
+        conn.commit()
+        return approved, rejected
+
+
+def deny_bookings(booking_ids):
+    """Deny a set of pending bookings in one transaction and return how many were denied."""
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        denied = 0
+        for chunk in _chunks(booking_ids):
+            cursor.execute(
+                f"""UPDATE bookings SET is_approved = -1
+                    WHERE booking_id IN ({", ".join("?" * len(chunk))}) AND is_approved = 0""",
+                chunk,
+            )
+            denied += cursor.rowcount
+        conn.commit()
+        return denied
+
+
+def get_booking_ids(status=None, user_id=None, venue_id=None, date_from=None, date_to=None, series_id=None):
+    """Return the IDs of every booking matching the filters, e.g. to select a whole filtered list."""
+    return [row[0] for row in get_bookings(status, user_id, venue_id, date_from, date_to, columns=("booking_id",),
+                                           series_id=series_id)]
+
+
+def approve_series(series_id):
+    """Approve the pending bookings of a series in one transaction; see approve_bookings()."""
+    return approve_bookings(get_booking_ids(status=BOOKING_STATUS["Pending"], series_id=series_id))
+
+
+def deny_series(series_id):
+    """Deny the pending bookings of a series in one transaction and return how many were denied."""
+    return deny_bookings(get_booking_ids(status=BOOKING_STATUS["Pending"], series_id=series_id))
+
+
 def delete_booking(booking_id):
     """Delete a booking."""
-    with connect_db() as conn:
+    with write_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM bookings WHERE booking_id = ?", (booking_id,))
         conn.commit()
+
+
+def delete_user(user_id):
+    """Delete a user and their bookings."""
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM bookings WHERE user_id = ?", (user_id,))
+        cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+        conn.commit()
+
+
 def get_booking_count(venue_id, status):
     """Get the count of bookings for a venue by status."""
-    with connect_db() as conn:
+    with read_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM bookings WHERE venue_id = ? AND is_approved = ?", (venue_id, status))
         return cursor.fetchone()[0]
 
+
 def get_total_bookings(user_id):
     """Get the total number of bookings for a user."""
-    with connect_db() as conn:
+    with read_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM bookings WHERE user_id = ?", (user_id,))
         return cursor.fetchone()[0]
 
+
 def get_total_bookings_by_status(user_id, status):
     """Get the total number of bookings for a user by status."""
-    with connect_db() as conn:
+    with read_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             "SELECT COUNT(*) FROM bookings WHERE user_id = ? AND is_approved = ?", (user_id, status)
         )
         return cursor.fetchone()[0]
+
+
+def get_venue_booking_stats():
+    """Get booking counts for every venue by status in one pass, as {venue_id: {status: count}}."""
+    with read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT venue_id, is_approved, COUNT(*) FROM bookings GROUP BY venue_id, is_approved")
+        return _group_counts(cursor.fetchall())
+
+
+def get_user_booking_stats():
+    """Get booking counts for every user by status in one pass, as {user_id: {status: count}}."""
+    with read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id, is_approved, COUNT(*) FROM bookings GROUP BY user_id, is_approved")
+        return _group_counts(cursor.fetchall())
+
+
+def _group_counts(rows):
+    stats = {}
+    for key, status, count in rows:
+        stats.setdefault(key, {})[status] = count
+    return stats
+
+
 def get_all_users(exclude_admin=False):
     """Retrieve all users from the database. Optionally exclude admins."""
-    with connect_db() as conn:
+    with read_connection() as conn:
         cursor = conn.cursor()
         query = "SELECT user_id, username FROM users"
         if exclude_admin:
             query += " WHERE is_admin = 0"
         cursor.execute(query)
         return cursor.fetchall()
+
+
+# Bulk Import
+#
+# bulk_import streams CSV files through these functions a chunk at a time.
+# Each call inserts one chunk of validated rows with executemany() in a single
+# transaction and returns the rows it left out as {position in chunk: reason};
+# a bad row never aborts the rest of its chunk.
+
+def _lookup(cursor, query, keys):
+    """Map each of ``keys`` found by ``query`` (selecting key, value with an IN ({}) list) to its value."""
+    found = {}
+    for chunk in _chunks(set(keys)):
+        cursor.execute(query.format(", ".join("?" * len(chunk))), chunk)
+        found.update(cursor.fetchall())
+    return found
+
+
+def import_users(rows):
+    """Insert (username, password, is_admin) rows, skipping usernames that already exist."""
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        taken = set(_lookup(cursor, "SELECT username, user_id FROM users WHERE username IN ({})",
+                            [row[0] for row in rows]))
+        accepted, rejected = [], {}
+        for i, row in enumerate(rows):
+            if row[0] in taken:
+                rejected[i] = "Username already exists"
+                continue
+            taken.add(row[0])
+            accepted.append(row)
+        cursor.executemany("INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)", accepted)
+        conn.commit()
+    return rejected
+
+
+def import_venues(rows):
+    """Insert (venue_name, location, capacity, image, equipment) rows, skipping names that already exist."""
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        taken = set(_lookup(cursor, "SELECT venue_name, venue_id FROM venues WHERE venue_name IN ({})",
+                            [row[0] for row in rows]))
+        accepted, rejected = [], {}
+        for i, (venue_name, location, capacity, image, equipment) in enumerate(rows):
+            if venue_name in taken:
+                rejected[i] = "Venue already exists"
+                continue
+            taken.add(venue_name)
+            accepted.append((venue_name, location.strip() or DEFAULT_LOCATION, capacity, image,
+                             _normalize_tags(equipment)))
+        cursor.executemany("INSERT INTO venues (venue_name, location, capacity, image) VALUES (?, ?, ?, ?)",
+                           [row[:4] for row in accepted])
+
+        tags = {tag for row in accepted for tag in row[4]}
+        if tags:
+            cursor.executemany("INSERT OR IGNORE INTO equipment (name) VALUES (?)", [(tag,) for tag in tags])
+            venue_ids = _lookup(cursor, "SELECT venue_name, venue_id FROM venues WHERE venue_name IN ({})",
+                                [row[0] for row in accepted if row[4]])
+            tag_ids = {name.lower(): tag_id for name, tag_id in
+                       _lookup(cursor, "SELECT name, tag_id FROM equipment WHERE name IN ({})", tags).items()}
+            cursor.executemany(
+                "INSERT INTO venue_equipment (venue_id, tag_id) VALUES (?, ?)",
+                [(venue_ids[row[0]], tag_ids[tag.lower()]) for row in accepted for tag in row[4]],
+            )
+        conn.commit()
+    _invalidate_venue_catalog()
+    return rejected
+
+
+def import_bookings(rows):
+    """Insert historical booking rows, resolving users and venues by name.
+
+    Each row is (username, venue_name, booking_date, time_range, purpose,
+    event_name, status, start_ts, end_ts). Rows naming an unknown user or
+    venue are skipped, and so are approved rows that overlap an approved
+    booking, either one already in the database or one earlier in the chunk.
+    """
+    with write_connection() as conn:
+        cursor = conn.cursor()
+        users = _lookup(cursor, "SELECT username, user_id FROM users WHERE username IN ({})", [row[0] for row in rows])
+        venues = _lookup(cursor, "SELECT venue_name, venue_id FROM venues WHERE venue_name IN ({})",
+                         [row[1] for row in rows])
+        accepted, rejected = [], {}
+        approved = {}  # venue_id -> sorted, non-overlapping (start_ts, end_ts) approved in this chunk
+        for i, (username, venue_name, booking_date, time_range, purpose, event_name, status, start_ts, end_ts) \
+                in enumerate(rows):
+            user_id, venue_id = users.get(username), venues.get(venue_name)
+            if user_id is None:
+                rejected[i] = f"Unknown user: {username}"
+                continue
+            if venue_id is None:
+                rejected[i] = f"Unknown venue: {venue_name}"
+                continue
+            if status == BOOKING_STATUS["Approved"]:
+                conflicts = _find_conflicts(cursor, venue_id, start_ts, end_ts)
+                intervals = approved.setdefault(venue_id, [])
+                j = bisect.bisect_left(intervals, (start_ts,))
+                # Approved intervals never overlap, so only the neighbours of the insertion point can
+                overlaps = any(start < end_ts and end > start_ts for start, end in intervals[max(j - 1, 0):j + 1])
+                if conflicts or overlaps:
+                    ids = f" (booking ID(s): {', '.join(map(str, sorted(conflicts)))})" if conflicts else ""
+                    rejected[i] = f"Overlaps an approved booking{ids}"
+                    continue
+                intervals.insert(j, (start_ts, end_ts))
+            accepted.append((user_id, venue_id, booking_date, time_range, purpose, event_name, status, start_ts,
+                             end_ts))
+        # Triggers index each row for search, and each approved row in booking_intervals
+        cursor.executemany(
+            """INSERT INTO bookings (user_id, venue_id, booking_date, time_range, purpose, event_name,
+                                     is_approved, start_ts, end_ts)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            accepted,
+        )
+        conn.commit()
+    return rejected
+
+
+def get_row_count(table):
+    """Return how many rows ``table`` holds (one of the application's own tables)."""
+    if table not in ("users", "venues", "bookings"):
+        raise ValueError(f"Unknown table: {table}")
+    with read_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+# Triggers maintaining a full-text index, suspended with a table's indexes.
+# Indexing the new rows in one pass afterwards is several times faster.
+_INDEXING_TRIGGERS = {"bookings": "bookings_search_insert"}
+
+
+def drop_indexes(table):
+    """Drop the secondary indexes of ``table`` ahead of a large load; rebuild them with restore_indexes().
+
+    For bookings the trigger feeding booking_search is dropped too. The
+    definitions are kept in dropped_indexes until they are restored, so they
+    survive a crash: migrate_schema() rebuilds anything still listed there.
+    """
+    with write_connection() as conn:
+        # Indexes without SQL back UNIQUE and PRIMARY KEY constraints and cannot be dropped
+        dropped = conn.execute(
+            """SELECT type, name, sql FROM sqlite_master
+               WHERE (type = 'index' AND tbl_name = ? AND sql IS NOT NULL) OR (type = 'trigger' AND name = ?)""",
+            (table, _INDEXING_TRIGGERS.get(table)),
+        ).fetchall()
+        last_id = conn.execute("SELECT COALESCE(MAX(booking_id), 0) FROM bookings").fetchone()[0]
+        conn.executemany(
+            "INSERT OR IGNORE INTO dropped_indexes (name, sql, reindex_after) VALUES (?, ?, ?)",
+            [(name, sql, last_id if kind == "trigger" else None) for kind, name, sql in dropped],
+        )
+        for kind, name, _ in dropped:
+            conn.execute(f'DROP {kind.upper()} "{name}"')
+    return [name for _, name, _ in dropped]
+
+
+def restore_indexes():
+    """Rebuild every index drop_indexes() dropped; each is built in one sorted pass over its table."""
+    with write_connection() as conn:
+        dropped = conn.execute("SELECT name, sql, reindex_after FROM dropped_indexes").fetchall()
+        for name, sql, _ in dropped:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone():
+                conn.execute(sql)
+    for name, _, reindex_after in dropped:
+        if reindex_after is not None:
+            # The trigger is back, so only bookings added while it was gone need indexing
+            _backfill(_SEARCH_BACKFILL_QUERY, _index_booking_search, reindex_after)
+        with write_connection() as conn:
+            conn.execute("DELETE FROM dropped_indexes WHERE name = ?", (name,))
+    return [name for name, _, _ in dropped]
+
+
+# Optional SQL tracing and slow-query log (see db_trace)
+if db_trace.enabled_by_env():
+    db_trace.enable()
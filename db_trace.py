@@ -0,0 +1,339 @@
+"""Optional SQL tracing and slow-query log for db_manager.
+
+Off by default. Switch it on with UCVBM_SQL_TRACE=1 (or call enable()) and
+every statement db_manager runs is recorded with its parameters (passwords
+redacted), duration and row count:
+
+- logs/sql_trace.log: every statement
+- logs/slow_queries.log: statements slower than UCVBM_SQL_SLOW_MS (default 100)
+- logs/full_scans.log: EXPLAIN QUERY PLAN of each distinct statement that
+  scans a whole table (turn off with UCVBM_SQL_EXPLAIN=0)
+- logs/sql_stats.json: per-function call counts and cumulative time, and
+  per-statement totals, written at exit (also available from stats())
+
+The logs roll over at UCVBM_SQL_LOG_MB (default 5) and keep three old files.
+UCVBM_SQL_LOG_DIR moves them out of logs/.
+"""
+import atexit
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# logging, inspect and json are imported by the functions that need them, so
+# importing db_manager stays cheap while tracing is off
+
+ENV_VAR = "UCVBM_SQL_TRACE"
+DEFAULT_LOG_DIR = "logs"
+DEFAULT_SLOW_MS = 100
+DEFAULT_LOG_MB = 5
+LOG_BACKUPS = 3
+REDACTED = "***"
+
+_settings = None  # Set while tracing is enabled
+_lock = threading.Lock()
+_local = threading.local()  # Stack of the db_manager functions running on this thread
+_function_stats = {}  # function -> {"calls", "seconds"}
+_statement_stats = {}  # sql -> {"calls", "seconds", "rows"}
+_explained = set()  # Statements whose query plan has been checked
+
+_PLACEHOLDER_COLUMN = re.compile(r"(\w+)\s*(?:=|!=|<>|<=|>=|<|>|LIKE)\s*$", re.IGNORECASE)
+_INSERT_COLUMNS = re.compile(r"INSERT\s+(?:OR\s+\w+\s+)?INTO\s+\w+\s*\(([^)]*)\)\s*VALUES\s*\(", re.IGNORECASE)
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")  # "SCAN t USING INDEX ..." and virtual tables are not full table scans
+
+
+def enabled_by_env():
+    return os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes", "on")
+
+
+def is_enabled():
+    return _settings is not None
+
+
+def _logger(name, log_dir, filename, max_mb):
+    import logging
+    from logging.handlers import RotatingFileHandler
+    logger = logging.getLogger(f"ucvbm.sql.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    handler = RotatingFileHandler(os.path.join(log_dir, filename), maxBytes=max_mb * 2 ** 20,
+                                  backupCount=LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+    logger.addHandler(handler)
+    return logger
+
+
+def enable(slow_ms=None, log_dir=None, explain=None, max_mb=None):
+    """Start tracing db_manager. Unset arguments come from the environment or the defaults."""
+    global _settings
+    import db_manager
+
+    log_dir = log_dir or os.environ.get("UCVBM_SQL_LOG_DIR", DEFAULT_LOG_DIR)
+    if slow_ms is None:
+        slow_ms = float(os.environ.get("UCVBM_SQL_SLOW_MS", DEFAULT_SLOW_MS))
+    if explain is None:
+        explain = os.environ.get("UCVBM_SQL_EXPLAIN", "1").lower() not in ("0", "false", "no", "off")
+    if max_mb is None:
+        max_mb = float(os.environ.get("UCVBM_SQL_LOG_MB", DEFAULT_LOG_MB))
+    os.makedirs(log_dir, exist_ok=True)
+
+    first_time = _settings is None
+    _settings = {
+        "slow_ms": slow_ms,
+        "explain": explain,
+        "log_dir": log_dir,
+        "trace": _logger("trace", log_dir, "sql_trace.log", max_mb),
+        "slow": _logger("slow", log_dir, "slow_queries.log", max_mb),
+        "scans": _logger("scans", log_dir, "full_scans.log", max_mb),
+    }
+    if first_time:
+        _instrument(db_manager)
+        atexit.register(write_stats)
+    db_manager.close_connections()  # Pooled connections reopen through TracingConnection
+
+
+def disable():
+    """Stop recording; instrumented functions and connections pass straight through."""
+    global _settings
+    _settings = None
+
+
+def connection_factory():
+    """The sqlite3 connection class connect_db() should use."""
+    return TracingConnection if _settings is not None else sqlite3.Connection
+
+
+def _instrument(module):
+    """Wrap the module's public functions to count calls and time spent in them."""
+    import inspect
+    for name, fn in list(vars(module).items()):
+        if inspect.isfunction(fn) and fn.__module__ == module.__name__ and not name.startswith("_") \
+                and not inspect.isgeneratorfunction(fn) and name not in ("read_connection", "write_connection"):
+            setattr(module, name, _traced(name, fn))
+
+
+def _traced(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _settings is None:
+            return fn(*args, **kwargs)
+        stack = getattr(_local, "functions", None)
+        if stack is None:
+            stack = _local.functions = []
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            with _lock:
+                entry = _function_stats.setdefault(name, {"calls": 0, "seconds": 0.0})
+                entry["calls"] += 1
+                entry["seconds"] += elapsed
+    return wrapper
+
+
+def _current_function():
+    stack = getattr(_local, "functions", None)
+    return stack[-1] if stack else "-"
+
+
+def redact(sql, params):
+    """Return ``params`` with every value bound to a password column replaced."""
+    if not params or "password" not in sql.lower():
+        return params
+    if isinstance(params, dict):
+        return {key: REDACTED if "password" in key.lower() else value for key, value in params.items()}
+
+    columns = []
+    insert = _INSERT_COLUMNS.search(sql)
+    insert_columns = [column.strip() for column in insert.group(1).split(",")] if insert else []
+    for match in re.finditer(r"\?", sql):
+        if insert and match.start() >= insert.end() and len(columns) < len(insert_columns):
+            columns.append(insert_columns[len(columns)])
+        else:
+            column = _PLACEHOLDER_COLUMN.search(sql[:match.start()])
+            columns.append(column.group(1) if column else None)
+    if len(columns) != len(params) or None in columns:
+        return [REDACTED] * len(params)  # Cannot tell which value is which; hide them all
+    return [REDACTED if "password" in column.lower() else value for column, value in zip(columns, params)]
+
+
+def _record(connection, sql, params, seconds, rows, many=False):
+    settings = _settings
+    if settings is None:
+        return
+    function = _current_function()
+    sql_text = " ".join(sql.split())
+    if many:
+        shown = f"<{len(params)} parameter sets>"
+    else:
+        shown = redact(sql, params)
+    ms = seconds * 1000
+    line = f"{ms:.3f} ms rows={rows} fn={function} sql={sql_text} params={shown!r}"
+    settings["trace"].info(line)
+    if ms >= settings["slow_ms"]:
+        settings["slow"].info(line)
+
+    with _lock:
+        entry = _statement_stats.setdefault(sql_text, {"calls": 0, "seconds": 0.0, "rows": 0})
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["rows"] += rows if rows > 0 else 0
+        first_seen = sql_text not in _explained
+        _explained.add(sql_text)
+
+    if first_seen and settings["explain"] and not many:
+        _explain(connection, sql, params, sql_text, function, settings["scans"])
+
+
+def _explain(connection, sql, params, sql_text, function, logger):
+    keyword = sql_text.split(" ", 1)[0].upper()
+    if keyword not in ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT"):
+        return  # PRAGMA, BEGIN, DDL...
+    try:
+        # A plain cursor, so the EXPLAIN itself is not traced
+        plan = sqlite3.Cursor(connection).execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+    except sqlite3.Error:
+        return
+    details = [row[3] for row in plan]
+    if any(_FULL_SCAN.match(detail) for detail in details):
+        logger.info(f"fn={function} sql={sql_text}\n    " + "\n    ".join(details))
+
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that times each statement, including fetching its rows."""
+
+    def _begin(self, sql, params):
+        self._finish()
+        self._pending = [sql, params, 0.0, 0]  # sql, params, seconds, rows fetched
+
+    def _finish(self):
+        pending = getattr(self, "_pending", None)
+        if pending is None:
+            return
+        self._pending = None
+        sql, params, seconds, rows = pending
+        if self.description is None:
+            rows = self.rowcount  # Statements without a result set report affected rows
+        _record(self.connection, sql, params, seconds, rows)
+
+    def _timed(self, call, *args):
+        start = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            if getattr(self, "_pending", None) is not None:
+                self._pending[2] += time.perf_counter() - start
+
+    def execute(self, sql, params=()):
+        self._begin(sql, params)
+        self._timed(super().execute, sql, params)
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._finish()
+        seq_of_params = list(seq_of_params)
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_params)
+        _record(self.connection, sql, seq_of_params, time.perf_counter() - start, self.rowcount, many=True)
+        return self
+
+    def executescript(self, sql_script):
+        self._finish()
+        start = time.perf_counter()
+        super().executescript(sql_script)
+        _record(self.connection, sql_script, (), time.perf_counter() - start, self.rowcount)
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if getattr(self, "_pending", None) is not None:
+            if row is None:
+                self._finish()
+            else:
+                self._pending[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, size if size is not None else self.arraysize)
+        if getattr(self, "_pending", None) is not None:
+            self._pending[3] += len(rows)
+            if len(rows) < (size if size is not None else self.arraysize):
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if getattr(self, "_pending", None) is not None:
+            self._pending[3] += len(rows)
+            self._finish()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass  # Never raise from a finalizer, e.g. during interpreter shutdown
+
+
+class TracingConnection(sqlite3.Connection):
+    """Connection whose cursors, including those made by execute(), are TracingCursors."""
+
+    def cursor(self, factory=TracingCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection's shortcuts make their cursors in C, bypassing cursor()
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def stats():
+    """Return per-function and per-statement totals recorded so far."""
+    with _lock:
+        return {
+            "functions": {name: dict(entry) for name, entry in _function_stats.items()},
+            "statements": {sql: dict(entry) for sql, entry in _statement_stats.items()},
+        }
+
+
+def reset_stats():
+    with _lock:
+        _function_stats.clear()
+        _statement_stats.clear()
+        _explained.clear()
+
+
+def write_stats(path=None):
+    """Write stats() as JSON, by default to sql_stats.json in the log directory."""
+    settings = _settings
+    if settings is None and path is None:
+        return
+    import json
+    path = path or os.path.join(settings["log_dir"], "sql_stats.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats(), f, indent=2, sort_keys=True)
@@ -1,11 +1,16 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
 import db_manager
+from gui.common.db_executor import db_executor
+from gui.common.virtual_list import VirtualList
 
 
 class ManageUsersPage:
+    ROW_HEIGHT = 100  # Four lines of details plus padding
+
     def __init__(self, master):
         self.master = master
+        self.data_version = None  # Database version the users were loaded at
 
         # Title
         title_label = ctk.CTkLabel(
@@ -16,56 +21,88 @@ class ManageUsersPage:
         )
         title_label.pack(pady=20)
 
-        # Scrollable Frame for users
-        self.scrollable_frame = ctk.CTkScrollableFrame(master, fg_color="white", corner_radius=10)
-        self.scrollable_frame.pack(pady=10, padx=20, fill="both", expand=True)
+        # User list: only the rows in view exist as widgets
+        self.user_list = VirtualList(
+            master,
+            row_height=self.ROW_HEIGHT,
+            create_row=self.create_user_row,
+            bind_row=self.bind_user_row,
+            empty_text="No users found.",
+        )
+        self.user_list.pack(pady=10, padx=20, fill="both", expand=True)
 
         # Display users
         self.display_users()
 
     def display_users(self):
-        """Fetch and display all users."""
-        # Fetch users excluding admin
-        users = db_manager.get_all_users(exclude_admin=True)
-
-        # Check if users exist
-        if not users:
-            no_users_label = ctk.CTkLabel(
-                self.scrollable_frame, text="No users found.", font=ctk.CTkFont(size=14), text_color="black"
-            )
-            no_users_label.pack(pady=10)
-            return
-
-        # Display each user with their stats
-        for user in users:
-            user_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#f8f9fa", corner_radius=10)
-            user_frame.pack(pady=10, padx=20, fill="x", expand=True)
-
-            # Fetch user statistics
-            total_bookings = db_manager.get_total_bookings(user[0])
-            total_approved = db_manager.get_total_bookings_by_status(user[0], 1)
-            total_denied = db_manager.get_total_bookings_by_status(user[0], -1)
-
-            # User Details
-            user_details = (
-                f"Username: {user[1]}\n"
-                f"Total Bookings: {total_bookings}\n"
-                f"Total Approved: {total_approved}\n"
-                f"Total Denied: {total_denied}"
-            )
-            user_label = ctk.CTkLabel(user_frame, text=user_details, font=ctk.CTkFont(size=12), justify="left")
-            user_label.pack(side="left", padx=10)
+        """Fetch all users and their booking counts into the user list."""
+        db_executor.submit(self.master, self.fetch_users, on_success=self.show_users)
 
-            # Delete Button
-            delete_button = ctk.CTkButton(
-                user_frame, text="Delete", fg_color="#d9534f", command=lambda u=user[0]: self.delete_user(u)
-            )
-            delete_button.pack(side="right", padx=10)
+    @staticmethod
+    def fetch_users():
+        """Runs on the database thread: the data version, users excluding admin, and booking counts."""
+        return db_manager.get_data_version(), db_manager.get_all_users(exclude_admin=True), \
+            db_manager.get_user_booking_stats()
+
+    def show_users(self, result):
+        self.data_version, users, self.booking_stats = result
+        self.user_list.set_items(users)
+
+    def refresh(self):
+        """Reload the users if the database changed since they were loaded."""
+        db_executor.submit(self.master, db_manager.get_data_version, on_success=self.reload_if_changed)
+
+    def reload_if_changed(self, data_version):
+        if data_version != self.data_version:
+            self.display_users()
+
+    def set_data_version(self, data_version):
+        self.data_version = data_version
 
-    def delete_user(self, user_id):
+    def sync_data_version(self):
+        """Record the database version the rows now reflect, so refresh() skips a needless reload."""
+        db_executor.submit(self.master, db_manager.get_data_version, on_success=self.set_data_version)
+
+    def create_user_row(self, parent):
+        """Build the widgets of one user row."""
+        user_frame = ctk.CTkFrame(parent, fg_color="#f8f9fa", corner_radius=10)
+
+        user_frame.user_label = ctk.CTkLabel(user_frame, text="", font=ctk.CTkFont(size=12), justify="left")
+        user_frame.user_label.pack(side="left", padx=10)
+
+        # Delete Button
+        user_frame.delete_button = ctk.CTkButton(user_frame, text="Delete", fg_color="#d9534f")
+        user_frame.delete_button.pack(side="right", padx=10)
+        return user_frame
+
+    def bind_user_row(self, user_frame, user):
+        """Show ``user`` and their stats in a recycled user row."""
+        user_stats = self.booking_stats.get(user[0], {})
+        total_bookings = sum(user_stats.values())
+        total_approved = user_stats.get(1, 0)
+        total_denied = user_stats.get(-1, 0)
+
+        # User Details
+        user_details = (
+            f"Username: {user[1]}\n"
+            f"Total Bookings: {total_bookings}\n"
+            f"Total Approved: {total_approved}\n"
+            f"Total Denied: {total_denied}"
+        )
+        user_frame.user_label.configure(text=user_details)
+        user_frame.delete_button.configure(command=lambda u=user[0]: self.delete_user(u, (user_frame.delete_button,)))
+
+    def delete_user(self, user_id, buttons=()):
         """Delete a user."""
         confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete this user?")
         if confirm:
-            db_manager.delete_user(user_id)
-            messagebox.showinfo("Success", "User deleted successfully!")
-            self.display_users()  # Refresh the page
+            db_executor.submit(
+                self.master, db_manager.delete_user, user_id, busy=buttons,
+                on_success=lambda _: self.user_deleted(user_id),
+            )
+
+    def user_deleted(self, user_id):
+        messagebox.showinfo("Success", "User deleted successfully!")
+        self.user_list.remove_items((user_id,))
+        self.booking_stats.pop(user_id, None)
+        self.sync_data_version()
@@ -3,14 +3,29 @@ from tkinter import filedialog
 import tkinter.messagebox as messagebox
 from PIL import Image, ImageTk
 import os
+import booking_export
 import db_manager
+import image_ingest
+import thumbnail_cache
+from gui.common import tk_bridge
+from gui.common.db_executor import db_executor, export_worker, image_worker
+from gui.common.image_cache import image_cache
+from gui.common.image_loader import image_loader
+from gui.common.search_box import SearchBox
+from gui.common.virtual_list import VirtualList
 
 
 class ManageVenuesPage:
+    ROW_HEIGHT = 320  # 300px image, card padding and the gap between rows
+
     def __init__(self, master):
         self.master = master
         self.image_path = None
         self.uploaded_image = None
+        self.data_version = None  # Database version the venue list was loaded at
+        self.search_text = ""  # Non-empty: the list shows the venues matching it
+        self.equipment = {}  # venue_id -> equipment tags
+        self.booking_stats = {}
         self.assets_dir = "assets/venues"
 
         # Ensure the assets directory exists
@@ -44,13 +59,45 @@ class ManageVenuesPage:
         )
         upload_button.grid(row=0, column=2, padx=10, pady=10, sticky="e")
 
+        # Location and Capacity Entries
+        self.location_entry = ctk.CTkEntry(form_frame, width=400, placeholder_text="Location (e.g. Main Building)")
+        self.location_entry.grid(row=1, column=0, padx=10, pady=10, sticky="w")
+        self.capacity_entry = ctk.CTkEntry(form_frame, width=120, placeholder_text="Capacity")
+        self.capacity_entry.grid(row=1, column=1, padx=10, pady=10, sticky="w")
+
+        # Equipment Entry
+        self.equipment_entry = ctk.CTkEntry(
+            form_frame, width=400, placeholder_text="Equipment, comma-separated (e.g. Projector, Whiteboard)"
+        )
+        self.equipment_entry.grid(row=2, column=0, padx=10, pady=10, sticky="w")
+
         # Add Venue Button
-        add_venue_button = ctk.CTkButton(
+        self.add_venue_button = ctk.CTkButton(
             form_frame, text="Add Venue", command=self.add_venue, fg_color="#144d94", width=120
         )
-        add_venue_button.grid(row=1, column=2, padx=10, pady=10, sticky="e")
+        self.add_venue_button.grid(row=2, column=2, padx=10, pady=10, sticky="e")
 
         # Existing Venues Section
+        section_title = ctk.CTkLabel(
+            master, text="Existing Venues", font=ctk.CTkFont(size=20, weight="bold"), text_color="#144d94"
+        )
+        section_title.pack(pady=10)
+
+        self.search_box = SearchBox(
+            master, self.search, width=400, placeholder_text="Search venues by name or location"
+        )
+        self.search_box.pack(pady=(0, 5))
+
+        self.venue_list = VirtualList(
+            master,
+            row_height=self.ROW_HEIGHT,
+            create_row=self.create_venue_row,
+            bind_row=self.bind_venue_row,
+            unbind_row=lambda venue_frame: image_loader.cancel(venue_frame.img_label),
+            empty_text="No venues have been added yet.",
+        )
+        self.venue_list.pack(pady=10, padx=20, fill="both", expand=True)
+
         self.display_existing_venues()
 
     def upload_image(self):
@@ -62,6 +109,7 @@ class ManageVenuesPage:
         if self.image_path:
             # Load and display the image
             image = Image.open(self.image_path)
+            image.draft("RGB", (300, 300))  # Decode JPEG photos at a reduced scale; the full image is not needed here
             image.thumbnail((300, 300))  # Resize for display
             self.uploaded_image = ImageTk.PhotoImage(image)
 
@@ -74,115 +122,189 @@ class ManageVenuesPage:
         if not venue_name or not self.image_path:
             messagebox.showerror("Error", "Please provide both a venue name and an image.")
             return
+        capacity = self.capacity_entry.get().strip() or "0"
+        if not capacity.isdigit():
+            messagebox.showerror("Error", "Capacity must be a whole number.")
+            return
+        location = self.location_entry.get()
+        equipment = self.equipment_entry.get().split(",")
 
-        # Save the image in the assets directory
-        image_filename = f"{venue_name.replace(' ', '_').lower()}.png"
-        image_save_path = os.path.join(self.assets_dir, image_filename)
-        try:
-            with Image.open(self.image_path) as img:
-                img.save(image_save_path)
-
-            # Add venue to the database
-            db_manager.add_venue(venue_name, image_save_path, 0)
-            messagebox.showinfo("Success", f"Venue '{venue_name}' added successfully!")
-            self.venue_name_entry.delete(0, "end")
-            self.image_label.configure(image=None, text="No Image Selected")  # Reset image
-            self.image_path = None
-            self.display_existing_venues()  # Refresh venue table
-        except Exception as e:
-            messagebox.showerror("Error", f"Error saving venue image: {e}")
-
-    def display_existing_venues(self):
-        """Display a table of existing venues with consistent image sizes."""
-        # Clear previous widgets
-        for widget in self.master.winfo_children()[2:]:  # Skip title and form widgets
-            widget.destroy()
+        # Cap, strip and encode the image off the Tk thread, then add the venue on the database thread
+        image_worker.submit(
+            self.master, image_ingest.ingest_venue_image, self.image_path, venue_name, self.assets_dir,
+            busy=(self.add_venue_button,),
+            on_success=lambda ingested: self.image_ingested(venue_name, int(capacity), location, equipment, ingested),
+            on_error=lambda e: messagebox.showerror("Error", f"Error saving venue image: {e}"),
+        )
 
-        # Section Title
-        section_title = ctk.CTkLabel(
-            self.master, text="Existing Venues", font=ctk.CTkFont(size=20, weight="bold"), text_color="#144d94"
+    def image_ingested(self, venue_name, capacity, location, equipment, ingested):
+        image_path, renditions, created = ingested
+        db_executor.submit(
+            self.master, self.create_venue, venue_name, image_path, capacity, location, equipment, renditions,
+            busy=(self.add_venue_button,), on_success=self.venue_added,
+            on_error=lambda e: self.venue_not_added(e, created),
         )
-        section_title.pack(pady=10)
 
-        # Fetch existing venues
-        venues = db_manager.get_all_venues()
+    @staticmethod
+    def create_venue(venue_name, image_path, capacity, location, equipment, renditions):
+        """Runs on the database thread: add the venue and return its row and equipment tags."""
+        venue_id = db_manager.add_venue(venue_name, image_path, capacity, location, equipment, renditions)
+        return db_manager.get_venue_by_id(venue_id), db_manager.get_venue_equipment().get(venue_id, [])
 
-        if not venues:
-            no_venues_label = ctk.CTkLabel(
-                self.master, text="No venues have been added yet.", font=ctk.CTkFont(size=14), text_color="gray"
-            )
-            no_venues_label.pack(pady=10)
+    def venue_not_added(self, error, created):
+        image_ingest.discard(created)  # The files the upload produced belong to no venue
+        messagebox.showerror("Error", str(error))
+
+    def venue_added(self, result):
+        venue, equipment = result
+        messagebox.showinfo("Success", f"Venue '{venue[1]}' added successfully!")
+        for entry in (self.venue_name_entry, self.location_entry, self.capacity_entry, self.equipment_entry):
+            entry.delete(0, "end")
+        self.image_label.configure(image=None, text="No Image Selected")  # Reset image
+        self.image_path = None
+        self.equipment[venue[0]] = equipment
+        if self.search_text:
+            self.display_existing_venues()  # The search decides whether and where the new venue shows
             return
+        self.venue_list.append_items([venue])  # A new venue has no bookings, so no counts change
+        self.sync_data_version()
 
-        # Scrollable Frame
-        scrollable_frame = ctk.CTkScrollableFrame(self.master, fg_color="white", corner_radius=10)
-        scrollable_frame.pack(pady=10, padx=20, fill="both", expand=True)
-
-        # Venue Rows
-        for venue in venues:
-            venue_frame = ctk.CTkFrame(scrollable_frame, fg_color="#ffffff", corner_radius=10)
-            venue_frame.pack(pady=5, padx=20, fill="x", expand=True)
-
-            # Image
-            img_label = ctk.CTkLabel(venue_frame, text="No Image")
-            if venue[4] and os.path.exists(venue[4]):
-                try:
-                    img = Image.open(venue[4])
-                    img = img.resize((300, 300))  # Force consistent size
-                    img_display = ImageTk.PhotoImage(img)
-                    img_label = ctk.CTkLabel(venue_frame, image=img_display, text="")
-                    img_label.image = img_display  # Keep a reference to avoid garbage collection
-                except Exception as e:
-                    print(f"Error loading image for venue {venue[1]}: {e}")
-
-            img_label.pack(side="left", padx=10)
-
-            # Fetch Pending and Approved Bookings Count
-            pending_count = db_manager.get_booking_count(venue[0], status=0)  # Pending bookings
-            approved_count = db_manager.get_booking_count(venue[0], status=1)  # Approved bookings
-
-            # Details
-            venue_details = (
-                f"Venue Name: {venue[1]}\n"
-                f"Pending Bookings: {pending_count}\n"
-                f"Approved Bookings: {approved_count}"
-            )
-            venue_label = ctk.CTkLabel(venue_frame, text=venue_details, font=ctk.CTkFont(size=12), text_color="black",
-                                       justify="left")
-            venue_label.pack(side="left", padx=10)
+    def search(self, text):
+        """Show the venues matching ``text``, best matches first (every venue when empty)."""
+        self.search_text = text
+        self.display_existing_venues()
 
-            # Delete Button
-            delete_button = ctk.CTkButton(
-                venue_frame, text="Delete", fg_color="#d9534f", command=lambda v=venue[0]: self.delete_venue(v)
-            )
-            delete_button.pack(side="right", padx=10)
+    def display_existing_venues(self):
+        """Load the existing venues and their booking counts into the venue list."""
+        db_executor.submit(self.master, self.fetch_venues, self.search_text, on_success=self.show_venues)
 
-        # Add empty frames for consistent spacing if venues < desired rows (e.g., 5 rows)
-        desired_rows = 5
-        empty_rows = max(desired_rows - len(venues), 0)
-        for _ in range(empty_rows):
-            empty_frame = ctk.CTkFrame(scrollable_frame, fg_color="white", height=150)
-            empty_frame.pack(pady=5, padx=20, fill="x", expand=True)
+    @staticmethod
+    def fetch_venues(search_text=""):
+        """Runs on the database thread: the data version, venues, their equipment and pending/approved counts."""
+        data_version = db_manager.get_data_version()  # Read first, so a later commit triggers a reload
+        venues = db_manager.search_venues(search_text) if search_text else db_manager.get_all_venues()
+        return data_version, venues, db_manager.get_venue_equipment(), db_manager.get_venue_booking_stats()
 
-    def delete_venue(self, venue_id):
+    def show_venues(self, result):
+        self.data_version, venues, self.equipment, self.booking_stats = result
+        self.venue_list.set_items(venues)
+
+    def refresh(self):
+        """Reload the venue list if the database changed since it was loaded."""
+        db_executor.submit(self.master, db_manager.get_data_version, on_success=self.reload_if_changed)
+
+    def reload_if_changed(self, data_version):
+        if data_version != self.data_version:
+            self.display_existing_venues()
+
+    def set_data_version(self, data_version):
+        self.data_version = data_version
+
+    def sync_data_version(self):
+        """Record the database version the rows now reflect, so refresh() skips a needless reload."""
+        db_executor.submit(self.master, db_manager.get_data_version, on_success=self.set_data_version)
+
+    def create_venue_row(self, parent):
+        """Build the widgets of one venue row."""
+        venue_frame = ctk.CTkFrame(parent, fg_color="#ffffff", corner_radius=10)
+
+        venue_frame.img_label = ctk.CTkLabel(venue_frame, text="No Image", width=300, height=300)
+        venue_frame.img_label.pack(side="left", padx=10)
+
+        venue_frame.venue_label = ctk.CTkLabel(venue_frame, text="", font=ctk.CTkFont(size=12), text_color="black",
+                                               justify="left")
+        venue_frame.venue_label.pack(side="left", padx=10)
+
+        # Delete Button
+        venue_frame.delete_button = ctk.CTkButton(venue_frame, text="Delete", fg_color="#d9534f")
+        venue_frame.delete_button.pack(side="right", padx=10)
+
+        # Export Calendar Button
+        venue_frame.export_button = ctk.CTkButton(venue_frame, text="Export Calendar", fg_color="#144d94")
+        venue_frame.export_button.pack(side="right", padx=10)
+        return venue_frame
+
+    def bind_venue_row(self, venue_frame, venue):
+        """Show ``venue`` in a recycled venue row."""
+        # Image (decoded in the background; a placeholder shows meanwhile)
+        image_loader.load_into(venue_frame.img_label, venue[4], *thumbnail_cache.LIST_TILE, kind="photo")
+
+        # Pending and Approved Bookings Count
+        venue_stats = self.booking_stats.get(venue[0], {})
+        pending_count = venue_stats.get(0, 0)  # Pending bookings
+        approved_count = venue_stats.get(1, 0)  # Approved bookings
+
+        # Details
+        venue_details = (
+            f"Venue Name: {venue[1]}\n"
+            f"Location: {venue[2]}\n"
+            f"Capacity: {venue[3]}\n"
+            f"Equipment: {', '.join(self.equipment.get(venue[0], [])) or 'None'}\n"
+            f"Pending Bookings: {pending_count}\n"
+            f"Approved Bookings: {approved_count}"
+        )
+        venue_frame.venue_label.configure(text=venue_details)
+        venue_frame.delete_button.configure(
+            command=lambda v=venue[0]: self.delete_venue(v, (venue_frame.delete_button,))
+        )
+        venue_frame.export_button.configure(
+            command=lambda v=venue: self.export_calendar(v, (venue_frame.export_button,))
+        )
+
+    def export_calendar(self, venue, buttons=()):
+        """Export a venue's approved bookings as an iCalendar file."""
+        path = filedialog.asksaveasfilename(
+            title="Export Calendar",
+            initialfile=f"{venue[1].replace(' ', '_').lower()}.ics",
+            defaultextension=".ics",
+            filetypes=(("iCalendar Files", "*.ics"), ("All Files", "*.*")),
+        )
+        if not path:
+            return
+        # Streams start to finish on the export thread (as iter_bookings() requires), not the shared database one
+        export_worker.submit(
+            self.master, booking_export.export_ics, path, calendar_name=venue[1], venue_id=venue[0],
+            status=db_manager.BOOKING_STATUS["Approved"], busy=buttons,
+            progress=lambda count: tk_bridge.call_soon(self.show_export_progress, buttons, count),
+            on_success=lambda count: messagebox.showinfo("Success", f"Exported {count} booking(s) to {path}"),
+            on_error=lambda e: messagebox.showerror("Error", f"Error exporting calendar: {e}"),
+        )
+
+    @staticmethod
+    def show_export_progress(buttons, count):
+        for button in buttons:
+            if button.winfo_exists():
+                button.configure(text=f"Exported {count:,}...")
+
+    def delete_venue(self, venue_id, buttons=()):
         """Delete a venue and all related data."""
         confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete this venue?")
         if confirm:
-            try:
-                # Get venue details
-                venue = db_manager.get_venue_by_id(venue_id)
-                if not venue:
-                    messagebox.showerror("Error", "Venue not found.")
-                    return
-
-                # Remove the associated image file
-                image_path = venue[4]  # Assuming the image path is the 5th column
-                if image_path and os.path.exists(image_path):
-                    os.remove(image_path)
-
-                # Delete the venue and related bookings from the database
-                db_manager.delete_venue(venue_id)
-                messagebox.showinfo("Success", "Venue and related data deleted successfully!")
-                self.display_existing_venues()  # Refresh venue table
-            except Exception as e:
-                messagebox.showerror("Error", f"Error deleting venue: {e}")
+            # Delete the venue first: its files are only removed once no row points at them
+            db_executor.submit(
+                self.master, self.drop_venue, venue_id, busy=buttons,
+                on_success=lambda files: self.venue_deleted(venue_id, *files),
+                on_error=lambda e: messagebox.showerror("Error", f"Error deleting venue: {e}"),
+            )
+
+    @staticmethod
+    def drop_venue(venue_id):
+        """Runs on the database thread: delete the venue and its bookings; returns its image and the files to remove."""
+        venue = db_manager.get_venue_by_id(venue_id)
+        if not venue:
+            raise ValueError("Venue not found.")
+        return venue[4], db_manager.delete_venue(venue_id)  # Only files no other venue still uses
+
+    def venue_deleted(self, venue_id, image_path, unused_files):
+        messagebox.showinfo("Success", "Venue and related data deleted successfully!")
+        self.venue_list.remove_items((venue_id,))
+        self.booking_stats.pop(venue_id, None)
+        self.equipment.pop(venue_id, None)
+        self.sync_data_version()
+        if image_path:
+            image_cache.invalidate(image_path)
+        # Nothing refers to the files any more; remove them off the Tk thread
+        image_worker.submit(
+            self.master, image_ingest.discard, unused_files,
+            on_error=lambda e: messagebox.showerror("Error", f"Venue deleted, but its image could not be removed: {e}"),
+        )
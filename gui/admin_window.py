@@ -1,9 +1,6 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
-from gui.admin.manage_venues import ManageVenuesPage
-from gui.admin.manage_users import ManageUsersPage
-from gui.common.home import HomePage
-from gui.common.manage_bookings import ManageBookingsPage
+from gui.common.page_cache import PageCache
 
 
 class AdminWindow:
@@ -21,6 +18,7 @@ class AdminWindow:
 
         self.content = ctk.CTkFrame(self.master, fg_color="white")
         self.content.pack(side="right", fill="both", expand=True)
+        self.pages = PageCache(self.content)  # Visited pages stay alive between sidebar clicks
 
         # Sidebar Buttons
         self.create_sidebar()
@@ -69,28 +67,23 @@ class AdminWindow:
 
     def show_home_page(self):
         """Show the Home Page."""
-        self.clear_content()
-        HomePage(self.content, self.master, self.user_id, is_admin=True)
+        from gui.common.home import HomePage  # Pages are imported on first use to keep start-up fast
+        self.pages.show("home", lambda frame: HomePage(frame, self.master, self.user_id, is_admin=True))
 
     def show_manage_venues(self):
         """Show the Manage Venues Page."""
-        self.clear_content()
-        ManageVenuesPage(self.content)
+        from gui.admin.manage_venues import ManageVenuesPage
+        self.pages.show("venues", ManageVenuesPage)
 
     def show_manage_bookings(self):
         """Show the Manage Bookings Page."""
-        self.clear_content()
-        ManageBookingsPage(self.content, is_admin=True)
+        from gui.common.manage_bookings import ManageBookingsPage
+        self.pages.show("bookings", lambda frame: ManageBookingsPage(frame, is_admin=True))
 
     def show_manage_users(self):
         """Show the Manage Users Page."""
-        self.clear_content()
-        ManageUsersPage(self.content)
-
-    def clear_content(self):
-        """Clear the content area."""
-        for widget in self.content.winfo_children():
-            widget.destroy()
+        from gui.admin.manage_users import ManageUsersPage
+        self.pages.show("users", ManageUsersPage)
 
     def logout(self):
         """Logout the admin and return to the login screen."""
@@ -1,25 +1,29 @@
 import customtkinter as ctk
+from datetime import datetime, timedelta, timezone
 from tkcalendar import Calendar  # Install with `pip install tkcalendar`
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import os
 import db_manager
+import thumbnail_cache
+from gui.common.db_executor import db_executor
+from gui.common.image_loader import image_loader
 
 
 class BookVenueWindow:
+    SLOT_MINUTES = 15  # Granularity of the time dropdowns
+    REPEAT_OPTIONS = ("Does not repeat", "Daily", "Weekly", "Custom")
+    WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
     def __init__(self, master, parent_window, user_id, venue_id):
         self.master = master
         self.parent_window = parent_window  # Reference to the parent window (HomePage)
         self.user_id = user_id
         self.venue_id = venue_id
+        self.busy = {}  # (year, month) -> approved (start_ts, end_ts) intervals of the venue that month
 
         self.master.title("Book Venue")
         self.master.state("zoomed")  # Maximize the booking form
         self.master.configure(bg="white")
 
-        # Fetch venue details
-        venue = db_manager.get_venue_by_id(self.venue_id)
-
         # Main Layout: Left for details, Right for form
         self.main_frame = ctk.CTkFrame(master, fg_color="white")
         self.main_frame.pack(padx=0, pady=0, fill="both", expand=True)
@@ -39,31 +43,21 @@ class BookVenueWindow:
         self.venue_frame = ctk.CTkFrame(self.main_frame, fg_color="white", corner_radius=10, width=300)
         self.venue_frame.pack(side="left", padx=25, pady=25, fill="y")
 
-        # Venue Image
-        if venue[4] and os.path.exists(venue[4]):
-            try:
-                img = Image.open(venue[4])
-                img.thumbnail((700, 700))
-                img_display = ImageTk.PhotoImage(img)
-                img_label = ctk.CTkLabel(self.venue_frame, image=img_display, text="")
-                img_label.image = img_display  # Keep a reference to prevent garbage collection
-                img_label.pack(pady=10)
-            except Exception as e:
-                print(f"Error loading image for venue: {e}")
-                img_label = ctk.CTkLabel(self.venue_frame, text="No Image Available")
-                img_label.pack(pady=10)
-        else:
-            img_label = ctk.CTkLabel(self.venue_frame, text="No Image Available")
-            img_label.pack(pady=10)
+        # Venue Image (decoded in the background so the form appears immediately)
+        self.img_label = ctk.CTkLabel(self.venue_frame, text="Loading...")
+        self.img_label.pack(pady=10)
 
         # Venue Name
-        venue_name_label = ctk.CTkLabel(
+        self.venue_name_label = ctk.CTkLabel(
             self.venue_frame,
-            text=f"Venue Name: {venue[1]}",
+            text="Venue Name: ...",
             font=ctk.CTkFont(size=16, weight="bold"),
             text_color="#144d94",
         )
-        venue_name_label.pack(pady=10)
+        self.venue_name_label.pack(pady=10)
+
+        # Fetch venue details on the database thread
+        db_executor.submit(master, db_manager.get_venue_by_id, self.venue_id, on_success=self.show_venue)
 
         # Booking Form (Right Side)
         self.form_frame = ctk.CTkFrame(self.main_frame, fg_color="white")
@@ -100,20 +94,147 @@ class BookVenueWindow:
 
         self.start_hour = ctk.StringVar(value="00")
         self.start_minute = ctk.StringVar(value="00")
-        self.create_time_dropdowns(time_frame, self.start_hour, self.start_minute, row=0, col_offset=1)
+        self.start_dropdowns = self.create_time_dropdowns(time_frame, self.start_hour, self.start_minute, row=0,
+                                                          col_offset=1)
 
         end_time_label = ctk.CTkLabel(time_frame, text="End Time:", font=ctk.CTkFont(size=14))
         end_time_label.grid(row=1, column=0, padx=10, pady=5)
 
         self.end_hour = ctk.StringVar(value="00")
         self.end_minute = ctk.StringVar(value="00")
-        self.create_time_dropdowns(time_frame, self.end_hour, self.end_minute, row=1, col_offset=1)
+        self.end_dropdowns = self.create_time_dropdowns(time_frame, self.end_hour, self.end_minute, row=1,
+                                                        col_offset=1)
+
+        # Mark days the venue is already booked and hide taken time slots
+        self.calendar_legend = ctk.CTkLabel(
+            self.form_frame, text="Days in red already have approved bookings.", font=ctk.CTkFont(size=12),
+            text_color="gray"
+        )
+        self.calendar_legend.pack(pady=(0, 5))
+        for calendar in (self.start_calendar, self.end_calendar):
+            calendar.tag_config("busy", background="#d9534f", foreground="white")
+            calendar.bind("<<CalendarMonthChanged>>", lambda e, c=calendar: self.load_availability(c))
+            calendar.bind("<<CalendarSelected>>", lambda e: self.update_time_slots())
+            self.load_availability(calendar)
+        self.start_hour.trace_add("write", lambda *args: self.update_minute_slots(ending=False))
+        self.end_hour.trace_add("write", lambda *args: self.update_minute_slots(ending=True))
+
+        # Recurrence
+        self.create_recurrence_section()
 
         # Submit Button
-        submit_button = ctk.CTkButton(
+        self.submit_button = ctk.CTkButton(
             self.form_frame, text="Submit", fg_color="#144d94", command=self.submit_booking
         )
-        submit_button.pack(pady=10)
+        self.submit_button.pack(pady=10)
+
+    def create_recurrence_section(self):
+        """Create the repeat options; the rule details only show once a repeat is chosen."""
+        repeat_frame = ctk.CTkFrame(self.form_frame, fg_color="white")
+        repeat_frame.pack(pady=5)
+
+        repeat_label = ctk.CTkLabel(repeat_frame, text="Repeat:", font=ctk.CTkFont(size=14))
+        repeat_label.grid(row=0, column=0, padx=10)
+        self.repeat_var = ctk.StringVar(value=self.REPEAT_OPTIONS[0])
+        repeat_dropdown = ctk.CTkComboBox(
+            repeat_frame, values=list(self.REPEAT_OPTIONS), variable=self.repeat_var, state="readonly",
+            command=lambda choice: self.update_recurrence_section()
+        )
+        repeat_dropdown.grid(row=0, column=1, padx=5)
+
+        self.recurrence_frame = ctk.CTkFrame(self.form_frame, fg_color="#f8f9fa", corner_radius=10)
+
+        # Custom interval: every N days or weeks
+        self.interval_frame = ctk.CTkFrame(self.recurrence_frame, fg_color="transparent")
+        ctk.CTkLabel(self.interval_frame, text="Every").grid(row=0, column=0, padx=5)
+        self.interval_entry = ctk.CTkEntry(self.interval_frame, width=50)
+        self.interval_entry.insert(0, "1")
+        self.interval_entry.grid(row=0, column=1, padx=5)
+        self.interval_unit = ctk.StringVar(value="weeks")
+        ctk.CTkComboBox(
+            self.interval_frame, values=["days", "weeks"], variable=self.interval_unit, state="readonly", width=90,
+            command=lambda choice: self.update_recurrence_section()
+        ).grid(row=0, column=2, padx=5)
+
+        # Weekdays of a weekly rule
+        self.weekday_frame = ctk.CTkFrame(self.recurrence_frame, fg_color="transparent")
+        self.weekday_vars = []
+        for i, name in enumerate(self.WEEKDAYS):
+            var = ctk.BooleanVar(value=False)
+            ctk.CTkCheckBox(self.weekday_frame, text=name, variable=var, width=60).grid(row=0, column=i, padx=2)
+            self.weekday_vars.append(var)
+        self.start_calendar.bind("<<CalendarSelected>>", lambda e: self.select_start_weekday(), add="+")
+
+        # End of the series: after N occurrences or on a date
+        self.end_frame = ctk.CTkFrame(self.recurrence_frame, fg_color="transparent")
+        self.end_frame.pack(pady=5, padx=10)
+        self.end_mode = ctk.StringVar(value="count")
+        ctk.CTkRadioButton(self.end_frame, text="After", variable=self.end_mode, value="count").grid(row=0, column=0)
+        self.count_entry = ctk.CTkEntry(self.end_frame, width=50)
+        self.count_entry.insert(0, "10")
+        self.count_entry.grid(row=0, column=1, padx=5)
+        ctk.CTkLabel(self.end_frame, text="occurrences").grid(row=0, column=2, padx=(0, 15))
+        ctk.CTkRadioButton(self.end_frame, text="On", variable=self.end_mode, value="until").grid(row=0, column=3)
+        self.until_entry = ctk.CTkEntry(self.end_frame, width=110, placeholder_text="YYYY-MM-DD")
+        self.until_entry.grid(row=0, column=4, padx=5)
+
+    def update_recurrence_section(self):
+        """Show the rule fields that apply to the chosen repeat option."""
+        repeat = self.repeat_var.get()
+        if repeat == "Does not repeat":
+            self.recurrence_frame.pack_forget()
+            return
+        self.recurrence_frame.pack(pady=5, before=self.submit_button)
+
+        self.interval_frame.pack_forget()
+        self.weekday_frame.pack_forget()
+        if repeat == "Custom":
+            self.interval_frame.pack(pady=5, padx=10, before=self.end_frame)
+        if repeat == "Weekly" or (repeat == "Custom" and self.interval_unit.get() == "weeks"):
+            self.weekday_frame.pack(pady=5, padx=10, before=self.end_frame)
+            self.select_start_weekday()
+
+    def select_start_weekday(self):
+        """Tick the weekday of the start date, which a weekly series must include."""
+        try:
+            weekday = datetime.strptime(self.start_calendar.get_date(), "%Y-%m-%d").weekday()
+        except ValueError:
+            return
+        self.weekday_vars[weekday].set(True)
+
+    def recurrence_rule(self):
+        """Return the chosen rule as book_venue_series() keyword arguments, or None for a single booking."""
+        repeat = self.repeat_var.get()
+        if repeat == "Does not repeat":
+            return None
+
+        interval = 1
+        frequency = "daily" if repeat == "Daily" else "weekly"
+        if repeat == "Custom":
+            try:
+                interval = int(self.interval_entry.get())
+            except ValueError:
+                raise ValueError("The repeat interval must be a whole number.")
+            frequency = "daily" if self.interval_unit.get() == "days" else "weekly"
+        weekdays = [i for i, var in enumerate(self.weekday_vars) if var.get()] if frequency == "weekly" else None
+
+        if self.end_mode.get() == "count":
+            try:
+                return dict(frequency=frequency, interval=interval, weekdays=weekdays,
+                            count=int(self.count_entry.get()))
+            except ValueError:
+                raise ValueError("The number of occurrences must be a whole number.")
+        return dict(frequency=frequency, interval=interval, weekdays=weekdays, until=self.until_entry.get().strip())
+
+    def show_venue(self, venue):
+        """Fill in the venue details once they have been fetched."""
+        if not venue:
+            self.venue_name_label.configure(text="Venue not found")
+            self.img_label.configure(text="No Image Available")
+            return
+        self.venue_name_label.configure(text=f"Venue Name: {venue[1]}")
+        image_loader.load_into(self.img_label, venue[4], *thumbnail_cache.HERO, kind="photo",
+                               empty_text="No Image Available")
 
     def create_time_dropdowns(self, frame, hour_var, minute_var, row, col_offset):
         """Create hour and minute dropdowns for time selection."""
@@ -128,6 +249,86 @@ class BookVenueWindow:
 
         minute_dropdown = ctk.CTkComboBox(frame, values=minutes, variable=minute_var)
         minute_dropdown.grid(row=row, column=col_offset + 2, padx=5, pady=5)
+        return hour_dropdown, minute_dropdown
+
+    def load_availability(self, calendar):
+        """Fetch the venue's busy intervals for the month ``calendar`` displays, unless already loaded."""
+        month, year = calendar.get_displayed_month()
+        if (year, month) in self.busy:
+            return
+        self.busy[(year, month)] = []  # Nothing known yet; also stops a second fetch of the same month
+
+        window_start = datetime(year, month, 1, tzinfo=timezone.utc)
+        window_end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+        db_executor.submit(
+            self.master, db_manager.get_venue_availability, self.venue_id,
+            int(window_start.timestamp()), int(window_end.timestamp()),
+            on_success=lambda result: self.show_availability(year, month, result[0]),
+            on_error=lambda e: self.availability_failed(year, month, e),
+        )
+
+    def availability_failed(self, year, month, error):
+        """Forget a month whose bookings could not be loaded, so showing it again retries the fetch."""
+        self.busy.pop((year, month), None)
+        messagebox.showerror(
+            "Error", f"Could not load the bookings of {year}-{month:02d}: {error}\n"
+                     "Its time slots may be taken; show the month again to retry."
+        )
+
+    def show_availability(self, year, month, busy):
+        """Mark the busy days of a loaded month on both calendars and refresh the time slots."""
+        self.busy[(year, month)] = busy
+
+        days = set()
+        for start_ts, end_ts in busy:
+            day = datetime.fromtimestamp(start_ts, timezone.utc).date()
+            last_day = datetime.fromtimestamp(end_ts - 1, timezone.utc).date()
+            while day <= last_day:
+                days.add(day)
+                day += timedelta(days=1)
+
+        for calendar in (self.start_calendar, self.end_calendar):
+            for day in sorted(days):
+                calendar.calevent_create(day, "Booked", "busy")
+        self.update_time_slots()
+
+    def is_busy(self, start_ts, end_ts):
+        """Whether [start_ts, end_ts) overlaps an approved booking in a loaded month."""
+        return any(busy_start < end_ts and busy_end > start_ts
+                   for intervals in self.busy.values() for busy_start, busy_end in intervals)
+
+    def free_slots(self, date, ending):
+        """Return the minutes of the day on ``date`` that can start (or end) a booking."""
+        day_start = int(datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+        slot = self.SLOT_MINUTES * 60
+        offset = -slot if ending else 0  # An end time is taken when the slot just before it is
+        return [minute for minute in range(0, 24 * 60, self.SLOT_MINUTES)
+                if not self.is_busy(day_start + minute * 60 + offset, day_start + minute * 60 + offset + slot)]
+
+    def update_time_slots(self):
+        """Offer only the free hours for the selected start and end dates."""
+        for ending, calendar, hour_var, (hour_dropdown, _) in (
+            (False, self.start_calendar, self.start_hour, self.start_dropdowns),
+            (True, self.end_calendar, self.end_hour, self.end_dropdowns),
+        ):
+            hours = sorted({f"{minute // 60:02d}" for minute in self.free_slots(calendar.get_date(), ending)})
+            hour_dropdown.configure(values=hours or ["--"])
+            if hour_var.get() not in hours:
+                hour_var.set(hours[0] if hours else "--")  # Refreshes the minutes through the trace
+            else:
+                self.update_minute_slots(ending)
+
+    def update_minute_slots(self, ending):
+        """Offer only the free minutes within the selected hour."""
+        calendar, hour_var, minute_var, (_, minute_dropdown) = (
+            (self.end_calendar, self.end_hour, self.end_minute, self.end_dropdowns) if ending
+            else (self.start_calendar, self.start_hour, self.start_minute, self.start_dropdowns)
+        )
+        minutes = [f"{minute % 60:02d}" for minute in self.free_slots(calendar.get_date(), ending)
+                   if f"{minute // 60:02d}" == hour_var.get()]
+        minute_dropdown.configure(values=minutes or ["--"])
+        if minute_var.get() not in minutes:
+            minute_var.set(minutes[0] if minutes else "--")
 
     def submit_booking(self):
         """Handle booking submission."""
@@ -143,20 +344,46 @@ class BookVenueWindow:
             messagebox.showerror("Error", "Purpose and Event Name are required.")
             return
 
-        if start_date > end_date:
-            messagebox.showerror("Error", "Start date cannot be after end date.")
-            return
-
         time_range = f"{start_date} {start_time} - {end_date} {end_time}"
+        try:
+            start_ts, end_ts = db_manager.parse_time_range(time_range)
+        except ValueError:
+            messagebox.showerror("Error", "Please pick a free start and end time.")
+            return
+        if start_ts >= end_ts:
+            messagebox.showerror("Error", "Start date and time must be before end date and time.")
+            return
+        if self.is_busy(start_ts, end_ts):
+            messagebox.showerror("Error", "The venue is already booked during part of that time.")
+            return
 
         try:
-            db_manager.book_venue(self.user_id, self.venue_id, start_date, time_range, purpose, event_name)
-            messagebox.showinfo("Success", "Booking request submitted successfully.")
-            self.master.destroy()  # Close the booking window
-            self.parent_window.deiconify()  # Show the HomePage window again
-            self.parent_window.state("zoomed")  # Maximize the HomePage window
+            rule = self.recurrence_rule()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
+            return
+
+        if rule is None:
+            db_executor.submit(
+                self.master, db_manager.book_venue, self.user_id, self.venue_id, start_date, time_range, purpose,
+                event_name, busy=(self.submit_button,),
+                on_success=lambda _: self.booking_submitted("Booking request submitted successfully."),
+            )
+        else:
+            # The whole series is checked and inserted in one transaction
+            db_executor.submit(
+                self.master, db_manager.book_venue_series, self.user_id, self.venue_id, time_range, purpose,
+                event_name, busy=(self.submit_button,), **rule,
+                on_success=lambda result: self.booking_submitted(
+                    f"{result[1]} booking requests submitted as a recurring series."
+                ),
+            )
+
+    def booking_submitted(self, message):
+        messagebox.showinfo("Success", message)
+        self.master.destroy()  # Close the booking window
+        self.parent_window.deiconify()  # Show the HomePage window again
+        self.parent_window.state("zoomed")  # Maximize the HomePage window
 
     def go_back(self):
         """Return to the parent window."""
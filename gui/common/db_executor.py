@@ -0,0 +1,67 @@
+import tkinter.messagebox as messagebox
+from concurrent.futures import ThreadPoolExecutor
+
+from gui.common import tk_bridge
+
+
+class DbExecutor:
+    """Runs database calls on a dedicated worker thread, off the Tk main loop.
+
+    ``submit`` returns a Future immediately; ``on_success(result)`` or
+    ``on_error(exception)`` is then called back on the Tk thread. Buttons passed
+    as ``busy`` are disabled while the call is in flight.
+    """
+
+    def __init__(self, name="db"):
+        self.name = name  # Worker thread name prefix
+        self.executor = None
+        self.in_flight = 0  # Submitted calls whose callbacks have not run yet
+
+    def submit(self, widget, fn, *args, on_success=None, on_error=None, busy=(), **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the worker thread. Call from the Tk thread.
+
+        Callbacks are skipped if ``widget`` has been destroyed by the time the call
+        finishes. Without ``on_error``, errors are shown in a message box.
+        """
+        tk_bridge.install(widget)
+        if self.executor is None:
+            # One worker: calls run in submission order, and SQLite sees a single client thread
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+
+        restore = [(button, button.cget("text")) for button in busy]
+        for button in busy:
+            button.configure(state="disabled", text="Please wait...")
+
+        self.in_flight += 1
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(
+            lambda done: tk_bridge.call_soon(self.finish, widget, done, on_success, on_error, restore)
+        )
+        return future
+
+    def finish(self, widget, future, on_success, on_error, restore):
+        self.in_flight -= 1
+        for button, text in restore:
+            if button.winfo_exists():
+                button.configure(state="normal", text=text)
+        if not widget.winfo_exists():
+            return
+
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                messagebox.showerror("Error", str(error))
+        elif on_success:
+            on_success(future.result())
+
+
+# Process-wide executor shared by every window
+db_executor = DbExecutor()
+
+# Encodes uploaded images, so a slow encode never holds up the database calls queued behind it
+image_worker = DbExecutor("image-ingest")
+
+# Streams exports, which read through their own connection and can run for minutes on a large campus
+export_worker = DbExecutor("export")
@@ -1,11 +1,16 @@
 import customtkinter as ctk
-from PIL import Image
-import os
 import db_manager
-from gui.common.book_venue import BookVenueWindow
+import thumbnail_cache
+from gui.common.db_executor import db_executor
+from gui.common.image_loader import image_loader
+from gui.common.search_box import SearchBox
+from gui.common.virtual_list import VirtualList
 
 
 class HomePage:
+    ROW_HEIGHT = 330  # 300px image, card padding and the gap between cards
+    ANY_LOCATION = "Any location"
+
     def __init__(self, master, parent_window, user_id, is_admin=False):
         self.master = master  # Content area (CTkFrame)
         self.parent_window = parent_window  # Main window (Tk or Toplevel)
@@ -21,56 +26,154 @@ class HomePage:
         )
         title_label.pack(pady=20)
 
-        # Create Scrollable Frame
-        scrollable_frame = ctk.CTkScrollableFrame(master, fg_color="white", corner_radius=10)
-        scrollable_frame.pack(pady=10, padx=20, fill="both", expand=True)
-
-        # Fetch venues
-        venues = db_manager.get_all_venues()
-        if not venues:
-            no_venues_label = ctk.CTkLabel(
-                scrollable_frame, text="No venues available.", font=ctk.CTkFont(size=14), text_color="black"
-            )
-            no_venues_label.pack(pady=10)
+        # Filters
+        self.create_filter_section()
+
+        # Venue list: only the rows in view exist as widgets
+        self.venue_list = VirtualList(
+            master,
+            row_height=self.ROW_HEIGHT,
+            create_row=self.create_venue_row,
+            bind_row=self.bind_venue_row,
+            unbind_row=lambda frame: image_loader.cancel(frame.img_label),
+            empty_text="No venues available.",
+        )
+        self.venue_list.pack(pady=10, padx=20, fill="both", expand=True)
+
+        self.venues = None
+        self.equipment = {}  # venue_id -> equipment tags
+        self.filters = {}  # filter_venues() arguments of the shown list
+        self.data_version = None  # Database version the venues were loaded at
+        self.load_venues()
+
+    def create_filter_section(self):
+        """Create the capacity, location, equipment and free-time filters."""
+        filter_frame = ctk.CTkFrame(self.master, fg_color="white")
+        filter_frame.pack(pady=(0, 10))
+
+        # Text filters run once typing pauses; the location menu runs on selection
+        self.capacity_box = SearchBox(filter_frame, self.filters_changed, width=120, placeholder_text="Min. capacity")
+        self.capacity_box.grid(row=0, column=0, padx=5)
+
+        self.location_menu = ctk.CTkOptionMenu(
+            filter_frame, values=[self.ANY_LOCATION], command=self.filters_changed, width=200, fg_color="#07c4fc"
+        )
+        self.location_menu.grid(row=0, column=1, padx=5)
+
+        self.equipment_box = SearchBox(
+            filter_frame, self.filters_changed, width=260, placeholder_text="Equipment (e.g. Projector, Stage)"
+        )
+        self.equipment_box.grid(row=0, column=2, padx=5)
+
+        self.free_box = SearchBox(
+            filter_frame, self.filters_changed, width=320, placeholder_text="Free: YYYY-MM-DD HH:MM - YYYY-MM-DD HH:MM"
+        )
+        self.free_box.grid(row=0, column=3, padx=5)
+
+        self.filter_status = ctk.CTkLabel(filter_frame, text="", font=ctk.CTkFont(size=12), text_color="gray")
+        self.filter_status.grid(row=1, column=0, columnspan=4, pady=(5, 0))
+
+    def read_filters(self):
+        """Return the filters set in the controls as filter_venues() arguments; raises ValueError if one is invalid."""
+        filters = {}
+        capacity = self.capacity_box.get().strip()
+        if capacity:
+            if not capacity.isdigit():
+                raise ValueError("Capacity must be a whole number.")
+            filters["min_capacity"] = int(capacity)
+        if self.location_menu.get() != self.ANY_LOCATION:
+            filters["location"] = self.location_menu.get()
+        equipment = [tag for tag in self.equipment_box.get().split(",") if tag.strip()]
+        if equipment:
+            filters["equipment"] = equipment
+        window = self.free_box.get().strip()
+        if window:
+            try:
+                filters["free_from"], filters["free_to"] = db_manager.parse_time_range(window)
+            except ValueError:
+                raise ValueError("Enter the free time as YYYY-MM-DD HH:MM - YYYY-MM-DD HH:MM.")
+        return filters
+
+    def filters_changed(self, _=None):
+        try:
+            filters = self.read_filters()
+        except ValueError as e:
+            self.filter_status.configure(text=str(e), text_color="#d9534f")
+            return
+        if filters != self.filters:
+            self.filters = filters
+            self.load_venues()
         else:
-            # Venue Cards
-            for venue in venues:
-                frame = ctk.CTkFrame(scrollable_frame, fg_color="#f8f9fa", corner_radius=10)
-                frame.pack(pady=10, padx=20, fill="x", expand=True)
-
-                # Display Image
-                img_label = ctk.CTkLabel(frame, text="No Image")
-                if venue[4] and os.path.exists(venue[4]):
-                    try:
-                        img = Image.open(venue[4])
-                        img.thumbnail((300, 300))
-                        img_display = ctk.CTkImage(light_image=img, size=(300, 300))
-                        img_label = ctk.CTkLabel(frame, image=img_display, text="")
-                    except Exception as e:
-                        print(f"Error loading image for venue {venue[1]}: {e}")
-
-                img_label.pack(side="left", padx=10)
-
-                # Venue Details
-                venue_label = ctk.CTkLabel(frame, text=f"Venue Name: {venue[1]}", font=ctk.CTkFont(size=14), text_color="black")
-                venue_label.pack(side="left", padx=10)
-
-                # Book Button
-                book_button = ctk.CTkButton(
-                    frame, text="Book Venue", fg_color="#07c4fc", command=lambda v=venue[0]: self.book_venue(v)
-                )
-                book_button.pack(side="right", padx=10)
-
-        # Add empty frames for consistent spacing if venues < desired number (e.g., 5 rows)
-        desired_rows = 5
-        empty_rows = max(desired_rows - len(venues), 0)
-
-        for _ in range(empty_rows):
-            empty_frame = ctk.CTkFrame(scrollable_frame, fg_color="white", height=150)
-            empty_frame.pack(pady=10, padx=20, fill="x", expand=True)
+            self.show_count()
+
+    def show_count(self):
+        count = len(self.venues or ())
+        text = f"{count} venue{'s' if count != 1 else ''} match" if self.filters else ""
+        self.filter_status.configure(text=text, text_color="gray")
+
+    def load_venues(self):
+        """Fetch the venues matching the filters on the database thread."""
+        db_executor.submit(self.master, self.fetch_venues, self.filters, on_success=self.show_venues)
+
+    @staticmethod
+    def fetch_venues(filters):
+        """Runs on the database thread: the data version, read first, the venues, their equipment and every location."""
+        data_version = db_manager.get_data_version()  # Read first, so a later commit triggers a reload
+        all_venues = db_manager.get_all_venues()  # Served from the catalog cache
+        venues = db_manager.filter_venues(**filters) if filters else all_venues
+        locations = sorted({venue[2] for venue in all_venues if venue[2]})
+        return data_version, venues, db_manager.get_venue_equipment(), locations
+
+    def show_venues(self, result):
+        self.data_version, venues, equipment, locations = result
+        self.location_menu.configure(values=[self.ANY_LOCATION] + locations)
+        if venues != self.venues or equipment != self.equipment:  # Unchanged venues keep their rows and images
+            self.venues = venues
+            self.equipment = equipment
+            self.venue_list.set_items(venues)
+        self.show_count()
+
+    def refresh(self):
+        """Reload the venues if the database changed since they were loaded."""
+        db_executor.submit(self.master, db_manager.get_data_version, on_success=self.reload_if_changed)
+
+    def reload_if_changed(self, data_version):
+        if data_version != self.data_version:
+            self.load_venues()
+
+    def create_venue_row(self, parent):
+        """Build the widgets of one venue card."""
+        frame = ctk.CTkFrame(parent, fg_color="#f8f9fa", corner_radius=10)
+
+        frame.img_label = ctk.CTkLabel(frame, text="No Image", width=300, height=300)
+        frame.img_label.pack(side="left", padx=10)
+
+        # Venue Details
+        frame.venue_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=14), text_color="black",
+                                         justify="left")
+        frame.venue_label.pack(side="left", padx=10)
+
+        # Book Button
+        frame.book_button = ctk.CTkButton(frame, text="Book Venue", fg_color="#07c4fc")
+        frame.book_button.pack(side="right", padx=10)
+        return frame
+
+    def bind_venue_row(self, frame, venue):
+        """Show ``venue`` in a recycled venue card."""
+        # Display Image (decoded in the background; a placeholder shows meanwhile)
+        image_loader.load_into(frame.img_label, venue[4], *thumbnail_cache.LIST_TILE, kind="ctk")
+
+        frame.venue_label.configure(
+            text=f"Venue Name: {venue[1]}\n"
+                 f"Location: {venue[2]}\n"
+                 f"Capacity: {venue[3]}\n"
+                 f"Equipment: {', '.join(self.equipment.get(venue[0], [])) or 'None'}"
+        )
+        frame.book_button.configure(command=lambda v=venue[0]: self.book_venue(v))
 
     def book_venue(self, venue_id):
         """Open the Book Venue window."""
+        from gui.common.book_venue import BookVenueWindow  # Defers loading tkcalendar until a booking starts
         self.parent_window.withdraw()  # Hide the current HomePage
         booking_window = ctk.CTkToplevel(self.parent_window)  # Open the booking window as Toplevel
         booking_window.state("zoomed")  # Maximize the booking window
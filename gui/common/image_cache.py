@@ -0,0 +1,141 @@
+import os
+import threading
+from collections import OrderedDict
+
+import customtkinter as ctk
+from PIL import Image, ImageTk
+
+import thumbnail_cache
+
+# Upper bound on the memory held by decoded images; override with UCVBM_IMAGE_CACHE_MB
+DEFAULT_MAX_BYTES = int(os.environ.get("UCVBM_IMAGE_CACHE_MB", "64")) * 2 ** 20
+
+# Kinds of decoded image the cache can hand out
+KINDS = ("pil", "photo", "ctk")  # PIL.Image, ImageTk.PhotoImage, customtkinter.CTkImage
+
+
+class ImageCache:
+    """LRU cache of decoded venue images shared by every page.
+
+    Entries are keyed by (path, mtime, size, mode, kind), so each venue image is
+    decoded at most once per size and kind while it stays in the cache. The
+    least recently used entries are evicted once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (image, cost in bytes), oldest first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, size, mode="fill", kind="photo"):
+        """Return ``path`` decoded at ``size`` as a ``kind`` image, decoding it on a miss.
+
+        "photo" and "ctk" images are Tk objects and must be requested from the Tk thread.
+        """
+        key = self.key(path, size, mode, kind)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        image, cost = self.decode(path, size, mode, kind)
+        self.put(key, image, cost)
+        return image
+
+    def peek(self, path, size, mode="fill", kind="photo"):
+        """Return the cached image, or None without decoding anything."""
+        key = self.key(path, size, mode, kind)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def adopt(self, key, img):
+        """Return the image cached under ``key`` (see key()), else make it from ``img``, a decoded PIL image.
+
+        Lets a background decode hand its result over without touching the file
+        again. Call from the Tk thread.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        image, cost = self.wrap(img, key[-1])
+        self.put(key, image, cost)
+        return image
+
+    def key(self, path, size, mode, kind):
+        return os.path.abspath(path), os.stat(path).st_mtime_ns, tuple(size), mode, kind
+
+    def put(self, key, image, cost):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (image, cost)
+            self.total_bytes += cost
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted_cost) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_cost
+                self.evictions += 1
+
+    def decode(self, path, size, mode, kind):
+        if kind == "pil":
+            img = Image.open(thumbnail_cache.get_thumbnail(path, size, mode))
+            img.load()
+            return self.wrap(img, kind)
+
+        # Tk images wrap the decoded PIL image, which is itself cached (and may already
+        # have been decoded by a background loader)
+        return self.wrap(self.get(path, size, mode, kind="pil"), kind)
+
+    @staticmethod
+    def wrap(img, kind):
+        """Return a decoded PIL image as a ``kind`` image, and its cost in bytes."""
+        cost = img.width * img.height * 4  # Approximate RGBA footprint
+        if kind == "pil":
+            return img, cost
+        if kind == "photo":
+            return ImageTk.PhotoImage(img), cost
+        return ctk.CTkImage(light_image=img, size=img.size), cost * 2  # Keeps a scaled copy for the display
+
+    def invalidate(self, path):
+        """Drop every cached rendition of ``path``, e.g. after its venue image changed."""
+        path = os.path.abspath(path)
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == path]:
+                self.total_bytes -= self.entries.pop(key)[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current usage."""
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Process-wide cache shared by every page
+image_cache = ImageCache()
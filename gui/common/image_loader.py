@@ -0,0 +1,94 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from gui.common import tk_bridge
+from gui.common.image_cache import image_cache
+
+DECODER_THREADS = 2
+PLACEHOLDER_COLOR = "#e9ecef"
+
+logger = logging.getLogger("ucvbm.images")
+
+
+class ImageLoader:
+    """Decodes venue images on background threads and delivers them on the Tk thread.
+
+    Each request is made on behalf of an ``owner`` (usually the label or row that
+    will show the image). A new request for the same owner, or ``cancel(owner)``,
+    supersedes the previous one: it is dropped if it has not started yet, and
+    its result is discarded if it has.
+    """
+
+    def __init__(self, threads=DECODER_THREADS):
+        self.threads = threads
+        self.executor = None
+        self.pending = {}  # owner -> Future of the owner's current request
+
+    def load(self, owner, path, size, mode, kind, callback):
+        """Call ``callback(image)`` on the Tk thread with ``path`` decoded as a ``kind`` image.
+
+        The callback runs immediately when the image is already cached, and with
+        None when the image is missing or cannot be decoded. Call from the Tk thread.
+        """
+        self.cancel(owner)
+        if not path or not os.path.exists(path):
+            callback(None)
+            return
+
+        image = image_cache.peek(path, size, mode, kind)
+        if image is not None:
+            callback(image)
+            return
+
+        tk_bridge.install(owner)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="image-decoder")
+        # Decode to a PIL image off the Tk thread; only the cheap Tk wrapper is made on it
+        future = self.executor.submit(self.decode, path, size, mode, kind)
+        self.pending[owner] = future
+        future.add_done_callback(
+            lambda done: tk_bridge.call_soon(self.deliver, owner, done, path, size, mode, kind, callback)
+        )
+
+    def load_into(self, label, path, size, mode="fill", kind="photo", empty_text="No Image"):
+        """Show a placeholder in ``label`` now and swap the image in once it is decoded."""
+        label.configure(image=None, text="Loading...", fg_color=PLACEHOLDER_COLOR)
+        label.image = None
+
+        def show(image):
+            if image is None:
+                label.configure(image=None, text=empty_text, fg_color="transparent")
+            else:
+                label.configure(image=image, text="", fg_color="transparent")
+            label.image = image  # Keep a reference even if the cache evicts the image
+
+        self.load(label, path, size, mode, kind, show)
+
+    @staticmethod
+    def decode(path, size, mode, kind):
+        """Runs on a decoder thread: the cache key of the ``kind`` image and the decoded PIL image."""
+        return image_cache.key(path, size, mode, kind), image_cache.get(path, size, mode, "pil")
+
+    def deliver(self, owner, future, path, size, mode, kind, callback):
+        if self.pending.get(owner) is not future:
+            return  # Superseded or cancelled while decoding
+        del self.pending[owner]
+        if not owner.winfo_exists():
+            return  # The page was closed while decoding
+        if future.exception() is not None:
+            logger.warning("Error loading image %s: %s", path, future.exception())
+            callback(None)
+            return
+        # Wrap what the decoder produced: the file may already be gone (e.g. its venue was deleted)
+        callback(image_cache.adopt(*future.result()))
+
+    def cancel(self, owner):
+        """Drop ``owner``'s outstanding request, if any."""
+        future = self.pending.pop(owner, None)
+        if future is not None:
+            future.cancel()
+
+
+# Process-wide loader shared by every page
+image_loader = ImageLoader()
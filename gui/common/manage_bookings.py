@@ -1,16 +1,30 @@
 import customtkinter as ctk
+from tkinter import filedialog
 import tkinter.messagebox as messagebox
-from PIL import Image, ImageTk
-import os
+import booking_export
 import db_manager
+import thumbnail_cache
+from gui.common import tk_bridge
+from gui.common.db_executor import db_executor, export_worker
+from gui.common.image_loader import image_loader
+from gui.common.search_box import SearchBox
+from gui.common.virtual_list import VirtualList
 
 
 class ManageBookingsPage:
+    ROW_HEIGHT = 330  # 300px image, card padding and the gap between rows
+    PAGE_SIZE = 50  # Bookings fetched per scroll step
+    BOOKING_COLUMNS = ("booking_id", "venue_name", "image", "time_range", "purpose", "series_id")  # Only what a row renders
+
     def __init__(self, master, is_admin=False, user_id=None):
         self.master = master
         self.is_admin = is_admin
         self.user_id = user_id
         self.current_filter = "Pending"  # Default filter
+        self.search_text = ""  # Non-empty: the list shows ranked search results within the filter
+        self.generation = 0  # Bumped on every reset so late pages for an old filter are dropped
+        self.selected = set()  # Booking IDs ticked for a bulk action
+        self.data_version = None  # Database version the list was loaded at
 
         # Title
         title_label = ctk.CTkLabel(
@@ -24,9 +38,20 @@ class ManageBookingsPage:
         # Filter Section
         self.create_filter_section()
 
-        # Scrollable Frame for bookings
-        self.scrollable_frame = ctk.CTkScrollableFrame(master, fg_color="white", corner_radius=10)
-        self.scrollable_frame.pack(pady=10, padx=20, fill="both", expand=True)
+        # Bulk actions (admins, pending view)
+        self.create_bulk_section()
+
+        # Booking list: recycles row widgets and loads the next page near its end
+        self.booking_list = VirtualList(
+            master,
+            row_height=self.ROW_HEIGHT,
+            create_row=self.create_booking_row,
+            bind_row=self.bind_booking_row,
+            unbind_row=lambda frame: image_loader.cancel(frame.img_label),
+            empty_text="No bookings found.",
+            on_scroll_end=self.load_more_bookings,
+        )
+        self.booking_list.pack(pady=10, padx=20, fill="both", expand=True)
 
         # Display bookings based on the current filter
         self.display_bookings()
@@ -54,15 +79,103 @@ class ManageBookingsPage:
         )
         self.denied_button.grid(row=0, column=2, padx=5)
 
+        self.search_box = SearchBox(
+            self.filter_frame, self.search, width=320,
+            placeholder_text="Search events, purposes, venues" + (" or users" if self.is_admin else ""),
+        )
+        self.search_box.grid(row=0, column=3, padx=(20, 5))
+
+        if self.is_admin:
+            self.export_button = ctk.CTkButton(
+                self.filter_frame, text="Export...", fg_color="#144d94", command=self.export_bookings, width=100
+            )
+            self.export_button.grid(row=0, column=4, padx=5)
+
         # Set the initial active state
         self.update_filter_colors()
 
+    def create_bulk_section(self):
+        """Create the selection summary and bulk approve/deny buttons."""
+        self.bulk_frame = ctk.CTkFrame(self.master, fg_color="white")
+
+        self.selection_label = ctk.CTkLabel(self.bulk_frame, text="", font=ctk.CTkFont(size=14))
+        self.selection_label.grid(row=0, column=0, padx=10)
+
+        self.select_all_button = ctk.CTkButton(
+            self.bulk_frame, text="Select All Matching Filter", fg_color="#07c4fc",
+            command=self.select_all_matching, width=180
+        )
+        self.select_all_button.grid(row=0, column=1, padx=5)
+
+        self.clear_selection_button = ctk.CTkButton(
+            self.bulk_frame, text="Clear Selection", fg_color="#6c757d", command=self.clear_selection, width=120
+        )
+        self.clear_selection_button.grid(row=0, column=2, padx=5)
+
+        self.approve_selected_button = ctk.CTkButton(
+            self.bulk_frame, text="Approve Selected", fg_color="#5cb85c", command=self.approve_selected, width=140
+        )
+        self.approve_selected_button.grid(row=0, column=3, padx=5)
+
+        self.deny_selected_button = ctk.CTkButton(
+            self.bulk_frame, text="Deny Selected", fg_color="#d9534f", command=self.deny_selected, width=140
+        )
+        self.deny_selected_button.grid(row=0, column=4, padx=5)
+
+        self.update_bulk_section()
+
+    def bulk_enabled(self):
+        return self.is_admin and self.current_filter == "Pending"
+
+    def update_bulk_section(self):
+        """Show the bulk actions only where they apply and refresh the selection count."""
+        if not self.bulk_enabled():
+            self.bulk_frame.pack_forget()
+            return
+        if not self.bulk_frame.winfo_ismapped():
+            self.bulk_frame.pack(pady=5, after=self.filter_frame)
+        self.selection_label.configure(text=f"{len(self.selected)} selected")
+        state = "normal" if self.selected else "disabled"
+        self.approve_selected_button.configure(state=state)
+        self.deny_selected_button.configure(state=state)
+        self.clear_selection_button.configure(state=state)
+
     def set_filter(self, status):
         """Set the current filter and refresh bookings."""
         self.current_filter = status
         self.update_filter_colors()
+        self.update_bulk_section()
+        self.display_bookings()
+
+    def search(self, text):
+        """Show the bookings matching ``text`` (all bookings when empty) within the current filter."""
+        self.search_text = text
         self.display_bookings()
 
+    def export_bookings(self):
+        """Export every booking with the current status, across all venues, to CSV or iCalendar."""
+        path = filedialog.asksaveasfilename(
+            title="Export Bookings",
+            initialfile=f"{self.current_filter.lower()}-bookings.csv",
+            defaultextension=".csv",
+            filetypes=[(f"{name} Files", f"*{extension}") for extension, name in booking_export.EXPORT_FORMATS.items()],
+        )
+        if not path:
+            return
+        # Streams start to finish on the export thread (as iter_bookings() requires), not the shared database one
+        export_worker.submit(
+            self.master, booking_export.export_bookings, path,
+            progress=lambda count: tk_bridge.call_soon(self.show_export_progress, self.export_button, count),
+            status=db_manager.BOOKING_STATUS[self.current_filter], busy=(self.export_button,),
+            on_success=lambda count: messagebox.showinfo("Success", f"Exported {count} booking(s) to {path}"),
+            on_error=lambda e: messagebox.showerror("Error", f"Error exporting bookings: {e}"),
+        )
+
+    @staticmethod
+    def show_export_progress(button, count):
+        if button.winfo_exists():
+            button.configure(text=f"Exported {count:,}...")
+
     def update_filter_colors(self):
         """Update button colors based on the active filter."""
         # Reset all buttons to their default colors
@@ -71,122 +184,255 @@ class ManageBookingsPage:
         self.denied_button.configure(fg_color="#d9534f" if self.current_filter != "Denied" else "#b12a2a")
 
     def display_bookings(self):
-        """Fetch and display bookings based on the filter."""
-        # Clear previous widgets in the scrollable frame
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        """Reset the list and load the first page of bookings for the current filter."""
+        self.generation += 1
+        self.last_booking_id = None  # Keyset cursor: last booking ID shown
+        self.last_search_key = None  # Keyset cursor of search results: (rank, booking_id) of the last row shown
+        self.has_more = True
+        self.loading = False
+        self.selected.clear()
+        self.update_bulk_section()
+        self.booking_list.set_items([])
+        self.sync_data_version()  # Queued ahead of the first page on the single database thread, so read first
+        self.load_more_bookings()
 
-        # Fetch bookings based on the filter
-        if self.is_admin:
-            if self.current_filter == "Pending":
-                bookings = db_manager.get_pending_bookings()
-            elif self.current_filter == "Approved":
-                bookings = db_manager.get_approved_bookings()
-            elif self.current_filter == "Denied":
-                bookings = db_manager.get_denied_bookings()
-            elif self.current_filter == "Canceled":
-                bookings = db_manager.get_canceled_bookings()
-        else:
-            bookings = db_manager.get_user_bookings(self.user_id)
-            # Filter user bookings by status
-            bookings = [
-                booking for booking in bookings
-                if (self.current_filter == "Pending" and booking[8] == 0) or
-                   (self.current_filter == "Approved" and booking[8] == 1) or
-                   (self.current_filter == "Denied" and booking[8] == -1) or
-                   (self.current_filter == "Canceled" and booking[8] == -2)
-            ]
-
-        # Check if there are any bookings to display
-        if not bookings:
-            no_bookings_label = ctk.CTkLabel(
-                self.scrollable_frame, text="No bookings found.", font=ctk.CTkFont(size=14), text_color="black"
-            )
-            no_bookings_label.pack(pady=10)
+    def set_data_version(self, data_version):
+        self.data_version = data_version
+
+    def sync_data_version(self):
+        """Record the database version the rows now reflect, so refresh() skips a needless reload."""
+        db_executor.submit(self.master, db_manager.get_data_version, on_success=self.set_data_version)
+
+    def refresh(self):
+        """Reload the bookings if the database changed since they were loaded."""
+        db_executor.submit(self.master, db_manager.get_data_version, on_success=self.reload_if_changed)
+
+    def reload_if_changed(self, data_version):
+        if data_version != self.data_version:
+            self.display_bookings()
+
+    def load_more_bookings(self):
+        """Fetch the next page of bookings on the database thread."""
+        if self.loading or not self.has_more:
             return
+        self.loading = True
 
-        # Display each booking
-        for booking in bookings:
-            venue_image = booking[3]  # Image path from query
-            venue_name = booking[2]  # Venue name from query
-
-            frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#f8f9fa", corner_radius=10)
-            frame.pack(pady=10, padx=20, fill="x", expand=True)
-
-            # Display Venue Image
-            img_label = ctk.CTkLabel(frame, text="No Image")
-            if venue_image and os.path.exists(venue_image):
-                try:
-                    img = Image.open(venue_image)
-                    img = img.resize((300, 300))  # Resize to consistent size without anti-aliasing
-                    img_display = ImageTk.PhotoImage(img)
-                    img_label = ctk.CTkLabel(frame, image=img_display, text="")
-                    img_label.image = img_display  # Keep a reference to prevent garbage collection
-                except Exception as e:
-                    print(f"Error loading image for venue {venue_name}: {e}")
-
-            img_label.pack(side="left", padx=10)
-
-            # Safely handle the time_range field
-            time_range_parts = booking[5].split(' - ') if booking[5] else ["Unknown", "Unknown"]
-            start_date = time_range_parts[0] if len(time_range_parts) > 0 else "Unknown"
-            end_date = time_range_parts[1] if len(time_range_parts) > 1 else "Unknown"
-
-            # Booking Details
-            details = (
-                f"Venue Name: {venue_name}\n"
-                f"Purpose: {booking[6]}\n"
-                f"Date Started: {start_date}\n"
-                f"Date Ended: {end_date}\n"
-                f"Status: {self.current_filter}"
-            )
-            booking_label = ctk.CTkLabel(frame, text=details, font=ctk.CTkFont(size=12), justify="left")
-            booking_label.pack(side="left", padx=10)
-
-            if self.is_admin and self.current_filter == "Pending":
-                # Admin Actions: Approve/Deny
-                approve_button = ctk.CTkButton(
-                    frame, text="Approve", fg_color="#5cb85c",
-                    command=lambda b=booking[0]: self.approve_booking(b)
-                )
-                approve_button.pack(side="right", padx=5)
+        generation = self.generation
+        filters = dict(
+            status=db_manager.BOOKING_STATUS[self.current_filter],
+            user_id=None if self.is_admin else self.user_id,
+            limit=self.PAGE_SIZE,
+            columns=self.BOOKING_COLUMNS,
+            on_success=lambda bookings: self.show_more_bookings(bookings, generation),
+            on_error=lambda e: self.load_failed(e, generation),
+        )
+        if self.search_text:
+            # Ranked results page by (rank, booking_id) of the last row, so each row carries its rank
+            filters["columns"] = self.BOOKING_COLUMNS + ("rank",)
+            db_executor.submit(self.master, db_manager.search_bookings, self.search_text,
+                               after=self.last_search_key, **filters)
+        else:
+            db_executor.submit(self.master, db_manager.get_bookings, after=self.last_booking_id, **filters)
 
-                deny_button = ctk.CTkButton(
-                    frame, text="Deny", fg_color="#d9534f",
-                    command=lambda b=booking[0]: self.deny_booking(b)
-                )
-                deny_button.pack(side="right", padx=5)
-            elif not self.is_admin and self.current_filter == "Pending":
-                # User Actions: Cancel
-                cancel_button = ctk.CTkButton(
-                    frame, text="Cancel Booking", fg_color="#d9534f",
-                    command=lambda b=booking[0]: self.cancel_booking(b)
+    def show_more_bookings(self, bookings, generation):
+        """Append a fetched page to the list."""
+        if generation != self.generation:
+            return  # The filter changed while this page was loading
+        self.loading = False
+        self.has_more = len(bookings) == self.PAGE_SIZE
+        if bookings:
+            self.last_booking_id = bookings[-1][0]
+            if self.search_text:
+                self.last_search_key = (bookings[-1][-1], bookings[-1][0])
+            self.booking_list.append_items(bookings)
+
+    def load_failed(self, error, generation):
+        if generation == self.generation:
+            self.loading = False
+        messagebox.showerror("Error", f"Error loading bookings: {error}")
+
+    def create_booking_row(self, parent):
+        """Build the widgets of one booking row."""
+        frame = ctk.CTkFrame(parent, fg_color="#f8f9fa", corner_radius=10)
+
+        # Selection box for bulk actions, packed per row in bind_booking_row
+        frame.select_var = ctk.BooleanVar(value=False)
+        frame.select_box = ctk.CTkCheckBox(frame, text="", width=24, variable=frame.select_var)
+
+        frame.img_label = ctk.CTkLabel(frame, text="No Image", width=300, height=300)
+        frame.img_label.pack(side="left", padx=10)
+
+        frame.booking_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12), justify="left")
+        frame.booking_label.pack(side="left", padx=10)
+
+        # Actions are packed per row in bind_booking_row, depending on the filter and role
+        frame.approve_button = ctk.CTkButton(frame, text="Approve", fg_color="#5cb85c")
+        frame.deny_button = ctk.CTkButton(frame, text="Deny", fg_color="#d9534f")
+        frame.cancel_button = ctk.CTkButton(frame, text="Cancel Booking", fg_color="#d9534f")
+        frame.approve_series_button = ctk.CTkButton(frame, text="Approve Series", fg_color="#3d8b3d")
+        frame.deny_series_button = ctk.CTkButton(frame, text="Deny Series", fg_color="#b12a2a")
+        return frame
+
+    def bind_booking_row(self, frame, booking):
+        """Show ``booking`` in a recycled booking row."""
+        booking_id, venue_name, venue_image, time_range, purpose, series_id = booking[:6]  # Search rows add a rank
+
+        # Display Venue Image (decoded in the background; a placeholder shows meanwhile)
+        image_loader.load_into(frame.img_label, venue_image, *thumbnail_cache.LIST_TILE, kind="photo")
+
+        # Safely handle the time_range field
+        time_range_parts = time_range.split(' - ') if time_range else ["Unknown", "Unknown"]
+        start_date = time_range_parts[0] if len(time_range_parts) > 0 else "Unknown"
+        end_date = time_range_parts[1] if len(time_range_parts) > 1 else "Unknown"
+
+        # Booking Details
+        details = (
+            f"Venue Name: {venue_name}\n"
+            f"Purpose: {purpose}\n"
+            f"Date Started: {start_date}\n"
+            f"Date Ended: {end_date}\n"
+            f"Status: {self.current_filter}"
+        )
+        if series_id is not None:
+            details += f"\nRecurring Series: #{series_id}"
+        frame.booking_label.configure(text=details)
+
+        if self.bulk_enabled():
+            frame.select_var.set(booking_id in self.selected)
+            frame.select_box.configure(command=lambda b=booking_id, v=frame.select_var: self.toggle_selected(b, v.get()))
+            frame.select_box.pack(side="left", padx=(10, 0), before=frame.img_label)
+        else:
+            frame.select_box.pack_forget()
+
+        for button in (frame.approve_button, frame.deny_button, frame.cancel_button, frame.approve_series_button,
+                       frame.deny_series_button):
+            button.pack_forget()
+        if self.is_admin and self.current_filter == "Pending":
+            # Admin Actions: Approve/Deny
+            actions = (frame.approve_button, frame.deny_button)
+            frame.approve_button.configure(command=lambda b=booking_id: self.approve_booking(b, actions))
+            frame.approve_button.pack(side="right", padx=5)
+            frame.deny_button.configure(command=lambda b=booking_id: self.deny_booking(b, actions))
+            frame.deny_button.pack(side="right", padx=5)
+            if series_id is not None:
+                series_actions = actions + (frame.approve_series_button, frame.deny_series_button)
+                frame.deny_series_button.configure(command=lambda s=series_id: self.deny_series(s, series_actions))
+                frame.deny_series_button.pack(side="right", padx=5)
+                frame.approve_series_button.configure(
+                    command=lambda s=series_id: self.approve_series(s, series_actions)
                 )
-                cancel_button.pack(side="right", padx=10)
+                frame.approve_series_button.pack(side="right", padx=5)
+        elif not self.is_admin and self.current_filter == "Pending":
+            # User Actions: Cancel
+            frame.cancel_button.configure(command=lambda b=booking_id: self.cancel_booking(b, (frame.cancel_button,)))
+            frame.cancel_button.pack(side="right", padx=10)
+
+    def toggle_selected(self, booking_id, selected):
+        if selected:
+            self.selected.add(booking_id)
+        else:
+            self.selected.discard(booking_id)
+        self.update_bulk_section()
+
+    def select_all_matching(self):
+        """Select every booking matching the current filter and search, including pages not loaded yet."""
+        status = db_manager.BOOKING_STATUS[self.current_filter]
+        if self.search_text:
+            db_executor.submit(
+                self.master, db_manager.search_bookings, self.search_text, status=status,
+                limit=None, columns=("booking_id",), busy=(self.select_all_button,),
+                on_success=lambda rows: self.show_selection([row[0] for row in rows]),
+            )
+        else:
+            db_executor.submit(
+                self.master, db_manager.get_booking_ids, status=status, busy=(self.select_all_button,),
+                on_success=self.show_selection,
+            )
 
-        # Add empty frames for consistent spacing if bookings < desired number (e.g., 5 rows)
-        desired_rows = 5
-        empty_rows = max(desired_rows - len(bookings), 0)
-        for _ in range(empty_rows):
-            empty_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="white", height=150)
-            empty_frame.pack(pady=10, padx=20, fill="x", expand=True)
+    def show_selection(self, booking_ids):
+        self.selected = set(booking_ids)
+        self.update_bulk_section()
+        self.booking_list.refresh_rows()
 
-    def approve_booking(self, booking_id):
+    def clear_selection(self):
+        self.show_selection(())
+
+    def bulk_buttons(self):
+        return self.select_all_button, self.clear_selection_button, self.approve_selected_button, \
+            self.deny_selected_button
+
+    def approve_selected(self):
+        """Approve every selected booking in one transaction."""
+        db_executor.submit(
+            self.master, db_manager.approve_bookings, sorted(self.selected), busy=self.bulk_buttons(),
+            on_success=self.bulk_approved,
+        )
+
+    def bulk_approved(self, result):
+        approved, rejected = result
+        message = f"{len(approved)} booking(s) approved."
+        if rejected:
+            message += f"\n{len(rejected)} booking(s) were left pending because they overlap an approved booking " \
+                       f"or have an invalid time range."
+        self.action_done(message, approved)
+
+    def deny_selected(self):
+        """Deny every selected booking in one transaction."""
+        confirm = messagebox.askyesno("Confirm", f"Deny {len(self.selected)} selected booking(s)?")
+        if confirm:
+            booking_ids = sorted(self.selected)
+            db_executor.submit(
+                self.master, db_manager.deny_bookings, booking_ids, busy=self.bulk_buttons(),
+                on_success=lambda denied: self.action_done(f"{denied} booking(s) denied.", booking_ids),
+            )
+
+    def approve_booking(self, booking_id, buttons=()):
         """Approve a pending booking."""
-        db_manager.approve_booking(booking_id)
-        messagebox.showinfo("Success", "Booking approved!")
-        self.display_bookings()
+        db_executor.submit(
+            self.master, db_manager.approve_booking, booking_id, busy=buttons,
+            on_success=lambda _: self.action_done("Booking approved!", (booking_id,)),
+        )
 
-    def deny_booking(self, booking_id):
+    def deny_booking(self, booking_id, buttons=()):
         """Deny a pending booking."""
-        db_manager.deny_booking(booking_id)
-        messagebox.showinfo("Success", "Booking denied!")
-        self.display_bookings()
+        db_executor.submit(
+            self.master, db_manager.deny_booking, booking_id, busy=buttons,
+            on_success=lambda _: self.action_done("Booking denied!", (booking_id,)),
+        )
+
+    def approve_series(self, series_id, buttons=()):
+        """Approve every pending booking of a recurring series in one transaction."""
+        db_executor.submit(
+            self.master, db_manager.approve_series, series_id, busy=buttons, on_success=self.bulk_approved,
+        )
+
+    def deny_series(self, series_id, buttons=()):
+        """Deny every pending booking of a recurring series in one transaction."""
+        confirm = messagebox.askyesno("Confirm", f"Deny every pending booking in series #{series_id}?")
+        if confirm:
+            db_executor.submit(
+                self.master, db_manager.deny_series, series_id, busy=buttons,
+                on_success=lambda denied: self.action_done(f"{denied} booking(s) denied.",
+                                                           self.series_booking_ids(series_id)),
+            )
 
-    def cancel_booking(self, booking_id):
+    def cancel_booking(self, booking_id, buttons=()):
         """Cancel a user's booking."""
         confirm = messagebox.askyesno("Confirm", "Are you sure you want to cancel this booking?")
         if confirm:
-            db_manager.delete_booking(booking_id)
-            messagebox.showinfo("Success", "Booking canceled!")
-            self.display_bookings()
+            db_executor.submit(
+                self.master, db_manager.delete_booking, booking_id, busy=buttons,
+                on_success=lambda _: self.action_done("Booking canceled!", (booking_id,)),
+            )
+
+    def series_booking_ids(self, series_id):
+        """IDs of the loaded bookings that belong to ``series_id``."""
+        return [booking[0] for booking in self.booking_list.items if booking[5] == series_id]
+
+    def action_done(self, message, booking_ids):
+        """Report an action and drop the bookings it moved out of the current filter."""
+        messagebox.showinfo("Success", message)
+        self.booking_list.remove_items(booking_ids)
+        self.selected.difference_update(booking_ids)
+        self.update_bulk_section()
+        self.sync_data_version()
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+import customtkinter as ctk
+
+
+class PageCache:
+    """Shows one sidebar page at a time, keeping recently hidden pages alive instead of rebuilding them.
+
+    Each page is built once, in its own frame, by the factory passed to show().
+    Showing it again packs the frame back and calls the page's refresh(), which
+    re-fetches only if the database changed in the meantime. Beyond
+    ``max_hidden`` hidden pages, the least recently shown are destroyed.
+    """
+
+    MAX_HIDDEN = 2
+
+    def __init__(self, content, max_hidden=MAX_HIDDEN):
+        self.content = content
+        self.max_hidden = max_hidden
+        self.pages = OrderedDict()  # key -> (frame, page), least recently shown first
+        self.current = None
+
+    def show(self, key, factory):
+        """Show the page stored under ``key``, building it with ``factory(frame)`` if it is not alive."""
+        if self.current is not None and self.current != key:
+            self.pages[self.current][0].pack_forget()
+
+        if key in self.pages:
+            self.pages.move_to_end(key)
+            frame, page = self.pages[key]
+            if self.current != key:
+                frame.pack(fill="both", expand=True)
+            page.refresh()
+        else:
+            frame = ctk.CTkFrame(self.content, fg_color="white")
+            frame.pack(fill="both", expand=True)
+            self.pages[key] = (frame, factory(frame))
+        self.current = key
+
+        hidden = [page_key for page_key in self.pages if page_key != key]
+        for page_key in hidden[:max(0, len(hidden) - self.max_hidden)]:
+            frame, _ = self.pages.pop(page_key)
+            frame.destroy()
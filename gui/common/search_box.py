@@ -0,0 +1,37 @@
+import customtkinter as ctk
+
+
+class SearchBox(ctk.CTkEntry):
+    """Entry that calls ``on_search(text)`` once typing pauses for ``delay_ms``.
+
+    Keystrokes inside the delay restart it, so a word typed quickly runs one
+    search instead of one per letter. ``text`` is stripped, and is "" when the
+    box is cleared; an unchanged text does not search again.
+    """
+
+    DELAY_MS = 250
+
+    def __init__(self, master, on_search, delay_ms=DELAY_MS, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_search = on_search
+        self.delay_ms = delay_ms
+        self.pending = None  # after() ID of the scheduled search
+        self.text = ""  # Text of the last search
+        self.bind("<KeyRelease>", self.schedule_search)
+
+    def schedule_search(self, event=None):
+        if self.pending is not None:
+            self.after_cancel(self.pending)
+        self.pending = self.after(self.delay_ms, self.search)
+
+    def search(self):
+        self.pending = None
+        text = self.get().strip()
+        if text != self.text:
+            self.text = text
+            self.on_search(text)
+
+    def destroy(self):
+        if self.pending is not None:
+            self.after_cancel(self.pending)
+        super().destroy()
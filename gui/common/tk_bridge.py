@@ -0,0 +1,47 @@
+import queue
+import tkinter as tk
+import traceback
+
+# Tk is not thread-safe: worker threads queue callbacks here and the Tk thread
+# drains the queue from an after() loop.
+POLL_MS = 15
+
+_callbacks = queue.Queue()
+_root = None
+
+
+def install(widget):
+    """Start running queued callbacks on ``widget``'s Tk root. Call from the Tk thread."""
+    global _root
+    root = widget._root()
+    if root is _root:
+        return
+    _root = root
+    _drain()
+
+
+def call_soon(callback, *args):
+    """Run ``callback(*args)`` on the Tk thread. Safe to call from any thread."""
+    _callbacks.put((callback, args))
+
+
+def pending():
+    """Number of callbacks queued but not run yet."""
+    return _callbacks.qsize()
+
+
+def _drain():
+    global _root
+    while True:
+        try:
+            callback, args = _callbacks.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            callback(*args)
+        except Exception:
+            traceback.print_exc()
+    try:
+        _root.after(POLL_MS, _drain)
+    except tk.TclError:
+        _root = None  # The root window was destroyed
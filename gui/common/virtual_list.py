@@ -0,0 +1,174 @@
+import math
+import tkinter as tk
+import customtkinter as ctk
+
+
+class VirtualList(ctk.CTkFrame):
+    """Scrollable list that only keeps enough row widgets to fill the viewport.
+
+    Rows are built by ``create_row(parent)`` and filled by ``bind_row(row, item)``;
+    the optional ``unbind_row(row)`` is called when a row is hidden.
+    Every row takes the same ``row_height``, spacing included. As the list scrolls,
+    the pooled row widgets are moved and re-bound to the items coming into view,
+    so the number of widgets stays constant however many items the list holds.
+    Items are identified by ``key(item)`` (their first field by default), which
+    remove_items() and update_item() use to patch single rows in place.
+    """
+
+    def __init__(self, master, row_height, create_row, bind_row, unbind_row=None, empty_text="Nothing to show.",
+                 on_scroll_end=None, overscan=1, row_padx=20, row_pady=10, bg="white", key=None, **kwargs):
+        super().__init__(master, fg_color=bg, corner_radius=10, **kwargs)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.unbind_row = unbind_row
+        self.key = key or (lambda item: item[0])
+        self.on_scroll_end = on_scroll_end  # Called when the view reaches the end of the list
+        self.overscan = overscan  # Extra rows kept bound above and below the viewport
+        self.row_padx = row_padx
+        self.row_pady = row_pady
+        self.items = []
+        self.rows = []  # Pooled (row widget, canvas window ID); item i is shown by slot i % len(rows)
+        self.bound = []  # Item index each pooled row is currently bound to
+        self.refresh_pending = False
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, bg=bg, yscrollincrement=20)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_canvas_scroll)
+        self.scrollbar.pack(side="right", fill="y", padx=(0, 5), pady=5)
+        self.canvas.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+
+        self.empty_label = ctk.CTkLabel(self.canvas, text=empty_text, font=ctk.CTkFont(size=14), text_color="black")
+        self.empty_window = self.canvas.create_window(0, 10, anchor="n", window=self.empty_label, state="hidden")
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.bind_mouse_wheel(self.canvas)
+
+    def set_items(self, items):
+        """Replace every item and scroll back to the top."""
+        self.items = list(items)
+        self.canvas.yview_moveto(0)
+        self.update_scrollregion()
+        self.refresh_rows()
+
+    def append_items(self, items):
+        """Add items to the end of the list, keeping the scroll position."""
+        self.items.extend(items)
+        self.update_scrollregion()
+        self.schedule_refresh()
+
+    def remove_items(self, keys):
+        """Remove the items with the given keys, keeping the scroll position.
+
+        Only rows at or after the first removed item are re-bound, and only those
+        in view, so removing one item costs the same however long the list is.
+        """
+        keys = set(keys)
+        first = next((index for index, item in enumerate(self.items) if self.key(item) in keys), None)
+        if first is None:
+            return
+        self.items = self.items[:first] + [item for item in self.items[first:] if self.key(item) not in keys]
+        self.update_scrollregion()
+        self.rebind_from(first)
+
+    def update_item(self, item):
+        """Replace the item with the same key as ``item`` and re-bind its row if it is in view."""
+        key = self.key(item)
+        index = next((index for index, old in enumerate(self.items) if self.key(old) == key), None)
+        if index is None:
+            return
+        self.items[index] = item
+        self.rebind_from(index, index + 1)
+
+    def rebind_from(self, start, stop=None):
+        """Re-bind the rows showing items ``start`` to ``stop`` (the end of the list by default)."""
+        # -1 marks a slot as stale but still bound, so it is unbound if it ends up hidden
+        self.bound = [-1 if index is not None and index >= start and (stop is None or index < stop) else index
+                      for index in self.bound]
+        self.schedule_refresh()
+
+    def refresh_rows(self):
+        """Re-bind every visible row, e.g. after the items changed in place."""
+        self.bound = [None] * len(self.rows)
+        self.layout_rows()
+
+    def update_scrollregion(self):
+        height = len(self.items) * self.row_height
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), height))
+        self.canvas.itemconfigure(self.empty_window, state="hidden" if self.items else "normal")
+
+    def schedule_refresh(self):
+        """Lay rows out once the current burst of scroll events has been handled."""
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self.layout_rows)
+
+    def layout_rows(self):
+        """Move and re-bind the pooled rows to the items currently in view."""
+        self.refresh_pending = False
+        view_height = max(self.canvas.winfo_height(), self.row_height)
+        needed = math.ceil(view_height / self.row_height) + 1 + 2 * self.overscan
+        needed = min(needed, len(self.items))
+        if needed > len(self.rows):
+            self.grow_pool(needed)
+
+        top = int(self.canvas.canvasy(0) // self.row_height)
+        first = max(0, top - self.overscan)
+        visible = range(first, min(first + len(self.rows), len(self.items)))
+        for index in visible:
+            slot = index % len(self.rows)
+            row, window = self.rows[slot]
+            if self.bound[slot] != index:
+                self.canvas.coords(window, self.row_padx, index * self.row_height + self.row_pady // 2)
+                self.canvas.itemconfigure(window, state="normal")
+                self.bind_row(row, self.items[index])
+                self.bound[slot] = index
+
+        # Hide rows that have nothing left to show (the list is shorter than the pool)
+        shown = {index % len(self.rows) for index in visible}
+        for slot, (row, window) in enumerate(self.rows):
+            if slot not in shown:
+                self.canvas.itemconfigure(window, state="hidden")
+                if self.unbind_row and self.bound[slot] is not None:
+                    self.unbind_row(row)
+                self.bound[slot] = None
+
+    def grow_pool(self, size):
+        # Adding slots changes index -> slot mapping, so every row is re-bound
+        width = self.row_width()
+        while len(self.rows) < size:
+            row = self.create_row(self.canvas)
+            window = self.canvas.create_window(0, 0, anchor="nw", window=row, width=width,
+                                               height=self.row_height - self.row_pady, state="hidden")
+            self.bind_mouse_wheel(row)
+            self.rows.append((row, window))
+        self.bound = [None] * len(self.rows)
+
+    def row_width(self):
+        return max(self.canvas.winfo_width() - 2 * self.row_padx, 1)
+
+    def on_resize(self, event):
+        for _, window in self.rows:
+            self.canvas.itemconfigure(window, width=self.row_width())
+        self.canvas.coords(self.empty_window, event.width // 2, 10)
+        self.update_scrollregion()
+        self.schedule_refresh()
+
+    def on_canvas_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_refresh()
+        if self.on_scroll_end and self.items and float(last) >= 0.95:
+            self.on_scroll_end()
+
+    def bind_mouse_wheel(self, widget):
+        """Scroll the list with the mouse wheel while the pointer is over ``widget`` or its children."""
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tk.Misc.bind(widget, sequence, self.on_mouse_wheel, add="+")
+        for child in widget.winfo_children():
+            self.bind_mouse_wheel(child)
+
+    def on_mouse_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.canvas.yview_scroll(-3, "units")
+        else:
+            self.canvas.yview_scroll(3, "units")
@@ -3,6 +3,7 @@ import db_manager
 from PIL import Image  # Importing PIL to load the image properly
 import os
 import tkinter.messagebox as messagebox  # Using tkinter's messagebox for alerts
+from gui.common.db_executor import db_executor
 
 ctk.set_appearance_mode("light")  # Light mode
 ctk.set_default_color_theme("blue")  # Default color theme
@@ -76,8 +77,13 @@ class LoginWindow:
     def login(self):
         username = self.entry_username.get()
         password = self.entry_password.get()
-        user = db_manager.login_user(username, password)
+        db_executor.submit(
+            self.master, db_manager.login_user, username, password,
+            busy=(self.button_login, self.button_register), on_success=self.open_dashboard,
+        )
 
+    def open_dashboard(self, user):
+        """Open the admin or user window once the credentials have been checked."""
         if user:
             user_id, is_admin = user
             if is_admin:
@@ -1,6 +1,7 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
 import db_manager
+from gui.common.db_executor import db_executor
 
 class RegistrationWindow:
     def __init__(self, master, parent):
@@ -92,12 +93,14 @@ class RegistrationWindow:
             messagebox.showerror("Error", "Passwords do not match.")
             return
 
-        try:
-            db_manager.register_user(username, password)
-            messagebox.showinfo("Success", "Registration successful!")
-            self.back_to_login()
-        except ValueError as e:
-            messagebox.showerror("Error", str(e))
+        db_executor.submit(
+            self.master, db_manager.register_user, username, password,
+            busy=(self.button_register, self.button_back), on_success=self.registered,
+        )
+
+    def registered(self, _):
+        messagebox.showinfo("Success", "Registration successful!")
+        self.back_to_login()
 
     def back_to_login(self):
         self.master.destroy()  # Close the registration window
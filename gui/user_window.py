@@ -1,7 +1,6 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
-from gui.common.home import HomePage
-from gui.common.manage_bookings import ManageBookingsPage
+from gui.common.page_cache import PageCache
 
 
 class UserWindow:
@@ -19,6 +18,7 @@ class UserWindow:
 
         self.content = ctk.CTkFrame(self.master, fg_color="white")
         self.content.pack(side="right", fill="both", expand=True)
+        self.pages = PageCache(self.content)  # Visited pages stay alive between sidebar clicks
 
         # Sidebar Buttons
         self.create_sidebar()
@@ -54,18 +54,13 @@ class UserWindow:
 
     def show_home_page(self):
         """Show the Home Page."""
-        self.clear_content()
-        HomePage(self.content, self.master, self.user_id, is_admin=False)
+        from gui.common.home import HomePage  # Pages are imported on first use to keep start-up fast
+        self.pages.show("home", lambda frame: HomePage(frame, self.master, self.user_id, is_admin=False))
 
     def show_my_bookings(self):
         """Show the user's bookings."""
-        self.clear_content()
-        ManageBookingsPage(self.content, is_admin=False, user_id=self.user_id)
-
-    def clear_content(self):
-        """Clear the content area."""
-        for widget in self.content.winfo_children():
-            widget.destroy()
+        from gui.common.manage_bookings import ManageBookingsPage
+        self.pages.show("bookings", lambda frame: ManageBookingsPage(frame, is_admin=False, user_id=self.user_id))
 
     def logout(self):
         """Logout the user and return to the login screen."""
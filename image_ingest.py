@@ -0,0 +1,146 @@
+"""Ingestion of uploaded venue images.
+
+Admins upload whatever the camera produced: multi-megapixel photos with
+EXIF, GPS and colour-profile blocks attached. ingest_venue_image() turns an
+upload into what the application actually shows:
+
+- a master no larger than MASTER_MAX_SIZE, with its EXIF orientation applied
+  and every metadata block dropped, saved as JPEG
+- a JPEG rendition at each size the UI displays (the 300x300 list tile and
+  the 700px hero of BookVenueWindow), which thumbnail_cache serves once they
+  are recorded, so no page ever decodes the master
+
+Files are named after the venue and a digest of the master, so a new upload
+never overwrites an image in use and a rendition can never be stale. Venues
+whose names differ only in case or punctuation can share them, which is why
+db_manager.delete_venue() and set_venue_image() only hand back for discard()
+the files no other venue still uses. The renditions are recorded in
+venue_renditions by db_manager.add_venue() and set_venue_image().
+
+Re-ingest the images of venues already in the database, e.g. the full-size
+PNGs added before this pipeline existed, with:
+
+    python -m image_ingest [--remove-originals]
+"""
+import argparse
+import hashlib
+import io
+import os
+import re
+import threading
+
+from PIL import Image, ImageOps
+
+import db_manager
+import thumbnail_cache
+
+MASTER_MAX_SIZE = (1600, 1600)  # Twice the largest rendition, enough to add bigger ones later
+MASTER_QUALITY = 90
+RENDITION_QUALITY = 82
+
+# Rendition name recorded in the database -> (size, resize mode) as in thumbnail_cache
+RENDITIONS = {name: rendition for rendition, name in thumbnail_cache.RENDITION_NAMES.items()}
+
+
+def ingest_venue_image(source, venue_name, assets_dir=thumbnail_cache.VENUE_ASSETS_DIR):
+    """Write the capped, metadata-free master of ``source`` and its renditions into ``assets_dir``.
+
+    Returns ``(master_path, renditions, created)``: ``renditions`` are the
+    (rendition, path, width, height, bytes) tuples to record with the venue,
+    and ``created`` the files this call wrote (see discard()).
+    """
+    with Image.open(source) as original:
+        original.draft("RGB", MASTER_MAX_SIZE)  # Lets JPEG sources decode at a reduced scale
+        img = _flatten(original)
+    img.thumbnail(MASTER_MAX_SIZE)
+    master = _encode(img, MASTER_QUALITY)
+
+    digest = hashlib.sha1(master).hexdigest()[:10]
+    master_path = os.path.join(assets_dir, f"{_slug(venue_name)}-{digest}.jpg")
+    created = []
+    _write(master_path, master, created)
+
+    renditions = []
+    for name, (size, mode) in RENDITIONS.items():
+        rendition = thumbnail_cache.resize(img.copy(), size, mode)
+        data = _encode(rendition, RENDITION_QUALITY)
+        path = thumbnail_cache.rendition_path(master_path, size, mode)
+        _write(path, data, created)
+        renditions.append((name, path, rendition.width, rendition.height, len(data)))
+    return master_path, renditions, created
+
+
+def discard(paths):
+    """Remove venue image files: those of an ingestion whose venue was never saved, or of a deleted venue."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _flatten(img):
+    """Return ``img`` upright and in RGB, without any of the source's metadata."""
+    img = ImageOps.exif_transpose(img)  # Bake the orientation in before the EXIF block goes
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        img = img.convert("RGBA")
+        flat = Image.new("RGB", img.size, "white")  # JPEG has no alpha; venue cards are white
+        flat.paste(img, mask=img.getchannel("A"))
+    else:
+        flat = img.convert("RGB")
+    flat.info = {}  # EXIF, GPS, ICC profile, PNG text chunks...
+    return flat
+
+
+def _encode(img, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _write(path, data, created):
+    if os.path.exists(path):
+        return  # Named by content: the file already holds these bytes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write under a unique name and rename, so a reader never sees a partial file
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    created.append(path)
+
+
+def _slug(venue_name):
+    return re.sub(r"[^a-z0-9_-]+", "", venue_name.lower().replace(" ", "_")) or "venue"
+
+
+def reingest_all(remove_originals=False):
+    """Ingest the image of every venue that has no renditions yet; returns (venues, bytes before, bytes after)."""
+    venues = before = after = 0
+    originals = set()
+    for venue_id, venue_name, _, _, image in db_manager.get_all_venues():
+        if not image or not os.path.exists(image) or db_manager.get_venue_renditions(venue_id):
+            continue
+        master_path, renditions, _ = ingest_venue_image(image, venue_name, os.path.dirname(image))
+        discard(db_manager.set_venue_image(venue_id, master_path, renditions))
+        before += os.path.getsize(image)
+        after += os.path.getsize(master_path) + sum(rendition[4] for rendition in renditions)
+        originals.add(image)
+        venues += 1
+    if remove_originals:
+        # Only once every venue has moved on, as two venues may have shared one original
+        discard(originals - {venue[4] for venue in db_manager.get_all_venues()})
+    return venues, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-ingest the images of venues added before image ingestion.")
+    parser.add_argument("--remove-originals", action="store_true", help="delete each original once replaced")
+    args = parser.parse_args()
+
+    db_manager.migrate_schema()
+    venues, before, after = reingest_all(args.remove_originals)
+    print(f"Ingested {venues} venue images: {before / 2 ** 20:.1f} MB of originals, "
+          f"{after / 2 ** 20:.1f} MB of masters and renditions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,38 @@
-import db_manager
+import startup_profile  # First, so the start-up timeline begins before anything heavy is imported
 import tkinter as tk
-from gui.login_window import LoginWindow
 
-if __name__ == "__main__":
-    # Ensure that the database and tables are set up
-    db_manager.create_tables()
 
-    # Launch the application with the login window
+def show_splash(root):
+    """Paint a plain Tk splash while customtkinter, the database and the login window load."""
+    splash = tk.Frame(root, bg="white")
+    splash.pack(expand=True, fill="both")
+    tk.Label(splash, text="UC Venue Booking", font=("Arial", 28, "bold"), fg="#144d94", bg="white").pack(
+        expand=True, anchor="s", pady=10
+    )
+    tk.Label(splash, text="Loading...", font=("Arial", 14), fg="gray", bg="white").pack(expand=True, anchor="n")
+    root.update()  # Draw it now; the main loop does not start until everything else has loaded
+    return splash
+
+
+if __name__ == "__main__":
     root = tk.Tk()
     root.state("zoomed")  # Ensure the main window starts maximized
     root.title("UC Venue Booking Management")
+    splash = show_splash(root)
+    startup_profile.mark("splash")
+
+    # Ensure that the database exists and its schema is up to date (only a version check when it is)
+    import db_manager
+    db_manager.migrate_schema()
+    startup_profile.mark("schema")
+
+    from gui.login_window import LoginWindow
+    startup_profile.mark("imports")
+
+    # Launch the application with the login window
+    splash.destroy()
     login_window = LoginWindow(root)
+    root.update_idletasks()
+    startup_profile.mark("login window")
+    startup_profile.finish(root)
     root.mainloop()
@@ -0,0 +1,80 @@
+"""Timeline of the application's cold start, checked against a budget.
+
+main.py marks each start-up phase. With UCVBM_STARTUP_PROFILE=1 the phases
+are printed to stderr once the login window is on screen; set it to a file
+name ending in .json to write them there instead. The total, from process
+creation to the painted login window, is compared with
+UCVBM_STARTUP_BUDGET_MS (default 1500).
+
+UCVBM_STARTUP_EXIT=1 closes the application right after the report, which is
+how benchmarks.bench_startup measures repeated cold starts.
+"""
+import os
+import sys
+import time
+
+ENV_VAR = "UCVBM_STARTUP_PROFILE"
+DEFAULT_BUDGET_MS = 1500
+
+# Taken when main.py imports this module, before anything heavy is loaded
+_started = time.perf_counter()
+_started_wall = time.time()
+_marks = []  # (phase, perf_counter)
+
+
+def enabled():
+    return os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def mark(phase):
+    """Record that ``phase`` has just finished."""
+    _marks.append((phase, time.perf_counter()))
+
+
+def _process_age_ms():
+    """Milliseconds between process creation and this module's import, or None if unknown."""
+    try:
+        import psutil
+        return max(0.0, (_started_wall - psutil.Process().create_time()) * 1000)
+    except Exception:
+        return None  # psutil is optional
+
+
+def report():
+    """Return the recorded phases with their durations and the total against the budget."""
+    before_main = _process_age_ms()
+    offset = before_main or 0.0
+    phases = [{"phase": "interpreter", "ms": before_main, "at_ms": before_main}] if before_main is not None else []
+    previous = _started
+    for phase, at in _marks:
+        phases.append({"phase": phase, "ms": (at - previous) * 1000, "at_ms": offset + (at - _started) * 1000})
+        previous = at
+    budget = float(os.environ.get("UCVBM_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS))
+    total = phases[-1]["at_ms"] if phases else 0.0
+    return {
+        "phases": phases,
+        "total_ms": total,
+        "budget_ms": budget,
+        "within_budget": total <= budget,
+        "modules": len(sys.modules),
+    }
+
+
+def finish(root):
+    """Report once ``root`` has drawn the login window, if profiling is on; exit afterwards if asked."""
+    if not enabled():
+        return
+    result = report()
+    target = os.environ[ENV_VAR]
+    if target.endswith(".json"):
+        import json
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    else:
+        for phase in result["phases"]:
+            print(f"{phase['phase']:<20}{phase['ms']:>9.1f} ms  (at {phase['at_ms']:.1f} ms)", file=sys.stderr)
+        verdict = "within" if result["within_budget"] else "OVER"
+        print(f"{'total':<20}{result['total_ms']:>9.1f} ms  {verdict} the {result['budget_ms']:.0f} ms budget, "
+              f"{result['modules']} modules loaded", file=sys.stderr)
+    if os.environ.get("UCVBM_STARTUP_EXIT", "") not in ("", "0"):
+        root.after(0, root.destroy)
@@ -0,0 +1,16 @@
+import db_manager
+import db_trace
+
+
+def test_connection_execute_is_traced(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_manager, "DB_PATH", str(tmp_path / "trace.db"))
+    db_manager.close_connections()
+    db_trace.enable(slow_ms=1000, log_dir=str(tmp_path / "logs"), explain=False)
+    try:
+        db_trace.reset_stats()
+        with db_manager.read_connection() as conn:
+            conn.execute("SELECT 42").fetchone()
+        assert "SELECT 42" in db_trace.stats()["statements"]
+    finally:
+        db_trace.disable()
+        db_manager.close_connections()
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import db_manager
+
+TUESDAY = "2025-03-04 09:00 - 2025-03-04 10:00"
+
+
+def _days(occurrences):
+    return [datetime.fromtimestamp(start_ts, timezone.utc).strftime("%Y-%m-%d") for start_ts, _ in occurrences]
+
+
+def test_weekly_series_starts_with_the_picked_date():
+    occurrences = db_manager.expand_recurrence(TUESDAY, "weekly", weekdays=[1, 3], count=4)
+    assert occurrences[0] == db_manager.parse_time_range(TUESDAY)
+    assert _days(occurrences) == ["2025-03-04", "2025-03-06", "2025-03-11", "2025-03-13"]
+
+
+def test_weekly_weekdays_must_include_the_start_weekday():
+    with pytest.raises(ValueError, match="weekday of the start date"):
+        db_manager.expand_recurrence(TUESDAY, "weekly", weekdays=[3], count=4)
@@ -0,0 +1,13 @@
+import db_manager
+
+
+def test_reads_in_write_connection_hold_the_write_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_manager, "DB_PATH", str(tmp_path / "write.db"))
+    db_manager.close_connections()
+    try:
+        db_manager.migrate_schema()
+        with db_manager.write_connection() as conn:
+            conn.execute("SELECT count(*) FROM bookings").fetchone()
+            assert conn.in_transaction  # A conflict check cannot be raced by another process's commit
+    finally:
+        db_manager.close_connections()
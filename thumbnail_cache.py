@@ -0,0 +1,132 @@
+"""On-disk cache of pre-sized venue image renditions.
+
+Pages ask for a venue image at the size they display it; the first request
+renders it from the full-resolution source and later ones reuse the file.
+Each entry is keyed by source path, source mtime, target size and resize mode,
+so replacing a venue image never serves a stale thumbnail.
+
+Venue images added through image_ingest come with their renditions already
+encoded; the ones recorded in the database (db_manager.get_image_renditions())
+are served as they are and never rendered here.
+
+Regenerate every rendition for the venue catalog (in parallel) with:
+
+    python -m thumbnail_cache [--workers N]
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+import db_manager
+
+CACHE_DIR = 'cache/thumbnails'
+VENUE_ASSETS_DIR = 'assets/venues'
+RENDITIONS_DIR = 'renditions'  # Beside each ingested venue image
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Resize modes: "fill" stretches to exactly the target size (list rows),
+# "fit" keeps the aspect ratio within the target box (BookVenueWindow)
+LIST_TILE = ((300, 300), "fill")
+HERO = ((700, 700), "fit")
+RENDITIONS = (LIST_TILE, HERO)
+RENDITION_NAMES = {LIST_TILE: "tile", HERO: "hero"}  # As recorded in venue_renditions
+
+
+def thumbnail_path(source, size, mode="fill"):
+    """Return the cache path of ``source`` rendered at ``size`` with ``mode``."""
+    stat = os.stat(source)
+    key = f"{os.path.abspath(source)}|{stat.st_mtime_ns}|{size[0]}x{size[1]}|{mode}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{size[0]}x{size[1]}-{mode}-{digest}.png")
+
+
+def rendition_path(source, size, mode="fill"):
+    """Return where image_ingest stores the ``size``/``mode`` rendition of an ingested ``source``."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(os.path.dirname(source), RENDITIONS_DIR, f"{stem}-{size[0]}x{size[1]}-{mode}.jpg")
+
+
+def get_thumbnail(source, size, mode="fill"):
+    """Return the path of a rendition of ``source``: its recorded one, or a cached one rendered on first use."""
+    ingested = db_manager.get_image_renditions(source).get(RENDITION_NAMES.get((size, mode)))
+    if ingested and os.path.exists(ingested):
+        return ingested  # Ingested images are named by content, so their renditions never go stale
+    path = thumbnail_path(source, size, mode)
+    if not os.path.exists(path):
+        render_thumbnail(source, size, mode, path)
+    return path
+
+
+def render_thumbnail(source, size, mode, path):
+    """Render ``source`` at ``size`` into ``path``."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with Image.open(source) as img:
+        img = resize(img, size, mode)
+        # Write under a unique name and rename, so concurrent renders never expose a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(temp_path, format="PNG", compress_level=1)
+    os.replace(temp_path, path)
+    return path
+
+
+def resize(img, size, mode):
+    """Return ``img`` scaled to ``size`` in ``mode`` ("fill" or "fit")."""
+    if mode == "fit":
+        img.thumbnail(size)
+        return img
+    img.draft("RGB", size)  # Lets JPEG sources decode at a reduced scale
+    return img.resize(size, reducing_gap=3.0)
+
+
+def _render_task(task):
+    source, size, mode = task
+    return get_thumbnail(source, size, mode)
+
+
+def venue_images(directory=VENUE_ASSETS_DIR):
+    """List the source images of the venue catalog."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def regenerate_all(directory=VENUE_ASSETS_DIR, workers=None):
+    """Render every rendition of every venue image on a process pool and prune stale entries.
+
+    Returns the paths of the renditions that are now in the cache.
+    """
+    tasks = [(source, size, mode) for source in venue_images(directory) for size, mode in RENDITIONS]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        paths = set(pool.map(_render_task, tasks, chunksize=4))
+
+    # Entries for replaced or deleted source images are no longer reachable
+    for name in os.listdir(CACHE_DIR) if os.path.isdir(CACHE_DIR) else []:
+        path = os.path.join(CACHE_DIR, name)
+        if path not in paths:
+            os.remove(path)
+    return sorted(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate every venue image rendition.")
+    parser.add_argument("--directory", default=VENUE_ASSETS_DIR, help="folder holding the venue images")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    db_manager.migrate_schema()  # Recorded renditions are looked up in venue_renditions
+    start = time.perf_counter()
+    paths = regenerate_all(args.directory, args.workers)
+    print(f"Rendered {len(paths)} renditions into {CACHE_DIR} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()